@@ -1,16 +1,90 @@
 #!/usr/bin/python -tt
 # -*- coding: utf-8 -*-
 
-"""Bamboo REST API Client."""
+"""Bamboo REST API Client.
+
+The public names are imported from their module on first access (PEP 562): 'import bamboo' does not import requests,
+aiohttp, bs4 or yaml, nor does it touch the logging configuration of the application (see <configure_logging>).
+"""
 
 
 __author__ = "DC"
 __mail__ = "david.cristian.paraschivescu@gmail.com"
 __version__ = "1.0.0"
 
-from .api import BambooAPIClient
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .api import BambooAPIClient
+    from .async_api import AsyncBambooAPIClient
+    from .cluster import ServerPool
+    from .config import configure_logging
+    from .index import PlanResultsIndex
+    from .instrumentation import (
+        HistogramCollector,
+        Instrumentation
+    )
+    from .models import (
+        Artifact,
+        BuildResult,
+        PlanResult
+    )
+    from .retry import (
+        RetryBudget,
+        RetryPolicy
+    )
+    from .throttling import RequestGovernor
+    from .watch import BuildWatcher
+
 
+# Module of every public name
+_EXPORTS = {
+    'Artifact': '.models',
+    'AsyncBambooAPIClient': '.async_api',
+    'BambooAPIClient': '.api',
+    'BuildResult': '.models',
+    'BuildWatcher': '.watch',
+    'HistogramCollector': '.instrumentation',
+    'Instrumentation': '.instrumentation',
+    'PlanResult': '.models',
+    'PlanResultsIndex': '.index',
+    'RequestGovernor': '.throttling',
+    'RetryBudget': '.retry',
+    'RetryPolicy': '.retry',
+    'ServerPool': '.cluster',
+    'configure_logging': '.config'
+}
 
 __all__ = [
-    'BambooAPIClient'
+    'Artifact',
+    'AsyncBambooAPIClient',
+    'BambooAPIClient',
+    'BuildResult',
+    'BuildWatcher',
+    'HistogramCollector',
+    'Instrumentation',
+    'PlanResult',
+    'PlanResultsIndex',
+    'RequestGovernor',
+    'RetryBudget',
+    'RetryPolicy',
+    'ServerPool',
+    'configure_logging'
 ]
+
+
+def __getattr__(name: str):
+    """Import a public name from its module on first access; then cached in the package namespace."""
+
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
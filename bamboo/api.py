@@ -3,38 +3,129 @@
 
 """Bamboo API client module used for communicating with the Bamboo server web service API."""
 
+import heapq
+import io
 import json
 import os
+import posixpath
+import random
 import requests
+import threading
+import time
 
 from abc import ABCMeta
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from fnmatch import fnmatchcase
+from typing import TYPE_CHECKING
+from urllib.parse import (
+    urldefrag,
+    urljoin
+)
 # Third-party libs
-from bs4 import BeautifulSoup
 from requests.auth import HTTPBasicAuth
 
 # Add custom packages
+from bamboo.cluster import ServerPool
+from bamboo.coalescing import SingleFlight
 from bamboo.config import (
     BAMBOO_PASS,
     BAMBOO_USER,
     LOGGER
 )
+from bamboo.decoders import (
+    STDLIB_DECODER,
+    decode_json,
+    get_json_decoder
+)
+from bamboo.downloads import (
+    check_content_length,
+    check_resumed_response,
+    deliver_cached_artifact,
+    finish_download,
+    get_cached_artifact,
+    get_download_hasher,
+    get_partial_files,
+    get_resume_point,
+    remove_file,
+    remove_partial_files,
+    save_download_validator,
+    write_chunk
+)
 from bamboo.exceptions import (
     DownloadErrorException,
     EncodingJSONException,
     HTTPErrorException
 )
-from bamboo.requests_utils import TimeoutHTTPAdapter
+from bamboo.models import (
+    FINAL_LIFE_CYCLE_STATES,
+    decode_results,
+    get_artifacts
+)
+from bamboo.parsers import (
+    PARSER_BACKENDS,
+    STDLIB_BACKEND,
+    parse_artifact_links
+)
+from bamboo.requests_utils import (
+    POOL_CONNECTIONS,
+    POOL_MAXSIZE,
+    create_session,
+    get_pool_stats,
+    is_request_sent,
+    release_on_close,
+    start_connection_timings,
+    stop_connection_timings
+)
+from bamboo.retry import (
+    NO_RETRY,
+    RetryBudget,
+    RetryPolicy
+)
+from bamboo.throttling import (
+    HostLimiter,
+    RequestGovernor,
+    TokenBucket,
+    get_host
+)
+from bamboo.tracing import (
+    NO_MEASURE,
+    get_api_method,
+    instrumented
+)
 from bamboo.validation import Validation
+from bamboo.watch import (
+    WATCH_INTERVAL,
+    WATCH_RESULTS_EXPAND,
+    BuildWatcher
+)
 
+# Loaded by the features using them only: the index needs sqlite3
+if TYPE_CHECKING:
+    from bamboo.cache import (
+        ArtifactCache,
+        CacheEntry
+    )
+    from bamboo.index import PlanResultsIndex
+    from bamboo.instrumentation import Instrumentation
 
-# Mount it for both http and https usage
-ADAPTER = TimeoutHTTPAdapter(timeout=2.5)
-HTTP = requests.Session()
-HTTP.mount("https://", ADAPTER)
-HTTP.mount("http://", ADAPTER)
 
 LINE_SEP = os.linesep
 
+# Artifacts are written to disk in chunks of this size (bytes), so memory usage does not depend on the artifact size
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# Default timeout of the HTTP requests (seconds) when not set per request
+HTTP_TIMEOUT = 2.5
+# Default number of plan results requested at once when walking the plan history
+PLAN_RESULTS_PAGE_SIZE = 25
+# Default number of artifacts downloaded at the same time by the bulk download API
+DOWNLOAD_MAX_WORKERS = 8
+# Default maximum number of trigger plan requests sent at the same time by <trigger_plan_builds>
+TRIGGER_MAX_IN_FLIGHT = 4
+# Bounds of the interval between two polls of a running build by the build waiters (seconds)
+BUILD_POLL_MIN_INTERVAL = 1.0
+BUILD_POLL_MAX_INTERVAL = 60.0
+
 
 class BambooAccount(metaclass=ABCMeta):
     """Bamboo account info container.
@@ -86,23 +177,46 @@ class BambooAccount(metaclass=ABCMeta):
         return BAMBOO_USER, BAMBOO_PASS
 
 
-class BambooAPIClient(BambooAccount):
-    """Bamboo API client interface with the Bamboo server API."""
+class BambooAPIBase(BambooAccount):
+    """Bamboo API client settings, plus the request building and response packing shared by all the API clients.
+    This is not intended to be instantiated. Please use the '<BambooAPIClient>' or '<AsyncBambooAPIClient>' classes.
+    """
 
     __slots__ = (
         '__trigger_plan_url_mask', '__stop_plan_url_mask', '__plan_results_url_mask', '__query_plan_url_mask',
-        '__latest_queue_url_mask', '__artifact_url_mask', '__server_url', '__plan_key',
-        '__verbose', '__http_header', '__is_auth_enabled'
+        '__latest_queue_url_mask', '__artifact_url_mask', '__job_artifacts_url_mask', '__server_url', '__plan_key',
+        '__verbose', '__http_header', '__is_auth_enabled', '__artifact_parser', '__response_cache',
+        '__json_decoder', '__retry_policy', '__method_retry_policies', '__instrumentation', '__artifact_cache'
     )
 
     def __init__(
-            self, username: str = None, password: str = None, server_url: str = None, verbose: bool = False
+            self,
+            username: str = None,
+            password: str = None,
+            server_url: str = None,
+            verbose: bool = False,
+            artifact_parser: str = STDLIB_BACKEND,
+            json_decoder: str = STDLIB_DECODER,
+            retry_policy: RetryPolicy = None,
+            method_retry_policies: dict = None,
+            instrumentation: 'Instrumentation' = None,
+            artifact_cache: 'ArtifactCache' = None
     ) -> None:
         """CTOR.
         :param username: Bamboo username [str]
         :param password: Bamboo password [str]
         :param server_url: Bamboo server URL [str]
         :param verbose: Get verbose [bool]
+        :param artifact_parser: Parser used for the artifact pages, one of "stdlib" (fast) or "bs4" [str]
+        :param json_decoder: Decoder used for the JSON responses, one of "json", "orjson", "ujson" (if installed) or
+        "auto" (fastest installed) [str]
+        :param retry_policy: Retry policy of the requests (see <retry_policy>); by default, transient errors are
+        retried up to 3 times, within a retry budget of 20% of the requests of the client [RetryPolicy]
+        :param method_retry_policies: Retry policies overriding <retry_policy> per HTTP method, e.g. {"GET": ...} [dict]
+        :param instrumentation: Event bus getting the timings of the API calls, requests and parsing (see
+        <instrumentation>); disabled by default [Instrumentation]
+        :param artifact_cache: On-disk cache of the downloaded artifacts (see <artifact_cache>); disabled by default
+        [ArtifactCache]
         All the above params are optional.
 
         The <username> and <password> params are useful when we want to overwrite the BambooAccount credentials or we
@@ -112,6 +226,9 @@ class BambooAPIClient(BambooAccount):
         projects, there might be cases when we have to use several user accounts (probably different permissions per
         account). As so, the need to supply credentials when object is initialized does not exist.
         """
+        if type(self) is BambooAPIBase:
+            raise TypeError(f"{LINE_SEP * 2}BambooAPIBase class cannot be directly instantiated!{LINE_SEP * 2}")
+
         super().__init__()
 
         if username:
@@ -127,6 +244,15 @@ class BambooAPIClient(BambooAccount):
 
         self.__server_url = server_url
         self.__verbose = verbose
+        self.artifact_parser = artifact_parser
+        self.json_decoder = json_decoder
+        self.__response_cache = None
+        self.__retry_policy = retry_policy or RetryPolicy(budget=RetryBudget())
+        self.__method_retry_policies = {
+            method.upper(): policy for method, policy in (method_retry_policies or {}).items()
+        }
+        self.__instrumentation = instrumentation
+        self.__artifact_cache = artifact_cache
 
         self.__trigger_plan_url_mask = r'{server_url}/rest/api/latest/queue/'
         self.__stop_plan_url_mask = r'{server_url}/build/admin/stopPlan.action'
@@ -134,6 +260,7 @@ class BambooAPIClient(BambooAccount):
         self.__query_plan_url_mask = r'{server_url}/rest/api/latest/plan/'
         self.__latest_queue_url_mask = r'{server_url}/rest/api/latest/queue.json'
         self.__artifact_url_mask = r'{server_url}/browse/{plan_build_key}/artifact/{job_name}/{artifact_name}/'
+        self.__job_artifacts_url_mask = r'{server_url}/browse/{plan_build_key}/artifact/{job_name}/'
 
         self.__http_header = {
             "Connection": "Keep-Alive",
@@ -145,14 +272,6 @@ class BambooAPIClient(BambooAccount):
             "User-Agent": "Garbage browser: 5.6"
         }
 
-    @property
-    def auth(self):
-        """Determine if we need to use AUTH or not."""
-        if self.is_auth_enabled:
-            return HTTPBasicAuth(self.username, self.password)
-
-        return ()
-
     @property
     def is_auth_enabled(self) -> bool:
         """Perform authentication or not.
@@ -190,6 +309,11 @@ class BambooAPIClient(BambooAccount):
         """Get the artifact url mask."""
         return self.__artifact_url_mask
 
+    @property
+    def job_artifacts_url_mask(self) -> str:
+        """Get the url mask of the page listing all the artifacts of a job."""
+        return self.__job_artifacts_url_mask
+
     @property
     def latest_queue_url_mask(self) -> str:
         """Get the latest queue url mask."""
@@ -235,6 +359,111 @@ class BambooAPIClient(BambooAccount):
         """Sets the verbose option."""
         self.__verbose = value
 
+    @property
+    def artifact_parser(self) -> str:
+        """Get the parser used for the artifact pages."""
+        return self.__artifact_parser
+
+    @artifact_parser.setter
+    def artifact_parser(self, backend: str) -> None:
+        """Sets the parser used for the artifact pages."""
+        if backend not in PARSER_BACKENDS:
+            raise ValueError(f"Unknown artifact page parser: '{backend}'! Please use one of: {PARSER_BACKENDS}")
+
+        self.__artifact_parser = backend
+
+    @property
+    def json_decoder(self) -> str:
+        """Get the decoder used for the JSON responses."""
+        return self.__json_decoder
+
+    @json_decoder.setter
+    def json_decoder(self, decoder: str) -> None:
+        """Sets the decoder used for the JSON responses; "auto" picks the fastest one installed."""
+        self.__json_decoder = get_json_decoder(decoder)
+
+    @property
+    def response_cache(self):
+        """Get the cache of the read-only responses (plan results, artifact pages); None if disabled."""
+        return self.__response_cache
+
+    @response_cache.setter
+    def response_cache(self, cache) -> None:
+        """Sets the cache of the read-only responses: a <bamboo.cache.MemoryCache>/<DiskCache> or None to disable it.
+        Cached responses are revalidated with conditional requests (ETag/Last-Modified): on HTTP 304 the cached parsed
+        content (or the cached body, parsed again, for a <DiskCache>) is served, as a HTTP 200 response.
+        """
+        self.__response_cache = cache
+
+    @property
+    def artifact_cache(self) -> 'ArtifactCache':
+        """Get the on-disk cache of the downloaded artifacts; None if disabled."""
+        return self.__artifact_cache
+
+    @artifact_cache.setter
+    def artifact_cache(self, artifact_cache: 'ArtifactCache') -> None:
+        """Sets the on-disk cache of the downloaded artifacts (None to disable it).
+        Downloaded artifacts are hashed (SHA-256) while streamed and stored once per content. A cached artifact is
+        revalidated with a conditional request (ETag/Last-Modified) and, on HTTP 304, delivered to its destination
+        file as a reflink or a copy (see <bamboo.cache.ArtifactCache>), as a HTTP 200 response.
+        """
+        self.__artifact_cache = artifact_cache
+
+    @property
+    def retry_policy(self) -> RetryPolicy:
+        """Get the retry policy of the requests, for the HTTP methods without a policy of their own."""
+        return self.__retry_policy
+
+    @retry_policy.setter
+    def retry_policy(self, retry_policy: RetryPolicy) -> None:
+        """Sets the retry policy of the requests (<bamboo.retry.NO_RETRY> to disable the retries).
+        Requests failing on a transient error are sent again after a backoff, or after the delay asked for by the
+        server ('Retry-After' header). POST requests are only sent again if they never reached the server, unless
+        flagged as idempotent. The retries are capped by the budget of the policy, shared by all its requests.
+        """
+        self.__retry_policy = retry_policy or NO_RETRY
+
+    @property
+    def method_retry_policies(self) -> dict:
+        """Get the retry policies overriding <retry_policy> per HTTP method (upper case), e.g. {"POST": NO_RETRY}."""
+        return self.__method_retry_policies
+
+    @property
+    def instrumentation(self) -> 'Instrumentation':
+        """Get the event bus getting the timings of the API calls, requests and parsing; None if disabled."""
+        return self.__instrumentation
+
+    @instrumentation.setter
+    def instrumentation(self, instrumentation: 'Instrumentation') -> None:
+        """Sets the event bus getting the timings of the API calls, requests and parsing (None to disable it).
+        Every public API method call, request attempt (DNS/connect/TLS/TTFB/total times, bytes in and out, retries,
+        connection reuse) and response parsing (JSON, HTML, models) is reported as an event (see
+        <bamboo.instrumentation.Instrumentation>), e.g. to a <bamboo.instrumentation.HistogramCollector>.
+        """
+        self.__instrumentation = instrumentation
+
+    def measure(self, event: str, **fields):
+        """Measure the duration of a block of code, reported to the instrumentation as an event; no-op if disabled.
+
+        :param event: Name of the event [str]
+        :param fields: Remaining fields of the event
+        :return: A context manager, giving the fields of the event (None if disabled)
+        """
+        instrumentation = self.__instrumentation
+        if instrumentation is None:
+            return NO_MEASURE
+
+        return instrumentation.measure(event, **fields)
+
+    def get_retry_policy(self, method: str, retry_policy: RetryPolicy = None) -> RetryPolicy:
+        """Get the retry policy of a request.
+
+        :param method: HTTP method of the request [str]
+        :param retry_policy: Retry policy set for the request, overriding the ones of the client [RetryPolicy]
+        :return: The retry policy set for the request, else for its method, else for the client [RetryPolicy]
+        """
+        return retry_policy or self.__method_retry_policies.get(method.upper()) or self.__retry_policy
+
     @staticmethod
     def pack_response_to_client(**values_to_pack) -> dict:
         """Pack the response to the user.
@@ -249,94 +478,45 @@ class BambooAPIClient(BambooAccount):
 
         return response
 
-    def get_request(self, **values_to_unpack) -> requests:
-        """Performs a HTTP GET request to the Bamboo server.
+    def pack_artifacts_response(self, artifacts_per_page: list, raw: bool = True) -> dict:
+        """Pack the artifacts found in the artifact pages of a job to the user.
+        The pages are merged in the order they are listed. HTTP 444 is returned if none of the pages could be fetched.
 
-        :param values_to_unpack: Values to un-pack in order to construct the HTTP Get request
-        :return: A requests response object
-        :raise: Custom exception on HTTP communication errors
+        :param artifacts_per_page: Artifacts of every page, as {name: url}; None for the pages not fetched [list]
+        :param raw: Return the artifacts as {name: url}, instead of a list of <bamboo.models.Artifact> [bool]
+        :return: A dictionary containing HTTP status_code, request content and list of artifacts
         """
 
-        url = values_to_unpack.get('url', "")
-        headers = values_to_unpack.get('header', "") or self.http_header
-        timeout = values_to_unpack.get('timeout', 60)
-        allow_redirects = values_to_unpack.get('allow_redirects', False)
-
-        try:
-            response = HTTP.get(url=url,
-                                auth=self.auth,
-                                headers=headers,
-                                timeout=timeout,
-                                allow_redirects=allow_redirects)
-        except (
-            requests.ConnectionError, requests.ConnectTimeout, requests.HTTPError,
-            requests.RequestException, requests.Timeout
-        ) as exception:
-            error_message = f"Error when requesting URL: '{url}'{LINE_SEP}{exception}"
-            LOGGER.error(error_message)
-            exception = HTTPErrorException(error_message=error_message)
-            raise exception
-        except Exception as exception:
-            error_message = f"Unknown error when requesting URL: '{url}'{LINE_SEP}{exception}"
-            LOGGER.error(error_message)
-            exception = HTTPErrorException(error_message=error_message)
-            raise exception
-
-        return response
+        # Artifacts to return
+        artifacts = dict()
 
-    def post_request(self, **values_to_unpack) -> requests:
-        """Performs a HTTP POST request to the Bamboo server.
+        http_failed_conn_counter = 0
+        for page_artifacts in artifacts_per_page:
+            if page_artifacts is None:
+                http_failed_conn_counter += 1
+                continue
 
-        :param values_to_unpack: Values to un-pack in order to construct the HTTP POST request
-        :return: A requests response object
-        :raise: Custom exception on HTTP communication errors
-        """
+            artifacts.update(page_artifacts)
 
-        url = values_to_unpack.get('url', "")
-        headers = values_to_unpack.get('header', "") or self.http_header
-        data = values_to_unpack.get('data', {})
-        timeout = values_to_unpack.get('timeout', 30)
-        allow_redirects = values_to_unpack.get('allow_redirects', False)
+        http_return_code = 200
+        if http_failed_conn_counter == len(artifacts_per_page):
+            http_return_code = 444
 
-        try:
-            response = HTTP.post(url=url,
-                                 auth=self.auth,
-                                 headers=headers,
-                                 data=data,
-                                 timeout=timeout,
-                                 allow_redirects=allow_redirects)
-        except (
-            requests.ConnectionError, requests.ConnectTimeout, requests.HTTPError,
-            requests.RequestException, requests.Timeout
-        ) as exception:
-            error_message = f"Error when requesting URL: '{url}'{LINE_SEP}{exception}"
-            LOGGER.error(error_message)
-            exception = HTTPErrorException(error_message=error_message)
-            raise exception
-        except Exception as exception:
-            error_message = f"Unknown error when requesting URL: '{url}'{LINE_SEP}{exception}"
-            LOGGER.error(error_message)
-            exception = HTTPErrorException(error_message=error_message)
-            raise exception
+        response_to_client = self.pack_response_to_client(
+            response=True, status_code=http_return_code, content=None, url=None
+        )
+        response_to_client['artifacts'] = artifacts if raw else get_artifacts(artifacts)
 
-        return response
+        return response_to_client
 
-    @Validation.check_input
-    def trigger_plan_build(self, server_url: str = None, plan_key: str = None, req_values: tuple = None) -> dict:
-        """Trigger a plan build using Bamboo API.
-        TODO: deal with errors from plan restriction, like strict no of plans to build
+    @staticmethod
+    def build_trigger_plan_payload(req_values: tuple = None) -> dict:
+        """Build the payload of a trigger plan build request.
 
-        :param server_url: Bamboo server URL used in API call [str]
-        Optional. Use this if you have a cluster of Bamboo servers and need to swap between servers.
-        :param plan_key: Bamboo plan key [str]
         :param req_values: Values to insert into request (tuple)
-        :return: A dictionary containing HTTP status_code and request content
-        :raise: Custom exception on JSON encoding error
+        :return: The request payload [dict]
         """
 
-        server_url = server_url or self.server_url
-        plan_key = plan_key or self.plan_key
-
         # Execute all stages by default if no options received
         request_payload = {'stage&executeAllStages': [True]}
         if req_values:
@@ -354,102 +534,134 @@ class BambooAPIClient(BambooAccount):
 
                 request_payload["bamboo.{key}".format(key=key)] = [value]
 
+        return request_payload
+
+    def get_trigger_plan_url(self, server_url: str, plan_key: str) -> str:
+        """Get the URL used to trigger a plan build."""
         url = self.trigger_plan_url_mask.format(server_url=server_url)
-        url = f"{url}{plan_key}.json"
-        if self.verbose:
-            LOGGER.debug(f"URL used to trigger build: '{url}'")
+        return f"{url}{plan_key}.json"
 
-        # Trigger the build by performing a HTTP POST request and check HTTP response code
-        http_post_response = self.post_request(url=url, data=json.dumps(request_payload))
-        if http_post_response.status_code != 200:
-            return self.pack_response_to_client(
-                response=False, status_code=http_post_response.status_code, content=http_post_response.text, url=url
+    def get_stop_plan_url(self, server_url: str, plan_build_key: str) -> str:
+        """Get the URL used to stop a running plan build."""
+        url = self.stop_plan_url_mask.format(server_url=server_url)
+        return f"{url}?planResultKey={plan_build_key}"
+
+    def get_build_result_url(self, server_url: str, plan_build_key: str) -> str:
+        """Get the URL used to query the result of a single build."""
+        url = self.plan_results_url_mask.format(server_url=server_url)
+        return f"{url}{plan_build_key}.json"
+
+    def get_plan_results_url(
+            self,
+            server_url: str,
+            plan_key: str,
+            max_results: int = 10000,
+            start_index: int = None,
+            expand: str = None,
+            include_all_states: bool = False
+    ) -> str:
+        """Get the URL used to query the results of a plan, optionally starting at the <start_index>-th result and
+        expanding the results with the <expand> elements.
+        Bamboo only lists the finished results unless <include_all_states> is set: the queued and running builds are
+        listed too then.
+        """
+        url = self.plan_results_url_mask.format(server_url=server_url)
+        url = f"{url}{plan_key}.json?max-results={max_results}"
+        if start_index is not None:
+            url = f"{url}&start-index={start_index}"
+        if expand:
+            url = f"{url}&expand={expand}"
+        if include_all_states:
+            url = f"{url}&includeAllStates=true"
+
+        return url
+
+    @staticmethod
+    def unpack_plan_results_page(content: dict) -> tuple:
+        """Get the results listed in a page of plan results.
+        E.g.: {"results": {"size": 250, "start-index": 0, "max-result": 25, "result": [...]}}
+
+        :param content: Decoded JSON content of the page [dict]
+        :return: A tuple (results, total number of results); the total is None if unknown
+        """
+
+        results = content.get('results', {}) if isinstance(content, dict) else {}
+        if not isinstance(results, dict):
+            return [], None
+
+        return results.get('result', []), results.get('size')
+
+    def get_artifact_page_urls(
+            self, server_url: str, plan_build_key: str, job_name: str, artifact_names: tuple
+    ) -> list:
+        """Get the URLs of the pages listing the artifacts of a plan build job, one per artifact name."""
+        return [
+            self.artifact_url_mask.format(
+                server_url=server_url,
+                plan_build_key=plan_build_key,
+                job_name=job_name,
+                artifact_name=artifact_name
             )
+            for artifact_name in artifact_names
+        ]
+
+    def parse_artifact_page(self, page: str) -> list:
+        """Get the links listed in a Bamboo artifact page.
+
+        :param page: HTML content of the artifact page [str]
+        :return: A list of (link text, link href) tuples
+        :raise: Custom exception on parsing error
+        """
 
         try:
-            # Get the JSON reply from the web page
-            http_post_response.encoding = "utf-8"
-            response_json = http_post_response.json()
+            # page = requests.get(url).text  <-- Works if Bamboo plan does not require AUTH
+            with self.measure("parse", parser="html", bytes=len(page)):
+                return parse_artifact_links(page=page, backend=self.artifact_parser)
         except ValueError as exception:
-            error_message = f"Error encoding to JSON: {exception}"
+            error_message = f"Error when downloading artifact: {exception}"
             LOGGER.error(error_message)
-            exception = EncodingJSONException(error_message=error_message)
+            exception = DownloadErrorException(error_message=error_message)
             raise exception
         except Exception as exception:
-            error_message = f"Unknown error when trying to return json-encoded content: {exception}"
+            error_message = f"Unknown error when downloading artifact: {exception}"
             LOGGER.error(error_message)
-            exception = EncodingJSONException(error_message=error_message)
+            exception = DownloadErrorException(error_message=error_message)
             raise exception
 
-        # Send response to client
-        return self.pack_response_to_client(
-            response=True, status_code=http_post_response.status_code, content=response_json, url=url
-        )
-
-    @Validation.check_input
-    def stop_build(self, server_url: str = None, plan_build_key: str = None) -> dict:
-        """Stop a running plan build from Bamboo using Bamboo API.
-        This method is not officially supported, as so please be aware there might be conflicts when upgrading to a new
-        Bamboo version. What I have observed between Bamboo official release, is that the return code for the POST URL
-        returns different HTTP codes (like 200, 302). It all depends on the implementation in the Bamboo server.
+    def get_download_header(self, resume_offset: int = 0, if_range: str = None, cached_entry=None) -> dict:
+        """Get the HTTP header of an artifact download.
 
-        :param server_url: Bamboo server URL used in API call [str]
-        Optional. Use this if you have a cluster of Bamboo servers and need to swap between servers.
-        :param plan_build_key: Bamboo plan build key [str]
-        :return: A dictionary containing HTTP status_code and request content
+        :param resume_offset: Offset the download is resumed from; 0 to download the whole artifact [int]
+        :param if_range: Validator of the partial file, sent along with the range [str]
+        :param cached_entry: Cached entry of the artifact, revalidated by a conditional request
+        [bamboo.cache.ArtifactEntry]
+        :return: The HTTP header
         """
 
-        server_url = server_url or self.server_url
-
-        url = self.stop_plan_url_mask.format(server_url=server_url)
-        url = f"{url}?planResultKey={plan_build_key}"
-
-        if self.verbose:
-            LOGGER.debug(f"URL used to stop plan: '{url}'")
-
-        # Stop a build by performing a HTTP POST request and check HTTP response code
-        http_post_response = self.post_request(url=url)
-        if http_post_response.status_code not in [200, 302]:
-            return self.pack_response_to_client(
-                response=False, status_code=http_post_response.status_code, content=http_post_response.text, url=url
-            )
+        headers = dict(self.http_header)
+        # Byte ranges must refer to the artifact itself, not to a compressed representation of it
+        headers['Accept-Encoding'] = "identity"
+        if resume_offset:
+            headers['Range'] = f"bytes={resume_offset}-"
+            headers['If-Range'] = if_range
+        if cached_entry is not None:
+            headers.update(cached_entry.validators)
 
-        # Send response to client
-        return self.pack_response_to_client(
-            response=True, status_code=http_post_response.status_code, content=http_post_response, url=url
-        )
+        return headers
 
-    @Validation.check_input
-    def query_plan(self, server_url: str = None, plan_key: str = None) -> dict:
-        """Query a plan build using Bamboo API.
+    def load_json(self, content, fields: frozenset = None):
+        """Decode the JSON content of a HTTP response, using the JSON decoder of the client.
 
-        :param server_url: Bamboo server URL used in API call [str]
-        Optional. Use this if you have a cluster of Bamboo servers and need to swap between servers.
-        :param plan_key: Bamboo plan key [str]
-        :return: A dictionary containing HTTP status_code and request content
+        :param content: The response content, preferably as bytes [bytes/str]
+        :param fields: Names of the fields to keep, at any depth; the whole document by default (see
+        <bamboo.decoders.decode_json>) [frozenset]
+        :return: The decoded JSON document
         :raise: Custom exception on JSON encoding error
         """
 
-        server_url = server_url or self.server_url
-        plan_key = plan_key or self.plan_key
-
-        url = self.plan_results_url_mask.format(server_url=server_url)
-        url = f"{url}{plan_key}.json?max-results=10000"
-
-        if self.verbose:
-            LOGGER.debug(f"URL used in query: '{url}'")
-
-        # Query a build by performing a HTTP GET request and check HTTP response code
-        http_get_response = self.get_request(url=url)
-        if http_get_response.status_code != 200:
-            return self.pack_response_to_client(
-                response=False, status_code=http_get_response.status_code, content=http_get_response.text, url=url
-            )
-
         try:
-            # Get the JSON reply from the web page
-            http_get_response.encoding = "utf-8"
-            response_json = http_get_response.json()
+            with self.measure("parse", parser="json", bytes=len(content)):
+                return decode_json(content, decoder=self.json_decoder, fields=fields)
         except ValueError as exception:
             error_message = f"Error encoding to JSON: {exception}"
             LOGGER.error(error_message)
@@ -461,95 +673,1308 @@ class BambooAPIClient(BambooAccount):
             exception = EncodingJSONException(error_message=error_message)
             raise exception
 
-        # Send response to client
-        return self.pack_response_to_client(
-            response=True, status_code=http_get_response.status_code, content=response_json, url=url
-        )
 
-    @Validation.check_input
-    def query_job_for_artifacts(
+class BambooAPIClient(BambooAPIBase):
+    """Bamboo API client interface with the Bamboo server API.
+    Every client owns a HTTP session, opened on first use, holding one keep-alive connection pool per Bamboo server.
+    Please close the client once done with it, either by calling <close> or by using it as a context manager.
+    """
+
+    __slots__ = (
+        '__session', '__session_lock', '__pool_connections', '__pool_maxsize', '__pool_block', '__server_pool',
+        '__request_coalescer', '__request_governor', '__poll_coalescer'
+    )
+
+    def __init__(
             self,
-            server_url: str = None,
-            plan_build_key: str = None,
-            job_name: str = None,
-            artifact_names: tuple = None
-    ) -> dict:
-        """Query Bamboo plan run build for stage artifacts.
-        TODO: add support to get artifacts from sub-dirs as well
+            *args,
+            pool_connections: int = POOL_CONNECTIONS,
+            pool_maxsize: int = POOL_MAXSIZE,
+            pool_block: bool = False,
+            server_urls: list = None,
+            coalesce_requests: bool = False,
+            coalesced_result_ttl: float = None,
+            request_governor: RequestGovernor = None,
+            **kwargs
+    ) -> None:
+        """CTOR.
+        :param pool_connections: Number of Bamboo servers a connection pool is kept for [int]
+        :param pool_maxsize: Maximum number of connections kept per Bamboo server; use at least the number of threads
+        sharing the client, else connections are discarded and opened again [int]
+        :param pool_block: Wait for a free connection when the pool of a server is full, instead of opening a
+        connection that is discarded once used [bool]
+        :param server_urls: URLs of the nodes of a Bamboo server cluster; the read requests (plan results, artifact
+        pages, downloads) are load balanced across the nodes, with failover (see <server_pool>) [list]
+        :param coalesce_requests: Send identical parsed GET requests made at the same time by several threads once,
+        sharing the parsed result (see <get_parsed_request>); the threads then share the same content objects, so
+        this is off by default [bool]
+        :param coalesced_result_ttl: Number of seconds the parsed result of a coalesced request is reused for; not
+        reused once the request is over by default [float]
+        :param request_governor: Rate limiter and concurrency governor of the requests, per server (see
+        <request_governor>); requests are not limited by default [RequestGovernor]
+        The remaining params are the ones of <BambooAPIBase>.
+        """
+        super().__init__(*args, **kwargs)
+
+        self.__server_pool = None
+        if server_urls:
+            self.server_pool = ServerPool(server_urls=server_urls)
+            self.server_url = self.server_url or self.server_pool.server_urls[0]
+
+        self.__session = None
+        self.__session_lock = threading.Lock()
+        self.__pool_connections = pool_connections
+        self.__pool_maxsize = pool_maxsize
+        self.__pool_block = pool_block
+        self.__request_coalescer = SingleFlight(ttl=coalesced_result_ttl) if coalesce_requests else None
+        # Build polls are always coalesced, whatever <coalesce_requests>: waiters of a build only read its result
+        self.__poll_coalescer = SingleFlight()
+        self.__request_governor = request_governor
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the HTTP session of the client and its connections. A new one is opened if the client is used again."""
+        with self.__session_lock:
+            if self.__session is not None:
+                self.__session.close()
+                self.__session = None
 
-        :param server_url: Bamboo server URL used in API call [str]
-        Optional. Use this if you have a cluster of Bamboo servers and need to swap between servers.
-        :param plan_build_key: Bamboo plan build key [str]
-        :param job_name: Bamboo plan job name [str]
-        :param artifact_names: Names of the artifacts as in Bamboo plan stage job [tuple]
-        :return: A dictionary containing HTTP status_code, request content and list of artifacts
-        :raise: Custom exception on download error
+    @property
+    def session(self) -> requests.Session:
+        """Get the HTTP session of the client, opening it on first use."""
+        if self.__session is None:
+            with self.__session_lock:
+                if self.__session is None:
+                    self.__session = create_session(
+                        timeout=HTTP_TIMEOUT,
+                        pool_connections=self.__pool_connections,
+                        pool_maxsize=self.__pool_maxsize,
+                        pool_block=self.__pool_block,
+                        # Retried following the retry policy of the client instead
+                        max_retries=0
+                    )
+
+        return self.__session
+
+    @property
+    def server_pool(self) -> ServerPool:
+        """Get the pool of Bamboo server nodes the read requests are load balanced across; None if not in use."""
+        return self.__server_pool
+
+    @server_pool.setter
+    def server_pool(self, server_pool: ServerPool) -> None:
+        """Sets the pool of Bamboo server nodes the read requests are load balanced across (None to disable it).
+        GET requests to any of the nodes are sent to the best node at the time, and fail over to the other nodes when
+        the node cannot be reached or answers with HTTP 5xx. POST requests (trigger/stop builds) are never rerouted.
         """
+        self.__server_pool = server_pool
 
-        server_url = server_url or self.server_url
+    @property
+    def request_coalescer(self) -> SingleFlight:
+        """Get the single-flight layer coalescing the identical parsed GET requests; None if disabled."""
+        return self.__request_coalescer
 
-        # Artifacts to return
-        artifacts = dict()
+    @property
+    def request_governor(self) -> RequestGovernor:
+        """Get the rate limiter and concurrency governor of the requests; None if the requests are not limited."""
+        return self.__request_governor
+
+    @request_governor.setter
+    def request_governor(self, request_governor: RequestGovernor) -> None:
+        """Sets the rate limiter and concurrency governor of the requests (None to disable it).
+        Every request (retries included) waits for a free slot and for the request rate of its server, both set per
+        server and optionally shared with the other processes of the machine. The request rate of a server is lowered
+        when it answers with HTTP 429/503, and grows back while it answers normally.
+        """
+        self.__request_governor = request_governor
 
-        http_failed_conn_counter = 0
-        for artifact_name in artifact_names:
-            url = self.artifact_url_mask.format(
-                server_url=server_url,
-                plan_build_key=plan_build_key,
-                job_name=job_name,
-                artifact_name=artifact_name
+    @property
+    def pool_stats(self) -> dict:
+        """Get the connection pool statistics per Bamboo server: number of requests, of new connections opened, of
+        requests sent over a reused connection and of idle connections.
+        """
+        if self.__session is None:
+            return {}
+
+        return get_pool_stats(self.__session)
+
+    @property
+    def auth(self):
+        """Determine if we need to use AUTH or not."""
+        if self.is_auth_enabled:
+            return HTTPBasicAuth(self.username, self.password)
+
+        return ()
+
+    def get_request(self, **values_to_unpack) -> requests:
+        """Performs a HTTP GET request to the Bamboo server.
+        Requests to the nodes of the server pool, if any, are load balanced across the nodes, with failover.
+        Requests failing on a transient error are retried following the retry policy (see <retry_policy>); the last
+        response is returned once the retries are over.
+
+        :param values_to_unpack: Values to un-pack in order to construct the HTTP Get request; 'retry_policy'
+        overrides the retry policy of the client for this request
+        :return: A requests response object
+        :raise: Custom exception on HTTP communication errors
+        """
+        return self.__send_with_retries(self.__route_get_request, method="GET", **values_to_unpack)
+
+    def __route_get_request(self, **values_to_unpack) -> requests:
+        """Performs a HTTP GET request, to the nodes of the server pool if the URL is the one of a node.
+
+        :param values_to_unpack: Values to un-pack in order to construct the HTTP Get request
+        :return: A requests response object
+        :raise: Custom exception on HTTP communication errors
+        """
+
+        server_pool = self.server_pool
+        url_path = server_pool.split_url(values_to_unpack.get('url', "")) if server_pool is not None else None
+        if url_path is None:
+            return self.__send_get_request(**values_to_unpack)
+
+        return self.__send_balanced_get_request(server_pool=server_pool, url_path=url_path, **values_to_unpack)
+
+    def __send_with_retries(
+            self, send, method: str, retry_policy: RetryPolicy = None, idempotent: bool = None, **values_to_unpack
+    ) -> requests:
+        """Performs a HTTP request, sending it again on transient errors following its retry policy.
+
+        :param send: Function performing the request [callable]
+        :param method: HTTP method of the request [str]
+        :param retry_policy: Retry policy of the request, overriding the ones of the client [RetryPolicy]
+        :param idempotent: Whether the request is safe to send twice; guessed from the method by default [bool]
+        :param values_to_unpack: Values to un-pack in order to construct the HTTP request
+        :return: A requests response object
+        :raise: Custom exception on HTTP communication errors, once the retries are over
+        """
+
+        retry_policy = self.get_retry_policy(method, retry_policy=retry_policy)
+        retry_policy.record_request()
+
+        retry_number = 1
+        while True:
+            try:
+                response = self.__send_measured(send, method=method, attempt=retry_number, **values_to_unpack)
+            except HTTPErrorException as exception:
+                delay = retry_policy.get_retry_delay(
+                    method, retry_number, idempotent=idempotent, is_request_sent=exception.is_request_sent
+                )
+                if delay is None:
+                    raise
+            else:
+                delay = retry_policy.get_retry_delay(
+                    method, retry_number, idempotent=idempotent, status_code=response.status_code,
+                    headers=response.headers
+                )
+                if delay is None:
+                    return response
+
+                LOGGER.warning(f"HTTP {response.status_code} when requesting URL: '{response.url}'")
+                response.close()
+
+            LOGGER.warning(f"Retrying {method} request in {delay:.1f}s (retry {retry_number}/{retry_policy.total})")
+            time.sleep(delay)
+            retry_number += 1
+
+    def __send_measured(self, send, method: str, attempt: int, **values_to_unpack) -> requests:
+        """Performs a HTTP request, reporting its timings to the instrumentation, if any.
+
+        :param send: Function performing the request [callable]
+        :param method: HTTP method of the request [str]
+        :param attempt: Number of the attempt, retries having an attempt above 1 [int]
+        :param values_to_unpack: Values to un-pack in order to construct the HTTP request
+        :return: A requests response object
+        :raise: Custom exception on HTTP communication errors
+        """
+
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            return send(**values_to_unpack)
+
+        timings = start_connection_timings()
+        start_time = time.perf_counter()
+        response, error = None, None
+        try:
+            response = send(**values_to_unpack)
+            return response
+        except Exception as exception:
+            error = type(exception).__name__
+            raise
+        finally:
+            end_time = time.perf_counter()
+            stop_connection_timings()
+            # Body bytes read off the wire so far: none yet for streamed responses
+            raw_response = getattr(response, 'raw', None)
+            instrumentation.emit({
+                'event': "request",
+                'api_method': get_api_method(),
+                'http_method': method,
+                'host': get_host(response.url if response is not None else values_to_unpack.get('url', "")),
+                'status_code': None if response is None else response.status_code,
+                'error': error,
+                'attempt': attempt,
+                'dns_time': timings.dns_time,
+                'connect_time': timings.connect_time,
+                'tls_time': timings.tls_time,
+                'ttfb': None if timings.response_time is None else timings.response_time - start_time,
+                'total_time': end_time - start_time,
+                'bytes_sent': timings.bytes_sent,
+                'bytes_received': raw_response.tell() if hasattr(raw_response, 'tell') else 0,
+                'connection_reused': response is not None and not timings.new_connections
+            })
+
+    def __send_balanced_get_request(self, server_pool: ServerPool, url_path: str, **values_to_unpack) -> requests:
+        """Performs a HTTP GET request to the best node of a server pool, failing over to the next ones.
+
+        :param server_pool: Pool of Bamboo server nodes [ServerPool]
+        :param url_path: Requested URL, without the node URL [str]
+        :param values_to_unpack: Values to un-pack in order to construct the HTTP Get request
+        :return: A requests response object
+        :raise: Custom exception on HTTP communication errors, once all the nodes failed
+        """
+
+        candidates = server_pool.get_candidates()
+        for attempt, server_url in enumerate(candidates, start=1):
+            values_to_unpack['url'] = f"{server_url}{url_path}"
+
+            start_time = server_pool.start_request(server_url)
+            try:
+                response = self.__send_get_request(**values_to_unpack)
+            except HTTPErrorException:
+                server_pool.finish_request(server_url=server_url, start_time=start_time, success=False)
+                if attempt == len(candidates):
+                    raise
+                continue
+
+            is_server_error = response.status_code >= 500
+            server_pool.finish_request(server_url=server_url, start_time=start_time, success=not is_server_error)
+            if is_server_error and attempt < len(candidates):
+                LOGGER.warning(f"Bamboo server '{server_url}' answered with HTTP {response.status_code}, failing over")
+                response.close()
+                continue
+
+            return response
+
+    def __send_get_request(self, **values_to_unpack) -> requests:
+        """Performs a HTTP GET request.
+
+        :param values_to_unpack: Values to un-pack in order to construct the HTTP Get request
+        :return: A requests response object
+        :raise: Custom exception on HTTP communication errors
+        """
+
+        url = values_to_unpack.get('url', "")
+        headers = values_to_unpack.get('header', "") or self.http_header
+        timeout = values_to_unpack.get('timeout', 60)
+        allow_redirects = values_to_unpack.get('allow_redirects', False)
+        stream = values_to_unpack.get('stream', False)
+
+        try:
+            response = self.__send_governed(self.session.get,
+                                            url=url,
+                                            auth=self.auth,
+                                            headers=headers,
+                                            timeout=timeout,
+                                            allow_redirects=allow_redirects,
+                                            stream=stream)
+        except (
+            requests.ConnectionError, requests.ConnectTimeout, requests.HTTPError,
+            requests.RequestException, requests.Timeout
+        ) as exception:
+            error_message = f"Error when requesting URL: '{url}'{LINE_SEP}{exception}"
+            LOGGER.error(error_message)
+            exception = HTTPErrorException(error_message=error_message, is_request_sent=is_request_sent(exception))
+            raise exception
+        except Exception as exception:
+            error_message = f"Unknown error when requesting URL: '{url}'{LINE_SEP}{exception}"
+            LOGGER.error(error_message)
+            exception = HTTPErrorException(error_message=error_message)
+            raise exception
+
+        return response
+
+    def __send_governed(self, send, url: str, **values_to_unpack) -> requests:
+        """Sends a HTTP request within the limits of the request governor, if any, reporting the response to it.
+        The request slot of a streamed response is held until the response is closed, once its body was read.
+
+        :param send: Session method sending the request [callable]
+        :param url: URL to request [str]
+        :param values_to_unpack: Remaining arguments of the request
+        :return: A requests response object
+        """
+
+        request_governor = self.request_governor
+        if request_governor is None:
+            return send(url=url, **values_to_unpack)
+
+        with ExitStack() as request_slot:
+            server_limiter = request_slot.enter_context(request_governor.limit(url))
+            response = send(url=url, **values_to_unpack)
+            if values_to_unpack.get('stream'):
+                release_on_close(response, request_slot.pop_all().close)
+
+        server_limiter.record_status(response.status_code)
+        return response
+
+    def post_request(self, **values_to_unpack) -> requests:
+        """Performs a HTTP POST request to the Bamboo server.
+        Requests failing on a transient error are retried following the retry policy (see <retry_policy>), only if
+        they never reached the server, unless flagged as idempotent.
+
+        :param values_to_unpack: Values to un-pack in order to construct the HTTP POST request; 'retry_policy'
+        overrides the retry policy of the client for this request, 'idempotent' flags a request safe to send twice
+        :return: A requests response object
+        :raise: Custom exception on HTTP communication errors
+        """
+        return self.__send_with_retries(self.__send_post_request, method="POST", **values_to_unpack)
+
+    def __send_post_request(self, **values_to_unpack) -> requests:
+        """Performs a HTTP POST request.
+
+        :param values_to_unpack: Values to un-pack in order to construct the HTTP POST request
+        :return: A requests response object
+        :raise: Custom exception on HTTP communication errors
+        """
+
+        url = values_to_unpack.get('url', "")
+        headers = values_to_unpack.get('header', "") or self.http_header
+        data = values_to_unpack.get('data', {})
+        timeout = values_to_unpack.get('timeout', 30)
+        allow_redirects = values_to_unpack.get('allow_redirects', False)
+
+        try:
+            response = self.__send_governed(self.session.post,
+                                            url=url,
+                                            auth=self.auth,
+                                            headers=headers,
+                                            data=data,
+                                            timeout=timeout,
+                                            allow_redirects=allow_redirects)
+        except (
+            requests.ConnectionError, requests.ConnectTimeout, requests.HTTPError,
+            requests.RequestException, requests.Timeout
+        ) as exception:
+            error_message = f"Error when requesting URL: '{url}'{LINE_SEP}{exception}"
+            LOGGER.error(error_message)
+            exception = HTTPErrorException(error_message=error_message, is_request_sent=is_request_sent(exception))
+            raise exception
+        except Exception as exception:
+            error_message = f"Unknown error when requesting URL: '{url}'{LINE_SEP}{exception}"
+            LOGGER.error(error_message)
+            exception = HTTPErrorException(error_message=error_message)
+            raise exception
+
+        return response
+
+    def get_parsed_request(self, parser, variant: str = None, **values_to_unpack) -> tuple:
+        """Performs a HTTP GET request to the Bamboo server and parses the response, going through the response cache.
+        When a response cache is set, the request is made conditional on the validators of the cached entry: on HTTP
+        304 the cached content is returned with a HTTP 200 status code, skipping the download and the parsing.
+        When request coalescing is enabled, threads asking for the same URL, variant and retry policy with the same
+        credentials while the request is in flight (or its result is kept, see <coalesced_result_ttl>) wait for it and
+        share its outcome: please treat the content as read-only.
+
+        :param parser: Callable getting the content of a HTTP 200 response [callable]
+        :param variant: Name of the form of the parsed content, when a URL is parsed in several ways (e.g. models);
+        parsed contents are cached and shared per URL and variant [str]
+        :param values_to_unpack: Values to un-pack in order to construct the HTTP Get request (see <get_request>)
+        :return: A tuple (status_code, content, response); content is None if status_code is not 200
+        :raise: Custom exception on HTTP communication errors
+        """
+
+        request_coalescer = self.request_coalescer
+        if request_coalescer is None:
+            return self.__get_parsed_request(parser, variant, **values_to_unpack)
+
+        # Parsers are built per call: the variant tells the form of the parsed content instead
+        retry_policy = self.get_retry_policy("GET", retry_policy=values_to_unpack.get('retry_policy'))
+        request_key = ('GET', self.username, values_to_unpack.get('url', ""), variant, retry_policy)
+        return request_coalescer.do(request_key, self.__get_parsed_request, parser, variant, **values_to_unpack)
+
+    def __get_parsed_request(self, parser, variant: str = None, **values_to_unpack) -> tuple:
+        """Performs a HTTP GET request and parses the response, going through the response cache.
+
+        :param parser: Callable getting the content of a HTTP 200 response [callable]
+        :param variant: Name of the form of the parsed content [str]
+        :param values_to_unpack: Values to un-pack in order to construct the HTTP Get request (see <get_request>)
+        :return: A tuple (status_code, content, response); content is None if status_code is not 200
+        :raise: Custom exception on HTTP communication errors
+        """
+
+        url = values_to_unpack.get('url', "")
+        cache = self.response_cache
+        # Responses depend on the permissions of the user
+        cache_key = f"{self.username}@{url}" if variant is None else f"{self.username}@{url}#{variant}"
+
+        cached_entry = cache.get(cache_key) if cache is not None else None
+        if cached_entry is not None:
+            values_to_unpack['header'] = dict(values_to_unpack.get('header') or self.http_header)
+            values_to_unpack['header'].update(cached_entry.validators)
+
+        http_get_response = self.get_request(**values_to_unpack)
+        if cached_entry is not None and http_get_response.status_code == 304:
+            cache.revalidated(cache_key, cached_entry)
+            if cached_entry.body is None:
+                return 200, cached_entry.content, http_get_response
+
+            # Entries read from disk hold the raw response only
+            return 200, parser(self.__get_cached_response(cached_entry, url)), http_get_response
+
+        if http_get_response.status_code != 200:
+            return http_get_response.status_code, None, http_get_response
+
+        content = parser(http_get_response)
+
+        etag = http_get_response.headers.get('ETag')
+        last_modified = http_get_response.headers.get('Last-Modified')
+        if cache is not None and (etag or last_modified):
+            # Imported on first use: the response cache is disabled by default
+            from bamboo.cache import CacheEntry
+
+            cache.set(cache_key, CacheEntry(
+                etag=etag, last_modified=last_modified, content=content, size=len(http_get_response.content),
+                status_code=http_get_response.status_code, headers=dict(http_get_response.headers),
+                body=http_get_response.content
+            ))
+
+        return http_get_response.status_code, content, http_get_response
+
+    @staticmethod
+    def __get_cached_response(cached_entry: 'CacheEntry', url: str) -> requests.Response:
+        """Get the HTTP response held by a cache entry, to parse it again."""
+
+        response = requests.Response()
+        response.status_code = cached_entry.status_code
+        response.headers.update(cached_entry.headers or {})
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(cached_entry.body)
+        response.url = url
+        return response
+
+    def decode_json_response(self, response: requests.Response, fields: frozenset = None):
+        """Get the JSON content of a HTTP response, decoded straight from the response bytes.
+
+        :param response: The HTTP response [requests.Response]
+        :param fields: Names of the fields to keep, at any depth; the whole document by default [frozenset]
+        :return: The decoded JSON document
+        :raise: Custom exception on JSON encoding error
+        """
+        return self.load_json(response.content, fields=fields)
+
+    def get_results_parser(self, raw: bool = True, fields: frozenset = None) -> tuple:
+        """Get the parser of the plan results responses, along with the variant of the parsed content.
+
+        :param raw: Get the decoded JSON document, instead of its model (see <bamboo.models.decode_results>) [bool]
+        :param fields: Names of the fields to keep, at any depth; the whole document by default [frozenset]
+        :return: A tuple (parser, variant) to pass to <get_parsed_request>
+        """
+
+        fields = frozenset(fields) if fields else None
+
+        def parse_results(response: requests.Response):
+            content = self.decode_json_response(response, fields=fields)
+            if raw:
+                return content
+
+            with self.measure("parse", parser="models", bytes=None):
+                return decode_results(content)
+
+        variant_parts = []
+        if not raw:
+            variant_parts.append("models")
+        if fields:
+            variant_parts.append(f"fields={','.join(sorted(fields))}")
+
+        return parse_results, ";".join(variant_parts) or None
+
+    @instrumented
+    @Validation.check_input
+    def trigger_plan_build(self, server_url: str = None, plan_key: str = None, req_values: tuple = None) -> dict:
+        """Trigger a plan build using Bamboo API.
+        TODO: deal with errors from plan restriction, like strict no of plans to build
+
+        :param server_url: Bamboo server URL used in API call [str]
+        Optional. Use this if you have a cluster of Bamboo servers and need to swap between servers.
+        :param plan_key: Bamboo plan key [str]
+        :param req_values: Values to insert into request (tuple)
+        :return: A dictionary containing HTTP status_code and request content
+        :raise: Custom exception on JSON encoding error
+        """
+
+        server_url = server_url or self.server_url
+        plan_key = plan_key or self.plan_key
+
+        return self.__trigger_plan_build(server_url=server_url, plan_key=plan_key, req_values=req_values)
+
+    @instrumented
+    def trigger_plan_builds(
+            self,
+            plans: list = None,
+            server_url: str = None,
+            max_in_flight: int = TRIGGER_MAX_IN_FLIGHT,
+            max_rate: float = None
+    ) -> dict:
+        """Trigger several plan builds at the same time, over the keep-alive HTTP session of the client.
+        The input is validated once for the whole batch. Bamboo refuses to queue builds above its concurrent build
+        limits, so keep <max_in_flight>/<max_rate> in line with the server settings; refused triggers, like any other
+        error, are reported in the result of the corresponding plan and do not abort the others.
+
+        :param plans: Plans to trigger: a list of (plan_key, req_values) tuples, every plan key listed once; see
+        <trigger_plan_build> for req_values [list]
+        :param server_url: Bamboo server URL used in API call [str]
+        Optional. Use this if you have a cluster of Bamboo servers and need to swap between servers.
+        :param max_in_flight: Maximum number of trigger requests sent at the same time [int]
+        :param max_rate: Maximum number of trigger requests sent per second; no limit by default [float]
+        :return: A dictionary mapping every plan key to a dictionary containing HTTP status_code and request content,
+        as returned by <trigger_plan_build>; {'content': "Incorrect input provided!"} if the plans, <max_in_flight>
+        or <max_rate> are not valid
+        """
+
+        server_url = server_url or self.server_url
+        if not server_url:
+            return {'content': "Error in <trigger_plan_builds> method: No Bamboo server supplied!"}
+
+        plan_keys = [plan_key for plan_key, _ in plans or ()]
+        if not plan_keys or not all(plan_keys) or len(set(plan_keys)) != len(plan_keys):
+            return {'content': "Incorrect input provided!"}
+
+        # Checked here, instead of failing in the thread pool or the rate limiter
+        if not Validation.is_positive(max_in_flight, int) or not (max_rate is None or Validation.is_positive(max_rate)):
+            return {'content': "Incorrect input provided!"}
+
+        # No burst: the triggers are spread evenly over time
+        rate_limiter = TokenBucket(rate=max_rate, capacity=1) if max_rate else None
+
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            futures = {
+                plan_key: executor.submit(
+                    self.__trigger_plan_build_no_raise,
+                    server_url=server_url,
+                    plan_key=plan_key,
+                    req_values=req_values,
+                    rate_limiter=rate_limiter
+                )
+                for plan_key, req_values in plans
+            }
+
+        # Send response to client
+        return {plan_key: future.result() for plan_key, future in futures.items()}
+
+    def __trigger_plan_build_no_raise(self, rate_limiter: TokenBucket = None, **values_to_unpack) -> dict:
+        """Trigger a plan build once allowed by the rate limiter, reporting errors in the response.
+
+        :param rate_limiter: Limiter bounding the rate of the trigger requests [TokenBucket]
+        :param values_to_unpack: <__trigger_plan_build> arguments
+        :return: A dictionary containing HTTP status_code and request content
+        """
+
+        if rate_limiter is not None:
+            rate_limiter.consume()
+
+        try:
+            return self.__trigger_plan_build(**values_to_unpack)
+        except (EncodingJSONException, HTTPErrorException) as exception:
+            url = self.get_trigger_plan_url(
+                server_url=values_to_unpack['server_url'], plan_key=values_to_unpack['plan_key']
+            )
+            return self.pack_response_to_client(response=False, status_code=None, content=str(exception), url=url)
+
+    def __trigger_plan_build(self, server_url: str, plan_key: str, req_values: tuple = None) -> dict:
+        """Trigger a plan build, once the input is validated.
+
+        :param server_url: Bamboo server URL used in API call [str]
+        :param plan_key: Bamboo plan key [str]
+        :param req_values: Values to insert into request (tuple)
+        :return: A dictionary containing HTTP status_code and request content
+        :raise: Custom exception on JSON encoding error
+        """
+
+        request_payload = self.build_trigger_plan_payload(req_values)
+
+        url = self.get_trigger_plan_url(server_url=server_url, plan_key=plan_key)
+        if self.verbose:
+            LOGGER.debug(f"URL used to trigger build: '{url}'")
+
+        # Trigger the build by performing a HTTP POST request and check HTTP response code
+        http_post_response = self.post_request(url=url, data=json.dumps(request_payload))
+        if http_post_response.status_code != 200:
+            return self.pack_response_to_client(
+                response=False, status_code=http_post_response.status_code, content=http_post_response.text, url=url
+            )
+
+        response_json = self.decode_json_response(http_post_response)
+
+        # Send response to client
+        return self.pack_response_to_client(
+            response=True, status_code=http_post_response.status_code, content=response_json, url=url
+        )
+
+    @instrumented
+    @Validation.check_input
+    def stop_build(self, server_url: str = None, plan_build_key: str = None) -> dict:
+        """Stop a running plan build from Bamboo using Bamboo API.
+        This method is not officially supported, as so please be aware there might be conflicts when upgrading to a new
+        Bamboo version. What I have observed between Bamboo official release, is that the return code for the POST URL
+        returns different HTTP codes (like 200, 302). It all depends on the implementation in the Bamboo server.
+
+        :param server_url: Bamboo server URL used in API call [str]
+        Optional. Use this if you have a cluster of Bamboo servers and need to swap between servers.
+        :param plan_build_key: Bamboo plan build key [str]
+        :return: A dictionary containing HTTP status_code and request content
+        """
+
+        server_url = server_url or self.server_url
+
+        url = self.get_stop_plan_url(server_url=server_url, plan_build_key=plan_build_key)
+
+        if self.verbose:
+            LOGGER.debug(f"URL used to stop plan: '{url}'")
+
+        # Stop a build by performing a HTTP POST request and check HTTP response code
+        # Stopping a build twice is harmless
+        http_post_response = self.post_request(url=url, idempotent=True)
+        if http_post_response.status_code not in [200, 302]:
+            return self.pack_response_to_client(
+                response=False, status_code=http_post_response.status_code, content=http_post_response.text, url=url
+            )
+
+        # Send response to client
+        return self.pack_response_to_client(
+            response=True, status_code=http_post_response.status_code, content=http_post_response, url=url
+        )
+
+    @instrumented
+    @Validation.check_input
+    def query_plan(
+            self, server_url: str = None, plan_key: str = None, raw: bool = True, fields: frozenset = None
+    ) -> dict:
+        """Query a plan build using Bamboo API.
+        Up to 10000 results are requested at once: please use <iter_plan_results> to walk long plan histories.
+
+        :param server_url: Bamboo server URL used in API call [str]
+        Optional. Use this if you have a cluster of Bamboo servers and need to swap between servers.
+        :param plan_key: Bamboo plan key [str]
+        :param raw: Return the decoded JSON document as content, instead of a <bamboo.models.PlanResult> (or of a
+        <bamboo.models.BuildResult> when querying a single build), which takes far less memory [bool]
+        :param fields: Names of the fields to keep, at any depth, e.g. {'buildNumber', 'buildState'}: the rest of the
+        document is dropped while decoding, which saves time and memory on long plan histories [frozenset]
+        :return: A dictionary containing HTTP status_code and request content
+        :raise: Custom exception on JSON encoding error
+        """
+
+        server_url = server_url or self.server_url
+        plan_key = plan_key or self.plan_key
+
+        url = self.get_plan_results_url(server_url=server_url, plan_key=plan_key)
+
+        if self.verbose:
+            LOGGER.debug(f"URL used in query: '{url}'")
+
+        # Query a build by performing a HTTP GET request and check HTTP response code
+        parser, variant = self.get_results_parser(raw=raw, fields=fields)
+        status_code, response_content, http_get_response = self.get_parsed_request(
+            parser=parser, variant=variant, url=url
+        )
+        if status_code != 200:
+            return self.pack_response_to_client(
+                response=False, status_code=status_code, content=http_get_response.text, url=url
             )
 
-            if self.verbose:
-                LOGGER.debug(f"URL used to query for artifacts: '{url}'")
+        # Send response to client
+        return self.pack_response_to_client(
+            response=True, status_code=status_code, content=response_content, url=url
+        )
+
+    @instrumented
+    @Validation.check_input
+    def wait_for_build(
+            self,
+            server_url: str = None,
+            plan_build_key: str = None,
+            timeout: float = None,
+            min_interval: float = BUILD_POLL_MIN_INTERVAL,
+            max_interval: float = BUILD_POLL_MAX_INTERVAL
+    ) -> dict:
+        """Wait for a build to finish (see <wait_for_builds>).
+
+        :param server_url: Bamboo server URL used in API call [str]
+        Optional. Use this if you have a cluster of Bamboo servers and need to swap between servers.
+        :param plan_build_key: Bamboo plan build key [str]
+        :param timeout: Maximum number of seconds to wait; no limit by default [float]
+        :param min_interval: Number of seconds between the first polls of the build [float]
+        :param max_interval: Maximum number of seconds between two polls of the build [float]
+        :return: A dictionary containing HTTP status_code and the build result as request content
+        """
 
-            # Query a build by performing a HTTP GET request and check HTTP response code
-            http_get_response = self.get_request(url=url)
-            if http_get_response.status_code != 200:
-                http_failed_conn_counter += 1
+        return self.wait_for_builds(
+            plan_build_keys=[plan_build_key],
+            server_url=server_url,
+            timeout=timeout,
+            min_interval=min_interval,
+            max_interval=max_interval
+        )[plan_build_key]
+
+    @instrumented
+    def wait_for_builds(
+            self,
+            plan_build_keys: list = None,
+            server_url: str = None,
+            timeout: float = None,
+            min_interval: float = BUILD_POLL_MIN_INTERVAL,
+            max_interval: float = BUILD_POLL_MAX_INTERVAL
+    ) -> dict:
+        """Wait for several builds to finish, polling the result of every build on its own.
+        The interval between two polls of a build doubles every time the build did not move forward, up to
+        <max_interval>, and is randomized (jitter) so waiters do not poll in lockstep. Polls of the same build by
+        several threads at the same time are sent once, whether request coalescing is enabled or not (see
+        <coalesce_requests>). Connection errors and HTTP 5xx replies are retried; other errors end the wait for the
+        build.
+
+        :param plan_build_keys: Bamboo plan build keys [list]
+        :param server_url: Bamboo server URL used in API call [str]
+        Optional. Use this if you have a cluster of Bamboo servers and need to swap between servers.
+        :param timeout: Maximum number of seconds to wait; no limit by default [float]
+        :param min_interval: Number of seconds between the first polls of a build [float]
+        :param max_interval: Maximum number of seconds between two polls of a build [float]
+        :return: A dictionary mapping every plan build key to a dictionary containing HTTP status_code and the build
+        result as request content; builds not finished before the timeout get a response set to False
+        """
+
+        server_url = server_url or self.server_url
+        if not server_url:
+            return {'content': "Error in <wait_for_builds> method: No Bamboo server supplied!"}
+
+        if not plan_build_keys or not all(plan_build_keys):
+            return {'content': "Incorrect input provided!"}
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        results = dict()
+        # Polls to send: (time, plan build key, current interval, last life cycle state seen), first one first
+        schedule = [(0.0, plan_build_key, min_interval, None) for plan_build_key in dict.fromkeys(plan_build_keys)]
+        while schedule:
+            poll_time, plan_build_key, interval, life_cycle_state = heapq.heappop(schedule)
+            time.sleep(max(0.0, poll_time - time.monotonic()))
+
+            result, is_final = self.__poll_build(server_url=server_url, plan_build_key=plan_build_key)
+            if is_final:
+                results[plan_build_key] = result
                 continue
 
-            try:
-                # page = requests.get(url).text  <-- Works if Bamboo plan does not require AUTH
-                soup = BeautifulSoup(http_get_response.text, 'html.parser')
-                # All "<a href></a>" elements
-                a_href_elements = (soup.find_all('a', href=True))
-
-                for a_href_element in a_href_elements:
-                    file_path = a_href_element['href']
-                    file_name = a_href_element.extract().get_text()
-
-                    # Do not add HREF value in case PAGE NOT FOUND error
-                    if file_name != "Site homepage":
-                        artifacts[file_name] = f"{server_url}{file_path}"
-            except ValueError as exception:
-                error_message = f"Error when downloading artifact: {exception}"
-                LOGGER.error(error_message)
-                exception = DownloadErrorException(error_message=error_message)
-                raise exception
-            except Exception as exception:
-                error_message = f"Unknown error when downloading artifact: {exception}"
-                LOGGER.error(error_message)
-                exception = DownloadErrorException(error_message=error_message)
-                raise exception
+            if deadline is not None and time.monotonic() >= deadline:
+                results[plan_build_key] = self.__get_build_timeout_response(server_url, plan_build_key, timeout)
+                continue
 
-        http_return_code = 200
-        if http_failed_conn_counter == len(artifact_names):
-            http_return_code = 444
+            new_life_cycle_state = (result.get('content') or {}).get('lifeCycleState') if result['response'] else None
+            # Back off while the build does not move forward
+            if new_life_cycle_state == life_cycle_state:
+                interval = min(interval * 2, max_interval)
+            next_poll_time = time.monotonic() + random.uniform(interval / 2, interval)
+            # Last poll right at the deadline
+            if deadline is not None:
+                next_poll_time = min(next_poll_time, deadline)
+            heapq.heappush(schedule, (next_poll_time, plan_build_key, interval, new_life_cycle_state))
+
+        # Send response to client
+        return {plan_build_key: results[plan_build_key] for plan_build_key in plan_build_keys}
+
+    def __poll_build(self, server_url: str, plan_build_key: str) -> tuple:
+        """Get the result of a build; polls of the same build by other threads at the same time are coalesced.
+
+        :return: A tuple (dictionary containing HTTP status_code and request content, whether the wait is over)
+        """
+
+        url = self.get_build_result_url(server_url=server_url, plan_build_key=plan_build_key)
+
+        if self.verbose:
+            LOGGER.debug(f"URL used to poll build: '{url}'")
+
+        try:
+            # Failed polls are retried by the poll schedule, within the timeout of the wait
+            status_code, response_json, http_get_response = self.__poll_coalescer.do(
+                url, self.get_parsed_request, parser=self.decode_json_response, url=url, retry_policy=NO_RETRY
+            )
+        except (EncodingJSONException, HTTPErrorException) as exception:
+            response_to_client = self.pack_response_to_client(
+                response=False, status_code=None, content=str(exception), url=url
+            )
+            return response_to_client, False
+
+        if status_code != 200:
+            response_to_client = self.pack_response_to_client(
+                response=False, status_code=status_code, content=http_get_response.text, url=url
+            )
+            return response_to_client, status_code < 500
 
         response_to_client = self.pack_response_to_client(
-            response=True, status_code=http_return_code, content=None, url=None
+            response=True, status_code=status_code, content=response_json, url=url
+        )
+        return response_to_client, response_json.get('lifeCycleState') in FINAL_LIFE_CYCLE_STATES
+
+    def __get_build_timeout_response(self, server_url: str, plan_build_key: str, timeout: float) -> dict:
+        """Get the response reporting a build not finished in time."""
+        url = self.get_build_result_url(server_url=server_url, plan_build_key=plan_build_key)
+        return self.pack_response_to_client(
+            response=False, status_code=None, content=f"Build not finished after {timeout} seconds", url=url
+        )
+
+    @Validation.check_iterator_input
+    def iter_plan_results(
+            self,
+            server_url: str = None,
+            plan_key: str = None,
+            page_size: int = PLAN_RESULTS_PAGE_SIZE,
+            since: int = None,
+            max_results: int = None
+    ):
+        """Walk the results of a plan using Bamboo API, newest first, one page of results at a time.
+        Pages are requested lazily, only once the results of the previous page were consumed, so stopping the iteration
+        early (or using <since>/<max_results>) saves the remaining requests.
+
+        :param server_url: Bamboo server URL used in API call [str]
+        Optional. Use this if you have a cluster of Bamboo servers and need to swap between servers.
+        :param plan_key: Bamboo plan key [str]
+        :param page_size: Number of results requested at once [int]
+        :param since: Stop at the first result with a build number lower or equal to this one [int]
+        :param max_results: Stop after this many results, e.g. to get the N most recent builds [int]
+        :return: A generator of plan results, as decoded from the JSON pages
+        :raise: ValueError if the Bamboo server or plan key is missing
+        :raise: Custom exception on HTTP communication errors (HTTP code other than 200 included)
+        :raise: Custom exception on JSON encoding error
+        """
+
+        server_url = server_url or self.server_url
+        plan_key = plan_key or self.plan_key
+
+        return self.__iter_plan_results(
+            server_url=server_url, plan_key=plan_key, page_size=page_size, since=since, max_results=max_results
         )
-        response_to_client['artifacts'] = artifacts
+
+    @instrumented
+    @Validation.check_input
+    def sync_plan_results(
+            self,
+            server_url: str = None,
+            plan_key: str = None,
+            index: 'PlanResultsIndex' = None,
+            page_size: int = PLAN_RESULTS_PAGE_SIZE
+    ) -> dict:
+        """Fetch the plan results missing from a local index and add them to it.
+        Only the results newer than the latest one in the index are fetched, plus the ones still running on the
+        previous sync. Polling a plan costs one page of results instead of its whole history, while the latest builds
+        and the status of a build are read from the index (<PlanResultsIndex.get_latest_results>/<get_result>).
+
+        :param server_url: Bamboo server URL used in API call [str]
+        Optional. Use this if you have a cluster of Bamboo servers and need to swap between servers.
+        :param plan_key: Bamboo plan key [str]
+        :param index: Index of the plan results already fetched [PlanResultsIndex]
+        :param page_size: Number of results requested at once [int]
+        :return: A dictionary containing HTTP status_code and request content (the new or updated results)
+        :raise: Custom exception on HTTP communication errors (HTTP code other than 200 included)
+        :raise: Custom exception on JSON encoding error
+        """
+
+        if index is None:
+            return {'content': "Incorrect input provided!"}
+
+        server_url = server_url or self.server_url
+        plan_key = plan_key or self.plan_key
+
+        # The builds still running must be listed too, so their next sync records them as finished
+        new_results = list(self.__iter_plan_results(
+            server_url=server_url,
+            plan_key=plan_key,
+            page_size=page_size,
+            since=index.get_sync_point(plan_key),
+            include_all_states=True
+        ))
+        index.store_results(plan_key=plan_key, results=new_results)
 
         # Send response to client
-        return response_to_client
+        return self.pack_response_to_client(
+            response=True,
+            status_code=200,
+            content=new_results,
+            url=self.get_plan_results_url(
+                server_url=server_url, plan_key=plan_key, max_results=page_size, include_all_states=True
+            )
+        )
+
+    def watch(
+            self,
+            plan_keys: list = None,
+            server_url: str = None,
+            interval: float = WATCH_INTERVAL,
+            page_size: int = PLAN_RESULTS_PAGE_SIZE,
+            emit_initial: bool = False
+    ):
+        """Watch plans for build changes: new build, build state transition, build finished, new artifacts published.
+        Every <interval> seconds, the latest <page_size> results of every plan are compared to the previous ones (see
+        <BuildWatcher>) and only the changes are reported. Set a response cache on the client so the unchanged pages
+        are neither downloaded nor compared again. Errors are logged and the plan is polled again on the next round.
+
+        :param plan_keys: Bamboo plan keys [list]
+        :param server_url: Bamboo server URL used in API call [str]
+        Optional. Use this if you have a cluster of Bamboo servers and need to swap between servers.
+        :param interval: Number of seconds between two snapshots of a plan [float]
+        :param page_size: Number of latest results compared on every snapshot [int]
+        :param emit_initial: Report the builds listed on the first snapshot of a plan as new builds [bool]
+        :return: An endless generator of build events (see <bamboo.watch.get_build_event>)
+        :raise: ValueError if the Bamboo server or plan keys are missing
+        """
+
+        server_url = server_url or self.server_url
+        if not server_url:
+            raise ValueError("Error in <watch> method: No Bamboo server supplied!")
+
+        if not plan_keys or not all(plan_keys):
+            raise ValueError("Error in <watch> method: No Bamboo plan keys supplied!")
+
+        return self.__watch(
+            server_url=server_url,
+            plan_keys=list(dict.fromkeys(plan_keys)),
+            interval=interval,
+            page_size=page_size,
+            build_watcher=BuildWatcher(emit_initial=emit_initial)
+        )
+
+    def __watch(self, server_url: str, plan_keys: list, interval: float, page_size: int, build_watcher: BuildWatcher):
+        """Generator behind <watch>."""
+
+        # Content of the last snapshot of every plan: pages served from the response cache are not compared again
+        last_results = dict()
+        while True:
+            start_time = time.monotonic()
+            for plan_key in plan_keys:
+                results = self.__get_watched_results(server_url=server_url, plan_key=plan_key, page_size=page_size)
+                if results is None or results is last_results.get(plan_key):
+                    continue
+
+                last_results[plan_key] = results
+                yield from build_watcher.update(plan_key=plan_key, results=results)
+
+            time.sleep(max(0.0, interval - (time.monotonic() - start_time)))
+
+    def __get_watched_results(self, server_url: str, plan_key: str, page_size: int) -> list:
+        """Get the latest results of a watched plan, with their artifacts.
+
+        :return: A list of plan results, newest first; None on error
+        """
+
+        url = self.get_plan_results_url(
+            server_url=server_url,
+            plan_key=plan_key,
+            max_results=page_size,
+            expand=WATCH_RESULTS_EXPAND,
+            include_all_states=True
+        )
+
+        try:
+            status_code, response_json, http_get_response = self.get_parsed_request(
+                parser=self.decode_json_response, url=url
+            )
+        except (EncodingJSONException, HTTPErrorException):
+            return None
+
+        if status_code != 200:
+            LOGGER.error(f"Error when requesting URL: '{url}'{LINE_SEP}HTTP {status_code}: {http_get_response.text}")
+            return None
+
+        results, _ = self.unpack_plan_results_page(response_json)
+        return results
+
+    def __iter_plan_results(
+            self,
+            server_url: str,
+            plan_key: str,
+            page_size: int,
+            since: int = None,
+            max_results: int = None,
+            include_all_states: bool = False
+    ):
+        """Generator behind <iter_plan_results>."""
+
+        start_index = 0
+        results_count = 0
+        while max_results is None or results_count < max_results:
+            requested_results = page_size if max_results is None else min(page_size, max_results - results_count)
+            results, total_results = self.__get_plan_results_page(
+                server_url=server_url,
+                plan_key=plan_key,
+                start_index=start_index,
+                max_results=requested_results,
+                include_all_states=include_all_states
+            )
+
+            # Servers ignoring the page size must not make us skip results
+            results = results[:requested_results]
+            for result in results:
+                if since is not None and result.get('buildNumber', 0) <= since:
+                    return
+
+                yield result
+                results_count += 1
+
+            start_index += len(results)
+            # Last page
+            if len(results) < requested_results or (total_results is not None and start_index >= total_results):
+                return
+
+    def __get_plan_results_page(
+            self, server_url: str, plan_key: str, start_index: int, max_results: int, include_all_states: bool = False
+    ) -> tuple:
+        """Get a page of plan results.
+
+        :return: A tuple (results, total number of results); the total is None if unknown
+        :raise: Custom exception on HTTP communication errors (HTTP code other than 200 included)
+        :raise: Custom exception on JSON encoding error
+        """
+
+        url = self.get_plan_results_url(
+            server_url=server_url,
+            plan_key=plan_key,
+            max_results=max_results,
+            start_index=start_index,
+            include_all_states=include_all_states
+        )
+
+        if self.verbose:
+            LOGGER.debug(f"URL used in query: '{url}'")
+
+        status_code, response_json, http_get_response = self.get_parsed_request(
+            parser=self.decode_json_response, url=url
+        )
+        if status_code != 200:
+            error_message = f"Error when requesting URL: '{url}'{LINE_SEP}HTTP {status_code}: {http_get_response.text}"
+            LOGGER.error(error_message)
+            exception = HTTPErrorException(error_message=error_message)
+            raise exception
+
+        return self.unpack_plan_results_page(response_json)
+
+    @instrumented
+    @Validation.check_input
+    def query_job_for_artifacts(
+            self,
+            server_url: str = None,
+            plan_build_key: str = None,
+            job_name: str = None,
+            artifact_names: tuple = None,
+            max_workers: int = 1,
+            raw: bool = True
+    ) -> dict:
+        """Query Bamboo plan run build for stage artifacts.
+        Only the files at the top of the artifact pages are returned; use <iter_job_artifacts> to walk sub-dirs as well.
+
+        :param server_url: Bamboo server URL used in API call [str]
+        Optional. Use this if you have a cluster of Bamboo servers and need to swap between servers.
+        :param plan_build_key: Bamboo plan build key [str]
+        :param job_name: Bamboo plan job name [str]
+        :param artifact_names: Names of the artifacts as in Bamboo plan stage job [tuple]
+        :param max_workers: Number of artifact pages fetched at the same time; one after another by default [int]
+        :param raw: Return the artifacts as {name: url}, instead of a list of <bamboo.models.Artifact> [bool]
+        :return: A dictionary containing HTTP status_code, request content and list of artifacts
+        :raise: Custom exception on download error
+        """
+
+        server_url = server_url or self.server_url
+
+        urls = self.get_artifact_page_urls(
+            server_url=server_url, plan_build_key=plan_build_key, job_name=job_name, artifact_names=artifact_names
+        )
+
+        if max_workers > 1 and len(urls) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                artifacts_per_page = list(
+                    executor.map(lambda url: self.__query_artifact_page(server_url=server_url, url=url), urls)
+                )
+        else:
+            artifacts_per_page = [self.__query_artifact_page(server_url=server_url, url=url) for url in urls]
+
+        # Send response to client
+        return self.pack_artifacts_response(artifacts_per_page, raw=raw)
+
+    def __query_artifact_page(self, server_url: str, url: str) -> dict:
+        """Get the artifacts listed in a Bamboo artifact page.
+
+        :param server_url: Bamboo server URL the artifact links are relative to [str]
+        :param url: URL of the artifact page [str]
+        :return: A dictionary mapping the artifact names to their URLs; None if the page could not be fetched
+        :raise: Custom exception on download error
+        """
+
+        if self.verbose:
+            LOGGER.debug(f"URL used to query for artifacts: '{url}'")
+
+        # Query a build by performing a HTTP GET request and check HTTP response code
+        status_code, links, _ = self.get_parsed_request(
+            parser=lambda response: self.parse_artifact_page(response.text), url=url
+        )
+        if status_code != 200:
+            return None
+
+        return {file_name: f"{server_url}{file_path}" for file_name, file_path in links}
+
+    @Validation.check_iterator_input
+    def iter_job_artifacts(
+            self,
+            server_url: str = None,
+            plan_build_key: str = None,
+            job_name: str = None,
+            artifact_names: tuple = None,
+            max_depth: int = None,
+            include: tuple = None,
+            exclude: tuple = None
+    ):
+        """Walk the artifact directory trees of a Bamboo plan run build job, sub-dirs included.
+        The artifacts are listed lazily, one directory page at a time, so downloads can start before the whole tree
+        was walked. Only directories below the crawled artifact pages are followed and every directory is visited
+        once, so links pointing back up the tree or looping between directories are ignored.
+
+        :param server_url: Bamboo server URL used in API call [str]
+        Optional. Use this if you have a cluster of Bamboo servers and need to swap between servers.
+        :param plan_build_key: Bamboo plan build key [str]
+        :param job_name: Bamboo plan job name [str]
+        :param artifact_names: Names of the artifacts to walk, as in Bamboo plan stage job; the page listing all the
+        artifacts of the job is walked by default [tuple]
+        :param max_depth: Maximum number of sub-dir levels to descend into; no limit by default [int]
+        :param include: Glob patterns (e.g. "*.log", "docs/*") the relative path of a file must match [tuple]
+        :param exclude: Glob patterns the relative path of a file must not match [tuple]
+        :return: A generator of (relative_path, url) tuples, one per file
+        :raise: ValueError if the Bamboo server, plan build key or job name is missing
+        :raise: Custom exception on download error
+        """
+
+        if not job_name:
+            raise ValueError("Error in <iter_job_artifacts> method: No Bamboo job name supplied!")
+
+        server_url = server_url or self.server_url
+
+        if artifact_names:
+            roots = list(zip(
+                artifact_names,
+                self.get_artifact_page_urls(
+                    server_url=server_url,
+                    plan_build_key=plan_build_key,
+                    job_name=job_name,
+                    artifact_names=artifact_names
+                )
+            ))
+        else:
+            roots = [
+                ("", self.job_artifacts_url_mask.format(
+                    server_url=server_url, plan_build_key=plan_build_key, job_name=job_name
+                ))
+            ]
+
+        return self.__crawl_artifacts(roots=roots, max_depth=max_depth, include=include, exclude=exclude)
+
+    def __crawl_artifacts(self, roots: list, max_depth: int = None, include: tuple = None, exclude: tuple = None):
+        """Walk artifact directory trees depth first, yielding the files as soon as their directory page is parsed.
+
+        :param roots: The (relative_path, url) tuples of the directories to walk [list]
+        :param max_depth: Maximum number of sub-dir levels to descend into; no limit if None [int]
+        :param include: Glob patterns the relative path of a file must match [tuple]
+        :param exclude: Glob patterns the relative path of a file must not match [tuple]
+        :return: A generator of (relative_path, url) tuples
+        """
+
+        for root_path, root_url in roots:
+            visited_urls = {root_url}
+            # Stack of directories left to walk: (relative_path, url, depth)
+            pending_dirs = [(root_path, root_url, 0)]
+
+            while pending_dirs:
+                dir_path, dir_url, depth = pending_dirs.pop()
+                sub_dirs = list()
+
+                for link_name, link_url in self.__get_artifact_dir_links(dir_url):
+                    relative_path = posixpath.join(dir_path, link_name.strip().strip("/"))
+
+                    if not link_url.endswith("/"):
+                        if self.__is_path_selected(path=relative_path, include=include, exclude=exclude):
+                            yield relative_path, link_url
+                        continue
+
+                    # Follow only unvisited sub-dirs of the walked tree
+                    if not link_url.startswith(root_url) or link_url in visited_urls:
+                        continue
+                    if max_depth is not None and depth >= max_depth:
+                        continue
+
+                    visited_urls.add(link_url)
+                    sub_dirs.append((relative_path, link_url, depth + 1))
+
+                # Walk the sub-dirs in the order they are listed
+                pending_dirs.extend(reversed(sub_dirs))
+
+    def __get_artifact_dir_links(self, url: str) -> list:
+        """Get the links listed in an artifact directory page, as absolute URLs.
+
+        :param url: URL of the artifact directory page [str]
+        :return: A list of (link text, url) tuples; empty if the page could not be fetched
+        """
+
+        if self.verbose:
+            LOGGER.debug(f"URL used to query for artifacts: '{url}'")
+
+        status_code, links, _ = self.get_parsed_request(
+            parser=lambda response: self.parse_artifact_page(response.text), url=url
+        )
+        if status_code != 200:
+            return []
+
+        return [(link_name, urldefrag(urljoin(url, link_href))[0]) for link_name, link_href in links]
+
+    @staticmethod
+    def __is_path_selected(path: str, include: tuple = None, exclude: tuple = None) -> bool:
+        """Check a relative path against include and exclude glob patterns.
+
+        :param path: Relative path to check [str]
+        :param include: Glob patterns the path must match; all paths match if not set [tuple]
+        :param exclude: Glob patterns the path must not match [tuple]
+        :return: True if the path is selected
+        """
+
+        if include and not any(fnmatchcase(path, pattern) for pattern in include):
+            return False
 
-    def get_artifact(self, url: str = None, destination_file: str = None) -> dict:
+        return not (exclude and any(fnmatchcase(path, pattern) for pattern in exclude))
+
+    @instrumented
+    def get_artifact(
+            self,
+            url: str = None,
+            destination_file: str = None,
+            chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+            resume: bool = False,
+            bandwidth_limiter: TokenBucket = None,
+            sha256: str = None
+    ) -> dict:
         """Download artifacts from Bamboo plan build run.
+        The artifact is streamed to a '<destination_file>.part' file in chunks of <chunk_size> bytes, which is renamed
+        to <destination_file> only after the whole artifact was received. A partial file never shows up at the
+        destination.
+
+        In <resume> mode the partial file is kept when the download fails, together with a
+        '<destination_file>.part.json' file holding the artifact validators (URL, ETag, Last-Modified, size). A later
+        call with <resume> set sends a HTTP Range request and appends only the missing bytes (HTTP 206 is returned to
+        the client). If the server ignores the range or the artifact changed meanwhile, it is downloaded from scratch.
+
+        A truncated download (fewer bytes than announced by the server) is an error. With the <artifact_cache> of the
+        client set or a <sha256> checksum given, the artifact is hashed while streamed: a checksum mismatch is an
+        error too, and the partial file is removed. Cached artifacts are served from the cache (see <artifact_cache>).
 
         :param url: URL used in to download the artifact [str]
         :param destination_file: Full path to destination file [str]
+        :param chunk_size: Number of bytes read from the network and written to disk at once [int]
+        :param resume: Keep partial downloads and resume them on the next call [bool]
+        :param bandwidth_limiter: Token bucket (1 token = 1 byte) used to cap the download bandwidth [TokenBucket]
+        :param sha256: Expected SHA-256 checksum of the artifact, hexadecimal [str]
         :return: A dictionary containing HTTP status_code and request content
         :raise: Custom exception on download error
         """
@@ -560,30 +1985,265 @@ class BambooAPIClient(BambooAccount):
         if self.verbose:
             LOGGER.debug(f"URL used to download artifact: '{url}'")
 
-        # Query a build by performing a HTTP GET request and check HTTP response code
-        http_get_response = self.get_request(url=url)
-        if http_get_response.status_code != 200:
-            return self.pack_response_to_client(
-                response=False, status_code=http_get_response.status_code, content=http_get_response.text, url=url
+        cached_entry, is_delivered = get_cached_artifact(
+            self.artifact_cache, url=url, destination_file=destination_file, sha256=sha256
+        )
+        if is_delivered:
+            return self.pack_response_to_client(response=True, status_code=200, content=None, url=url)
+
+        resume_offset, if_range = 0, None
+        if resume and cached_entry is None:
+            resume_offset, if_range = get_resume_point(url=url, destination_file=destination_file)
+
+        # Download the artifact by performing a single streamed HTTP GET request and check HTTP response code
+        http_get_response = self.__request_artifact(
+            url=url,
+            destination_file=destination_file,
+            resume_offset=resume_offset,
+            if_range=if_range,
+            cached_entry=cached_entry
+        )
+        if http_get_response is None:
+            return self.pack_response_to_client(response=True, status_code=200, content=None, url=url)
+
+        with http_get_response:
+            status_code = http_get_response.status_code
+
+            resume_status = check_resumed_response(
+                status_code=status_code, headers=http_get_response.headers, resume_offset=resume_offset
             )
+            if resume_status == "complete":
+                finish_download(
+                    url=url,
+                    headers=http_get_response.headers,
+                    destination_file=destination_file,
+                    sha256=sha256,
+                    artifact_cache=self.artifact_cache
+                )
+                return self.pack_response_to_client(response=True, status_code=status_code, content=None, url=url)
+
+            if resume_status == "restart":
+                http_get_response.close()
+                remove_partial_files(destination_file)
+                return self.get_artifact(
+                    url=url,
+                    destination_file=destination_file,
+                    chunk_size=chunk_size,
+                    resume=resume,
+                    bandwidth_limiter=bandwidth_limiter,
+                    sha256=sha256
+                )
+
+            # A HTTP 200 while resuming means the server ignored the range: the partial file is overwritten
+            if status_code != 200 and resume_status != "resumed":
+                return self.pack_response_to_client(
+                    response=False, status_code=status_code, content=http_get_response.text, url=url
+                )
+
+            self.__write_artifact(
+                url=url,
+                response=http_get_response,
+                destination_file=destination_file,
+                chunk_size=chunk_size,
+                resume=resume,
+                bandwidth_limiter=bandwidth_limiter,
+                sha256=sha256
+            )
+
+        # Send response to client
+        return self.pack_response_to_client(
+            response=True, status_code=status_code, content=None, url=url
+        )
+
+    @instrumented
+    def get_artifacts(
+            self,
+            artifacts: dict = None,
+            max_workers: int = DOWNLOAD_MAX_WORKERS,
+            max_workers_per_host: int = None,
+            max_bandwidth: int = None,
+            chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+            resume: bool = False
+    ) -> dict:
+        """Download several artifacts at the same time, over the keep-alive HTTP session of the client.
+        Please size the connection pool of the client (<pool_maxsize>) for <max_workers_per_host> connections.
+        Errors are not raised but reported in the result of the corresponding artifact, so one failing download does
+        not abort the others.
+
+        :param artifacts: Mapping between the artifact URLs and the full path of their destination files [dict]
+        :param max_workers: Maximum number of artifacts downloaded at the same time [int]
+        :param max_workers_per_host: Maximum number of artifacts downloaded at the same time from the same server;
+        defaults to <max_workers> [int]
+        :param max_bandwidth: Maximum total download bandwidth, in bytes per second; no limit by default [int]
+        :param chunk_size: Number of bytes read from the network and written to disk at once [int]
+        :param resume: Keep partial downloads and resume them on the next call [bool]
+        :return: A dictionary mapping every artifact URL to a dictionary containing HTTP status_code and request
+        content, as returned by <get_artifact>
+        """
+
+        if not artifacts:
+            return {'content': "Incorrect input provided!"}
+
+        host_limiter = HostLimiter(max_per_host=max_workers_per_host or max_workers)
+        bandwidth_limiter = TokenBucket(rate=max_bandwidth) if max_bandwidth else None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                url: executor.submit(
+                    self.__get_artifact_no_raise,
+                    url=url,
+                    destination_file=destination_file,
+                    chunk_size=chunk_size,
+                    resume=resume,
+                    host_limiter=host_limiter,
+                    bandwidth_limiter=bandwidth_limiter
+                )
+                for url, destination_file in artifacts.items()
+            }
+
+        # Send response to client
+        return {url: future.result() for url, future in futures.items()}
+
+    def __request_artifact(
+            self, url: str, destination_file: str, resume_offset: int = 0, if_range: str = None, cached_entry=None
+    ) -> requests:
+        """Send the streamed HTTP GET request of an artifact download. A cached artifact confirmed by the server
+        (HTTP 304) is delivered instead; if it was evicted from the cache meanwhile, the artifact is requested once
+        more, unconditionally.
+
+        :param url: URL used in to download the artifact [str]
+        :param destination_file: Full path to destination file [str]
+        :param resume_offset: Offset the download is resumed from; 0 to download the whole artifact [int]
+        :param if_range: Validator of the partial file, sent along with the range [str]
+        :param cached_entry: Cached entry of the artifact, revalidated by a conditional request
+        [bamboo.cache.ArtifactEntry]
+        :return: The streamed HTTP response; None if the cached artifact was delivered
+        :raise: Custom exception if the cached artifact cannot be delivered
+        """
+
+        headers = self.get_download_header(resume_offset=resume_offset, if_range=if_range, cached_entry=cached_entry)
+        http_get_response = self.get_request(url=url, header=headers, allow_redirects=True, stream=True)
+        if http_get_response.status_code != 304 or cached_entry is None:
+            return http_get_response
+
+        with http_get_response:
+            if deliver_cached_artifact(self.artifact_cache, cached_entry, destination_file):
+                self.artifact_cache.revalidated(cached_entry)
+                return None
+
+        headers = self.get_download_header(resume_offset=resume_offset, if_range=if_range)
+        return self.get_request(url=url, header=headers, allow_redirects=True, stream=True)
+
+    def __get_artifact_no_raise(self, url: str, host_limiter: HostLimiter, **values_to_unpack) -> dict:
+        """Download an artifact while holding a slot of its host, reporting download errors in the response.
+
+        :param url: URL used in to download the artifact [str]
+        :param host_limiter: Limiter bounding the number of concurrent downloads per host [HostLimiter]
+        :param values_to_unpack: Remaining <get_artifact> arguments
+        :return: A dictionary containing HTTP status_code and request content
+        """
+
+        with host_limiter.limit(url):
+            try:
+                return self.get_artifact(url=url, **values_to_unpack)
+            except (DownloadErrorException, HTTPErrorException) as exception:
+                return self.pack_response_to_client(response=False, status_code=None, content=str(exception), url=url)
+
+    def __write_artifact(
+            self,
+            url: str,
+            response: requests.Response,
+            destination_file: str,
+            chunk_size: int,
+            resume: bool,
+            bandwidth_limiter: TokenBucket = None,
+            sha256: str = None
+    ) -> None:
+        """Stream the artifact to the partial file and move it to its destination once complete.
+
+        :param url: URL used in to download the artifact [str]
+        :param response: The streamed HTTP response (200 or 206) of the artifact download [requests.Response]
+        :param destination_file: Full path to destination file [str]
+        :param chunk_size: Number of bytes read from the network and written to disk at once [int]
+        :param resume: Keep the partial file and its validators on error [bool]
+        :param bandwidth_limiter: Token bucket (1 token = 1 byte) used to cap the download bandwidth [TokenBucket]
+        :param sha256: Expected SHA-256 checksum of the artifact, hexadecimal [str]
+        :raise: Custom exception on download error
+        """
+
+        partial_file, _ = get_partial_files(destination_file)
+        is_resumed = response.status_code == 206
 
         try:
-            get_file = requests.get(url)
+            if resume and not is_resumed:
+                save_download_validator(url=url, destination_file=destination_file, headers=response.headers)
 
-            with open(destination_file, 'wb') as f:
-                f.write(get_file.content)
+            # Hashed while streamed; the bytes already downloaded by a resumed download are read back once
+            hasher = get_download_hasher(
+                destination_file, is_resumed=is_resumed, sha256=sha256, artifact_cache=self.artifact_cache
+            )
+            self.__stream_artifact(
+                url=url,
+                response=response,
+                partial_file=partial_file,
+                chunk_size=chunk_size,
+                bandwidth_limiter=bandwidth_limiter,
+                hasher=hasher
+            )
+            finish_download(
+                url=url,
+                headers=response.headers,
+                destination_file=destination_file,
+                hasher=hasher,
+                sha256=sha256,
+                artifact_cache=self.artifact_cache
+            )
+        except DownloadErrorException:
+            raise
         except ValueError as exception:
+            if not resume:
+                remove_file(partial_file)
             error_message = f"Error when downloading artifact: {exception}"
             LOGGER.error(error_message)
             exception = DownloadErrorException(error_message=error_message)
             raise exception
         except Exception as exception:
+            if not resume:
+                remove_file(partial_file)
             error_message = f"Unknown error when downloading artifact: {exception}"
             LOGGER.error(error_message)
             exception = DownloadErrorException(error_message=error_message)
             raise exception
 
-        # Send response to client
-        return self.pack_response_to_client(
-            response=True, status_code=http_get_response.status_code, content=None, url=url
-        )
+    def __stream_artifact(
+            self,
+            url: str,
+            response: requests.Response,
+            partial_file: str,
+            chunk_size: int,
+            bandwidth_limiter: TokenBucket = None,
+            hasher=None
+    ) -> None:
+        """Write the body of the artifact download to the partial file, appended to it for a resumed download.
+
+        :param url: URL used in to download the artifact [str]
+        :param response: The streamed HTTP response (200 or 206) of the artifact download [requests.Response]
+        :param partial_file: Full path to the partial file [str]
+        :param chunk_size: Number of bytes read from the network and written to disk at once [int]
+        :param bandwidth_limiter: Token bucket (1 token = 1 byte) used to cap the download bandwidth [TokenBucket]
+        :param hasher: Hasher fed with the content while streamed [hashlib object]
+        :raise: ValueError if the body is shorter or longer than announced by the server
+        """
+
+        with self.measure("download", host=get_host(url), bytes=0) as event_fields:
+            with open(partial_file, 'ab' if response.status_code == 206 else 'wb') as fd_out:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    if bandwidth_limiter:
+                        bandwidth_limiter.consume(len(chunk))
+                    write_chunk(fd_out, chunk, hasher)
+
+            received_bytes = response.raw.tell()
+            if event_fields is not None:
+                event_fields['bytes'] = received_bytes
+
+        check_content_length(response.headers, received_bytes)
@@ -0,0 +1,856 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Asyncio Bamboo API client module used for communicating with the Bamboo server web service API."""
+
+import asyncio
+import json
+import time
+
+from functools import partial
+
+# Third-party libs
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# Add custom packages
+from bamboo.api import (
+    DOWNLOAD_CHUNK_SIZE,
+    LINE_SEP,
+    PLAN_RESULTS_PAGE_SIZE,
+    BambooAPIBase
+)
+from bamboo.config import LOGGER
+from bamboo.downloads import (
+    check_content_length,
+    check_resumed_response,
+    deliver_cached_artifact,
+    finish_download,
+    get_cached_artifact,
+    get_download_hasher,
+    get_partial_files,
+    get_resume_point,
+    remove_file,
+    remove_partial_files,
+    save_download_validator,
+    write_chunk
+)
+from bamboo.exceptions import (
+    DownloadErrorException,
+    EncodingJSONException,
+    HTTPErrorException
+)
+from bamboo.models import decode_results
+from bamboo.retry import RetryPolicy
+from bamboo.throttling import get_host
+from bamboo.tracing import (
+    ConnectionTimings,
+    get_api_method,
+    instrumented
+)
+from bamboo.validation import Validation
+from bamboo.watch import (
+    WATCH_INTERVAL,
+    WATCH_RESULTS_EXPAND,
+    BuildWatcher
+)
+
+
+# Maximum number of connections opened by a client to all the servers and to a single server
+ASYNC_POOL_LIMIT = 100
+ASYNC_POOL_LIMIT_PER_HOST = 20
+
+
+def get_trace_timings(context) -> ConnectionTimings:
+    """Get the connection timings of a traced request; None if not measured."""
+    timings = context.trace_request_ctx
+    return timings if isinstance(timings, ConnectionTimings) else None
+
+
+async def on_dns_resolvehost_start(session, context, params) -> None:
+    """Trace callback: host resolution started."""
+    context.dns_start_time = time.perf_counter()
+
+
+async def on_dns_resolvehost_end(session, context, params) -> None:
+    """Trace callback: host resolved."""
+    timings = get_trace_timings(context)
+    if timings is not None:
+        timings.dns_time = time.perf_counter() - context.dns_start_time
+
+
+async def on_connection_create_start(session, context, params) -> None:
+    """Trace callback: connection opening started."""
+    context.connect_start_time = time.perf_counter()
+
+
+async def on_connection_create_end(session, context, params) -> None:
+    """Trace callback: connection opened, host resolved and TLS handshake done."""
+    timings = get_trace_timings(context)
+    if timings is not None:
+        timings.connected_time = time.perf_counter()
+        timings.connect_time = timings.connected_time - context.connect_start_time - (timings.dns_time or 0.0)
+        timings.new_connections += 1
+
+
+async def on_request_chunk_sent(session, context, params) -> None:
+    """Trace callback: chunk of the request body sent."""
+    timings = get_trace_timings(context)
+    if timings is not None:
+        timings.bytes_sent += len(params.chunk)
+
+
+async def on_request_end(session, context, params) -> None:
+    """Trace callback: response headers received."""
+    timings = get_trace_timings(context)
+    if timings is not None:
+        timings.response_time = time.perf_counter()
+
+
+def get_trace_config():
+    """Get the aiohttp trace config reporting the connection timings of the requests to their trace request context,
+    if a <ConnectionTimings>. The TLS handshake cannot be told apart from the connection by aiohttp: it is part of the
+    connect time.
+    """
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+    trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_request_chunk_sent.append(on_request_chunk_sent)
+    trace_config.on_request_end.append(on_request_end)
+
+    return trace_config
+
+
+class AsyncBambooAPIClient(BambooAPIBase):
+    """Asyncio Bamboo API client interface with the Bamboo server API.
+    All the requests of a client go through a single aiohttp connection pool, opened on first use. Please close the
+    client once done with it, either by awaiting <close> or by using it as an async context manager:
+
+        async with AsyncBambooAPIClient(server_url=...) as bamboo_api_client:
+            await bamboo_api_client.query_plan(plan_key=...)
+
+    Requires the 'aiohttp' package (python-bamboo-api[async] extra).
+    """
+
+    __slots__ = ('__session', '__pool_limit', '__pool_limit_per_host')
+
+    def __init__(
+            self,
+            *args,
+            pool_limit: int = ASYNC_POOL_LIMIT,
+            pool_limit_per_host: int = ASYNC_POOL_LIMIT_PER_HOST,
+            **kwargs
+    ) -> None:
+        """CTOR.
+        :param pool_limit: Maximum number of connections opened to all the Bamboo servers [int]
+        :param pool_limit_per_host: Maximum number of connections opened to a single Bamboo server [int]
+        The remaining params are the ones of <BambooAPIBase>. The settings of the <BambooAPIClient> only (server_urls,
+        request_governor, coalesce_requests, connection pool sizes) are not supported and rejected, as is a
+        <response_cache>.
+        """
+        if aiohttp is None:
+            raise ImportError(
+                f"{LINE_SEP * 2}AsyncBambooAPIClient requires the 'aiohttp' package! Please install it.{LINE_SEP * 2}"
+            )
+
+        super().__init__(*args, **kwargs)
+
+        self.__session = None
+        self.__pool_limit = pool_limit
+        self.__pool_limit_per_host = pool_limit_per_host
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the connection pool of the client."""
+        if self.__session is not None:
+            await self.__session.close()
+            self.__session = None
+
+    @property
+    def response_cache(self):
+        """Get the cache of the read-only responses: the asyncio client caches no response."""
+        return None
+
+    @response_cache.setter
+    def response_cache(self, cache) -> None:
+        """Rejects any response cache: the asyncio client does not support response caching."""
+        if cache is not None:
+            raise ValueError("AsyncBambooAPIClient does not support response caching! Please use BambooAPIClient.")
+
+    @property
+    def auth(self):
+        """Determine if we need to use AUTH or not."""
+        if self.is_auth_enabled:
+            return aiohttp.BasicAuth(self.username or "", self.password or "")
+
+        return None
+
+    @property
+    def session(self):
+        """Get the aiohttp session of the client, opening it on first use.
+        The connections are only timed (see <instrumentation>) if the instrumentation was set before the session was
+        opened.
+        """
+        if self.__session is None or self.__session.closed:
+            connector = aiohttp.TCPConnector(limit=self.__pool_limit, limit_per_host=self.__pool_limit_per_host)
+            trace_configs = None if self.instrumentation is None else [get_trace_config()]
+            self.__session = aiohttp.ClientSession(connector=connector, trace_configs=trace_configs)
+
+        return self.__session
+
+    async def get_request(self, **values_to_unpack):
+        """Performs a HTTP GET request to the Bamboo server.
+        The response body is not read: please read it or release the response.
+        Requests failing on a transient error are retried following the retry policy (see <retry_policy>).
+
+        :param values_to_unpack: Values to un-pack in order to construct the HTTP Get request; 'retry_policy'
+        overrides the retry policy of the client for this request
+        :return: An aiohttp response object
+        :raise: Custom exception on HTTP communication errors
+        """
+
+        return await self.__request_with_retries(
+            retry_policy=values_to_unpack.get('retry_policy'),
+            idempotent=values_to_unpack.get('idempotent'),
+            method="GET",
+            url=values_to_unpack.get('url', ""),
+            headers=values_to_unpack.get('header', "") or self.http_header,
+            timeout=values_to_unpack.get('timeout', 60),
+            allow_redirects=values_to_unpack.get('allow_redirects', False)
+        )
+
+    async def post_request(self, **values_to_unpack):
+        """Performs a HTTP POST request to the Bamboo server.
+        The response body is not read: please read it or release the response.
+        Requests failing on a transient error are retried following the retry policy (see <retry_policy>), only if
+        they never reached the server, unless flagged as idempotent.
+
+        :param values_to_unpack: Values to un-pack in order to construct the HTTP POST request; 'retry_policy'
+        overrides the retry policy of the client for this request, 'idempotent' flags a request safe to send twice
+        :return: An aiohttp response object
+        :raise: Custom exception on HTTP communication errors
+        """
+
+        return await self.__request_with_retries(
+            retry_policy=values_to_unpack.get('retry_policy'),
+            idempotent=values_to_unpack.get('idempotent'),
+            method="POST",
+            url=values_to_unpack.get('url', ""),
+            headers=values_to_unpack.get('header', "") or self.http_header,
+            data=values_to_unpack.get('data', {}),
+            timeout=values_to_unpack.get('timeout', 30),
+            allow_redirects=values_to_unpack.get('allow_redirects', False)
+        )
+
+    async def __request_with_retries(
+            self, method: str, retry_policy: RetryPolicy = None, idempotent: bool = None, **values_to_unpack
+    ):
+        """Performs a HTTP request to the Bamboo server, sending it again on transient errors following its retry
+        policy.
+
+        :param method: HTTP method [str]
+        :param retry_policy: Retry policy of the request, overriding the ones of the client [RetryPolicy]
+        :param idempotent: Whether the request is safe to send twice; guessed from the method by default [bool]
+        :param values_to_unpack: Values to un-pack in order to construct the HTTP request (see <__request>)
+        :return: An aiohttp response object
+        :raise: Custom exception on HTTP communication errors, once the retries are over
+        """
+
+        retry_policy = self.get_retry_policy(method, retry_policy=retry_policy)
+        retry_policy.record_request()
+
+        retry_number = 1
+        while True:
+            try:
+                response = await self.__request_measured(method=method, attempt=retry_number, **values_to_unpack)
+            except HTTPErrorException as exception:
+                delay = retry_policy.get_retry_delay(
+                    method, retry_number, idempotent=idempotent, is_request_sent=exception.is_request_sent
+                )
+                if delay is None:
+                    raise
+            else:
+                delay = retry_policy.get_retry_delay(
+                    method, retry_number, idempotent=idempotent, status_code=response.status, headers=response.headers
+                )
+                if delay is None:
+                    return response
+
+                LOGGER.warning(f"HTTP {response.status} when requesting URL: '{response.url}'")
+                response.release()
+
+            LOGGER.warning(f"Retrying {method} request in {delay:.1f}s (retry {retry_number}/{retry_policy.total})")
+            await asyncio.sleep(delay)
+            retry_number += 1
+
+    async def __request_measured(self, method: str, attempt: int, **values_to_unpack):
+        """Performs a HTTP request to the Bamboo server, reporting its timings to the instrumentation, if any.
+
+        :param method: HTTP method [str]
+        :param attempt: Number of the attempt, retries having an attempt above 1 [int]
+        :param values_to_unpack: Values to un-pack in order to construct the HTTP request (see <__request>)
+        :return: An aiohttp response object
+        :raise: Custom exception on HTTP communication errors
+        """
+
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            return await self.__request(method=method, **values_to_unpack)
+
+        timings = ConnectionTimings()
+        start_time = time.perf_counter()
+        response, error = None, None
+        try:
+            response = await self.__request(method=method, trace_request_ctx=timings, **values_to_unpack)
+            return response
+        except Exception as exception:
+            error = type(exception).__name__
+            raise
+        finally:
+            # The response is returned once its headers were received: its body is not read yet, so the announced
+            # body size is reported
+            instrumentation.emit({
+                'event': "request",
+                'api_method': get_api_method(),
+                'http_method': method,
+                'host': get_host(str(response.url) if response is not None else values_to_unpack.get('url', "")),
+                'status_code': None if response is None else response.status,
+                'error': error,
+                'attempt': attempt,
+                'dns_time': timings.dns_time,
+                'connect_time': timings.connect_time,
+                'tls_time': None,
+                'ttfb': None if timings.response_time is None else timings.response_time - start_time,
+                'total_time': time.perf_counter() - start_time,
+                'bytes_sent': timings.bytes_sent,
+                'bytes_received': (response.content_length or 0) if response is not None else 0,
+                'connection_reused': response is not None and not timings.new_connections
+            })
+
+    async def __request(self, method: str, url: str, timeout: float, **values_to_unpack):
+        """Performs a HTTP request to the Bamboo server.
+
+        :param method: HTTP method [str]
+        :param url: URL to request [str]
+        :param timeout: Total timeout of the request, in seconds [float]
+        :param values_to_unpack: Remaining aiohttp request arguments
+        :return: An aiohttp response object
+        :raise: Custom exception on HTTP communication errors
+        """
+
+        try:
+            response = await self.session.request(
+                method=method, url=url, auth=self.auth, timeout=aiohttp.ClientTimeout(total=timeout), **values_to_unpack
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exception:
+            error_message = f"Error when requesting URL: '{url}'{LINE_SEP}{exception}"
+            LOGGER.error(error_message)
+            # The request never reached the server if the connection could not be opened
+            exception = HTTPErrorException(
+                error_message=error_message, is_request_sent=not isinstance(exception, aiohttp.ClientConnectorError)
+            )
+            raise exception
+        except Exception as exception:
+            error_message = f"Unknown error when requesting URL: '{url}'{LINE_SEP}{exception}"
+            LOGGER.error(error_message)
+            exception = HTTPErrorException(error_message=error_message)
+            raise exception
+
+        return response
+
+    @instrumented
+    @Validation.check_input
+    async def trigger_plan_build(self, server_url: str = None, plan_key: str = None, req_values: tuple = None) -> dict:
+        """Trigger a plan build using Bamboo API.
+
+        :param server_url: Bamboo server URL used in API call [str]
+        Optional. Use this if you have a cluster of Bamboo servers and need to swap between servers.
+        :param plan_key: Bamboo plan key [str]
+        :param req_values: Values to insert into request (tuple)
+        :return: A dictionary containing HTTP status_code and request content
+        :raise: Custom exception on JSON encoding error
+        """
+
+        server_url = server_url or self.server_url
+        plan_key = plan_key or self.plan_key
+
+        request_payload = self.build_trigger_plan_payload(req_values)
+
+        url = self.get_trigger_plan_url(server_url=server_url, plan_key=plan_key)
+        if self.verbose:
+            LOGGER.debug(f"URL used to trigger build: '{url}'")
+
+        # Trigger the build by performing a HTTP POST request and check HTTP response code
+        http_post_response = await self.post_request(url=url, data=json.dumps(request_payload))
+        # Decoded straight from the bytes, without building the text of the response first
+        response_body = await http_post_response.read()
+        if http_post_response.status != 200:
+            return self.pack_response_to_client(
+                response=False,
+                status_code=http_post_response.status,
+                content=response_body.decode("utf-8", errors="replace"),
+                url=url
+            )
+
+        # Send response to client
+        return self.pack_response_to_client(
+            response=True, status_code=http_post_response.status, content=self.load_json(response_body), url=url
+        )
+
+    @instrumented
+    @Validation.check_input
+    async def stop_build(self, server_url: str = None, plan_build_key: str = None) -> dict:
+        """Stop a running plan build from Bamboo using Bamboo API.
+        Please see <BambooAPIClient.stop_build> about the HTTP codes returned by the different Bamboo versions.
+
+        :param server_url: Bamboo server URL used in API call [str]
+        Optional. Use this if you have a cluster of Bamboo servers and need to swap between servers.
+        :param plan_build_key: Bamboo plan build key [str]
+        :return: A dictionary containing HTTP status_code and request content
+        """
+
+        server_url = server_url or self.server_url
+
+        url = self.get_stop_plan_url(server_url=server_url, plan_build_key=plan_build_key)
+
+        if self.verbose:
+            LOGGER.debug(f"URL used to stop plan: '{url}'")
+
+        # Stop a build by performing a HTTP POST request and check HTTP response code
+        # Stopping a build twice is harmless
+        http_post_response = await self.post_request(url=url, idempotent=True)
+        response_text = await http_post_response.text()
+        if http_post_response.status not in [200, 302]:
+            return self.pack_response_to_client(
+                response=False, status_code=http_post_response.status, content=response_text, url=url
+            )
+
+        # Send response to client
+        return self.pack_response_to_client(
+            response=True, status_code=http_post_response.status, content=http_post_response, url=url
+        )
+
+    @instrumented
+    @Validation.check_input
+    async def query_plan(
+            self, server_url: str = None, plan_key: str = None, raw: bool = True, fields: frozenset = None
+    ) -> dict:
+        """Query a plan build using Bamboo API.
+
+        :param server_url: Bamboo server URL used in API call [str]
+        Optional. Use this if you have a cluster of Bamboo servers and need to swap between servers.
+        :param plan_key: Bamboo plan key [str]
+        :param raw: Return the decoded JSON document as content, instead of a <bamboo.models.PlanResult> (or of a
+        <bamboo.models.BuildResult> when querying a single build) [bool]
+        :param fields: Names of the fields to keep, at any depth (see <BambooAPIClient.query_plan>) [frozenset]
+        :return: A dictionary containing HTTP status_code and request content
+        :raise: Custom exception on JSON encoding error
+        """
+
+        server_url = server_url or self.server_url
+        plan_key = plan_key or self.plan_key
+
+        url = self.get_plan_results_url(server_url=server_url, plan_key=plan_key)
+
+        if self.verbose:
+            LOGGER.debug(f"URL used in query: '{url}'")
+
+        # Query a build by performing a HTTP GET request and check HTTP response code
+        http_get_response = await self.get_request(url=url)
+        if http_get_response.status != 200:
+            response_text = await http_get_response.text(encoding="utf-8")
+            return self.pack_response_to_client(
+                response=False, status_code=http_get_response.status, content=response_text, url=url
+            )
+
+        # Decode straight from the response bytes
+        response_content = self.load_json(await http_get_response.read(), fields=frozenset(fields or ()))
+        if not raw:
+            with self.measure("parse", parser="models", bytes=None):
+                response_content = decode_results(response_content)
+
+        # Send response to client
+        return self.pack_response_to_client(
+            response=True, status_code=http_get_response.status, content=response_content, url=url
+        )
+
+    def watch(
+            self,
+            plan_keys: list = None,
+            server_url: str = None,
+            interval: float = WATCH_INTERVAL,
+            page_size: int = PLAN_RESULTS_PAGE_SIZE,
+            emit_initial: bool = False
+    ):
+        """Watch plans for build changes (see <BambooAPIClient.watch>).
+
+            async for build_event in bamboo_api_client.watch(plan_keys=[...]):
+                ...
+
+        :param plan_keys: Bamboo plan keys [list]
+        :param server_url: Bamboo server URL used in API call [str]
+        Optional. Use this if you have a cluster of Bamboo servers and need to swap between servers.
+        :param interval: Number of seconds between two snapshots of a plan [float]
+        :param page_size: Number of latest results compared on every snapshot [int]
+        :param emit_initial: Report the builds listed on the first snapshot of a plan as new builds [bool]
+        :return: An endless async iterator of build events (see <bamboo.watch.get_build_event>)
+        :raise: ValueError if the Bamboo server or plan keys are missing
+        """
+
+        server_url = server_url or self.server_url
+        if not server_url:
+            raise ValueError("Error in <watch> method: No Bamboo server supplied!")
+
+        if not plan_keys or not all(plan_keys):
+            raise ValueError("Error in <watch> method: No Bamboo plan keys supplied!")
+
+        return self.__watch(
+            server_url=server_url,
+            plan_keys=list(dict.fromkeys(plan_keys)),
+            interval=interval,
+            page_size=page_size,
+            build_watcher=BuildWatcher(emit_initial=emit_initial)
+        )
+
+    async def __watch(
+            self, server_url: str, plan_keys: list, interval: float, page_size: int, build_watcher: BuildWatcher
+    ):
+        """Async generator behind <watch>."""
+
+        loop = asyncio.get_running_loop()
+        while True:
+            start_time = loop.time()
+            for plan_key in plan_keys:
+                results = await self.__get_watched_results(
+                    server_url=server_url, plan_key=plan_key, page_size=page_size
+                )
+                if results is None:
+                    continue
+
+                for build_event in build_watcher.update(plan_key=plan_key, results=results):
+                    yield build_event
+
+            await asyncio.sleep(max(0.0, interval - (loop.time() - start_time)))
+
+    async def __get_watched_results(self, server_url: str, plan_key: str, page_size: int) -> list:
+        """Get the latest results of a watched plan, with their artifacts.
+
+        :return: A list of plan results, newest first; None on error
+        """
+
+        url = self.get_plan_results_url(
+            server_url=server_url,
+            plan_key=plan_key,
+            max_results=page_size,
+            expand=WATCH_RESULTS_EXPAND,
+            include_all_states=True
+        )
+
+        try:
+            http_get_response = await self.get_request(url=url)
+            response_body = await http_get_response.read()
+            if http_get_response.status != 200:
+                error_message = f"HTTP {http_get_response.status}: {response_body.decode('utf-8', errors='replace')}"
+                LOGGER.error(f"Error when requesting URL: '{url}'{LINE_SEP}{error_message}")
+                return None
+
+            results, _ = self.unpack_plan_results_page(self.load_json(response_body))
+        except (EncodingJSONException, HTTPErrorException):
+            return None
+
+        return results
+
+    @instrumented
+    @Validation.check_input
+    async def query_job_for_artifacts(
+            self,
+            server_url: str = None,
+            plan_build_key: str = None,
+            job_name: str = None,
+            artifact_names: tuple = None,
+            max_workers: int = None,
+            raw: bool = True
+    ) -> dict:
+        """Query Bamboo plan run build for stage artifacts.
+        The artifact pages are fetched at the same time.
+
+        :param server_url: Bamboo server URL used in API call [str]
+        Optional. Use this if you have a cluster of Bamboo servers and need to swap between servers.
+        :param plan_build_key: Bamboo plan build key [str]
+        :param job_name: Bamboo plan job name [str]
+        :param artifact_names: Names of the artifacts as in Bamboo plan stage job [tuple]
+        :param max_workers: Number of artifact pages fetched at the same time; bound by the connection pool only by
+        default [int]
+        :param raw: Return the artifacts as {name: url}, instead of a list of <bamboo.models.Artifact> [bool]
+        :return: A dictionary containing HTTP status_code, request content and list of artifacts
+        :raise: Custom exception on download error
+        """
+
+        server_url = server_url or self.server_url
+
+        urls = self.get_artifact_page_urls(
+            server_url=server_url, plan_build_key=plan_build_key, job_name=job_name, artifact_names=artifact_names
+        )
+
+        semaphore = asyncio.Semaphore(max_workers) if max_workers else None
+        artifacts_per_page = await asyncio.gather(
+            *[self.__query_artifact_page(server_url=server_url, url=url, semaphore=semaphore) for url in urls]
+        )
+
+        # Send response to client
+        return self.pack_artifacts_response(list(artifacts_per_page), raw=raw)
+
+    async def __query_artifact_page(self, server_url: str, url: str, semaphore: asyncio.Semaphore = None) -> dict:
+        """Get the artifacts listed in a Bamboo artifact page.
+
+        :param server_url: Bamboo server URL the artifact links are relative to [str]
+        :param url: URL of the artifact page [str]
+        :param semaphore: Semaphore bounding the number of pages fetched at the same time [asyncio.Semaphore]
+        :return: A dictionary mapping the artifact names to their URLs; None if the page could not be fetched
+        :raise: Custom exception on download error
+        """
+
+        if self.verbose:
+            LOGGER.debug(f"URL used to query for artifacts: '{url}'")
+
+        if semaphore is None:
+            http_get_response = await self.get_request(url=url)
+            page = await http_get_response.text()
+        else:
+            async with semaphore:
+                http_get_response = await self.get_request(url=url)
+                page = await http_get_response.text()
+
+        if http_get_response.status != 200:
+            return None
+
+        return {
+            file_name: f"{server_url}{file_path}"
+            for file_name, file_path in self.parse_artifact_page(page)
+        }
+
+    @instrumented
+    async def get_artifact(
+            self,
+            url: str = None,
+            destination_file: str = None,
+            chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+            resume: bool = False,
+            sha256: str = None
+    ) -> dict:
+        """Download artifacts from Bamboo plan build run.
+        Same as <BambooAPIClient.get_artifact>: the artifact is streamed to a '<destination_file>.part' file, resumed
+        in <resume> mode, checked against its announced size and <sha256> checksum, and served from the
+        <artifact_cache> of the client if cached. All the disk I/O (file writes, renames, hashing of the resumed bytes,
+        cache lookups and deliveries) runs in the default executor, so the event loop is never blocked.
+
+        :param url: URL used in to download the artifact [str]
+        :param destination_file: Full path to destination file [str]
+        :param chunk_size: Number of bytes read from the network and written to disk at once [int]
+        :param resume: Keep partial downloads and resume them on the next call [bool]
+        :param sha256: Expected SHA-256 checksum of the artifact, hexadecimal [str]
+        :return: A dictionary containing HTTP status_code and request content
+        :raise: Custom exception on download error
+        """
+
+        if not url or not destination_file:
+            return {'content': "Incorrect input provided!"}
+
+        if self.verbose:
+            LOGGER.debug(f"URL used to download artifact: '{url}'")
+
+        loop = asyncio.get_running_loop()
+        cached_entry, is_delivered = await loop.run_in_executor(
+            None, get_cached_artifact, self.artifact_cache, url, destination_file, sha256
+        )
+        if is_delivered:
+            return self.pack_response_to_client(response=True, status_code=200, content=None, url=url)
+
+        resume_offset, if_range = 0, None
+        if resume and cached_entry is None:
+            resume_offset, if_range = await loop.run_in_executor(None, get_resume_point, url, destination_file)
+
+        # Download the artifact by performing a single streamed HTTP GET request and check HTTP response code
+        http_get_response = await self.__request_artifact(
+            url=url,
+            destination_file=destination_file,
+            resume_offset=resume_offset,
+            if_range=if_range,
+            cached_entry=cached_entry
+        )
+        if http_get_response is None:
+            return self.pack_response_to_client(response=True, status_code=200, content=None, url=url)
+
+        async with http_get_response:
+            status_code = http_get_response.status
+
+            resume_status = check_resumed_response(
+                status_code=status_code, headers=http_get_response.headers, resume_offset=resume_offset
+            )
+            if resume_status == "complete":
+                await loop.run_in_executor(None, partial(
+                    finish_download,
+                    url=url,
+                    headers=http_get_response.headers,
+                    destination_file=destination_file,
+                    sha256=sha256,
+                    artifact_cache=self.artifact_cache
+                ))
+                return self.pack_response_to_client(response=True, status_code=status_code, content=None, url=url)
+
+            if resume_status == "restart":
+                http_get_response.release()
+                await loop.run_in_executor(None, remove_partial_files, destination_file)
+                return await self.get_artifact(
+                    url=url, destination_file=destination_file, chunk_size=chunk_size, resume=resume, sha256=sha256
+                )
+
+            # A HTTP 200 while resuming means the server ignored the range: the partial file is overwritten
+            if status_code != 200 and resume_status != "resumed":
+                return self.pack_response_to_client(
+                    response=False, status_code=status_code, content=await http_get_response.text(), url=url
+                )
+
+            await self.__write_artifact(
+                url=url,
+                response=http_get_response,
+                destination_file=destination_file,
+                chunk_size=chunk_size,
+                resume=resume,
+                sha256=sha256
+            )
+
+        # Send response to client
+        return self.pack_response_to_client(
+            response=True, status_code=status_code, content=None, url=url
+        )
+
+    async def __request_artifact(
+            self, url: str, destination_file: str, resume_offset: int = 0, if_range: str = None, cached_entry=None
+    ):
+        """Send the HTTP GET request of an artifact download. A cached artifact confirmed by the server (HTTP 304) is
+        delivered instead; if it was evicted from the cache meanwhile, the artifact is requested once more,
+        unconditionally.
+
+        :param url: URL used in to download the artifact [str]
+        :param destination_file: Full path to destination file [str]
+        :param resume_offset: Offset the download is resumed from; 0 to download the whole artifact [int]
+        :param if_range: Validator of the partial file, sent along with the range [str]
+        :param cached_entry: Cached entry of the artifact, revalidated by a conditional request
+        [bamboo.cache.ArtifactEntry]
+        :return: The aiohttp response, body not read; None if the cached artifact was delivered
+        :raise: Custom exception if the cached artifact cannot be delivered
+        """
+
+        headers = self.get_download_header(resume_offset=resume_offset, if_range=if_range, cached_entry=cached_entry)
+        http_get_response = await self.get_request(url=url, header=headers, allow_redirects=True)
+        if http_get_response.status != 304 or cached_entry is None:
+            return http_get_response
+
+        loop = asyncio.get_running_loop()
+        async with http_get_response:
+            if await loop.run_in_executor(
+                    None, deliver_cached_artifact, self.artifact_cache, cached_entry, destination_file
+            ):
+                await loop.run_in_executor(None, self.artifact_cache.revalidated, cached_entry)
+                return None
+
+        headers = self.get_download_header(resume_offset=resume_offset, if_range=if_range)
+        return await self.get_request(url=url, header=headers, allow_redirects=True)
+
+    async def __write_artifact(
+            self, url: str, response, destination_file: str, chunk_size: int, resume: bool, sha256: str = None
+    ) -> None:
+        """Stream the artifact to the partial file and move it to its destination once complete.
+
+        :param url: URL used in to download the artifact [str]
+        :param response: The HTTP response (200 or 206) of the artifact download [aiohttp.ClientResponse]
+        :param destination_file: Full path to destination file [str]
+        :param chunk_size: Number of bytes read from the network and written to disk at once [int]
+        :param resume: Keep the partial file and its validators on error [bool]
+        :param sha256: Expected SHA-256 checksum of the artifact, hexadecimal [str]
+        :raise: Custom exception on download error
+        """
+
+        loop = asyncio.get_running_loop()
+        partial_file, _ = get_partial_files(destination_file)
+        is_resumed = response.status == 206
+
+        try:
+            if resume and not is_resumed:
+                await loop.run_in_executor(None, save_download_validator, url, destination_file, response.headers)
+
+            # Hashed while streamed; the bytes already downloaded by a resumed download are read back once
+            hasher = await loop.run_in_executor(None, partial(
+                get_download_hasher,
+                destination_file,
+                is_resumed=is_resumed,
+                sha256=sha256,
+                artifact_cache=self.artifact_cache
+            ))
+            await self.__stream_artifact(
+                url=url, response=response, partial_file=partial_file, chunk_size=chunk_size, hasher=hasher
+            )
+            await loop.run_in_executor(None, partial(
+                finish_download,
+                url=url,
+                headers=response.headers,
+                destination_file=destination_file,
+                hasher=hasher,
+                sha256=sha256,
+                artifact_cache=self.artifact_cache
+            ))
+        except DownloadErrorException:
+            raise
+        except ValueError as exception:
+            if not resume:
+                await loop.run_in_executor(None, remove_file, partial_file)
+            error_message = f"Error when downloading artifact: {exception}"
+            LOGGER.error(error_message)
+            exception = DownloadErrorException(error_message=error_message)
+            raise exception
+        except Exception as exception:
+            if not resume:
+                await loop.run_in_executor(None, remove_file, partial_file)
+            error_message = f"Unknown error when downloading artifact: {exception}"
+            LOGGER.error(error_message)
+            exception = DownloadErrorException(error_message=error_message)
+            raise exception
+
+    async def __stream_artifact(self, url: str, response, partial_file: str, chunk_size: int, hasher=None) -> None:
+        """Write the body of the artifact download to the partial file, appended to it for a resumed download.
+        The file is opened, written, hashed and closed in the default executor.
+
+        :param url: URL used in to download the artifact [str]
+        :param response: The HTTP response (200 or 206) of the artifact download [aiohttp.ClientResponse]
+        :param partial_file: Full path to the partial file [str]
+        :param chunk_size: Number of bytes read from the network and written to disk at once [int]
+        :param hasher: Hasher fed with the content while streamed [hashlib object]
+        :raise: ValueError if the body is shorter or longer than announced by the server
+        """
+
+        loop = asyncio.get_running_loop()
+        received_bytes = 0
+        with self.measure("download", host=get_host(url), bytes=0) as event_fields:
+            fd_out = await loop.run_in_executor(None, open, partial_file, 'ab' if response.status == 206 else 'wb')
+            try:
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    received_bytes += len(chunk)
+                    await loop.run_in_executor(None, write_chunk, fd_out, chunk, hasher)
+            finally:
+                await loop.run_in_executor(None, fd_out.close)
+
+            if event_fields is not None:
+                event_fields['bytes'] = received_bytes
+
+        check_content_length(response.headers, received_bytes)
@@ -0,0 +1,669 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Cache module: storage backends for the HTTP response cache of the API clients, and the artifact cache.
+Entries hold the validators of a response (ETag/Last-Modified) along with its parsed body (in memory) or its raw body
+(on disk), so a HTTP 304 reply to a conditional request is served without downloading the body again.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import threading
+import time
+
+from collections import OrderedDict
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+# Default size cap of the caches, in bytes of response body
+CACHE_MAX_SIZE = 64 * 1024 * 1024
+# Default size cap of the artifact cache, in bytes of artifact content
+ARTIFACT_CACHE_MAX_SIZE = 10 * 1024 * 1024 * 1024
+
+# Ways of delivering a cached artifact to its destination file
+REFLINK_DELIVERY = "reflink"
+HARDLINK_DELIVERY = "hardlink"
+COPY_DELIVERY = "copy"
+# Default delivery modes: the delivered files never share their content with the cache (see <ArtifactCache>)
+DELIVERY_MODES = (REFLINK_DELIVERY, COPY_DELIVERY)
+# Linux ioctl cloning a file, copy on write (Btrfs, XFS, ...)
+FICLONE = 0x40049409
+# Number of bytes read at once when hashing a file
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class CacheEntry:
+    """Cached response: validators, parsed body and raw response (status, headers and body)."""
+
+    __slots__ = ('etag', 'last_modified', 'content', 'size', 'stored_at', 'status_code', 'headers', 'body')
+
+    def __init__(
+            self,
+            etag: str = None,
+            last_modified: str = None,
+            content=None,
+            size: int = 0,
+            status_code: int = 200,
+            headers: dict = None,
+            body: bytes = None
+    ) -> None:
+        """CTOR.
+        :param etag: Value of the 'ETag' response header [str]
+        :param last_modified: Value of the 'Last-Modified' response header [str]
+        :param content: Parsed body of the response
+        :param size: Size of the response body, in bytes; used to enforce the cache size cap [int]
+        :param status_code: HTTP status code of the response [int]
+        :param headers: Headers of the response [dict]
+        :param body: Raw body of the response, parsed again when served from disk (see <DiskCache>) [bytes]
+        """
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content = content
+        self.size = size
+        self.stored_at = time.time()
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+
+    def to_dict(self) -> dict:
+        """Get the raw response of the entry as a JSON serializable dictionary; the parsed body is left out."""
+        return {
+            'status_code': self.status_code, 'headers': self.headers,
+            'body': base64.b64encode(self.body).decode('ascii'), 'size': self.size, 'etag': self.etag,
+            'last_modified': self.last_modified, 'stored_at': self.stored_at
+        }
+
+    @classmethod
+    def from_dict(cls, values: dict):
+        """Get an entry from its dictionary (see <to_dict>)."""
+        entry = cls(
+            etag=values.get('etag'), last_modified=values.get('last_modified'), size=values['size'],
+            status_code=values['status_code'], headers=values['headers'],
+            body=base64.b64decode(values['body'], validate=True)
+        )
+        entry.stored_at = values['stored_at']
+        return entry
+
+    @property
+    def validators(self) -> dict:
+        """Get the headers of a conditional request revalidating the entry."""
+        headers = dict()
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+
+        return headers
+
+    def is_expired(self, ttl: float = None) -> bool:
+        """Check if the entry was stored more than <ttl> seconds ago."""
+        return ttl is not None and time.time() - self.stored_at > ttl
+
+
+class MemoryCache:
+    """In-memory LRU response cache.
+    Entries are shared between callers, as is: please treat the cached content as read-only. They are served from their
+    parsed body, so their raw body is not kept.
+    """
+
+    __slots__ = ('__max_size', '__max_entries', '__ttl', '__entries', '__size', '__lock')
+
+    def __init__(self, max_size: int = CACHE_MAX_SIZE, max_entries: int = None, ttl: float = None) -> None:
+        """CTOR.
+        :param max_size: Maximum total size of the cached response bodies, in bytes [int]
+        :param max_entries: Maximum number of cached responses; no limit by default [int]
+        :param ttl: Number of seconds after which an entry is evicted; no expiration by default [float]
+        """
+        self.__max_size = max_size
+        self.__max_entries = max_entries
+        self.__ttl = ttl
+        self.__entries = OrderedDict()
+        self.__size = 0
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    @property
+    def size(self) -> int:
+        """Get the total size of the cached response bodies."""
+        return self.__size
+
+    def get(self, key: str) -> CacheEntry:
+        """Get a cached entry, marking it as the most recently used one.
+
+        :param key: Cache key [str]
+        :return: The cached entry; None if not cached or expired
+        """
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return None
+
+            if entry.is_expired(self.__ttl):
+                self.__remove(key)
+                return None
+
+            self.__entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Cache an entry, evicting the least recently used ones if the cache is full.
+
+        :param key: Cache key [str]
+        :param entry: Entry to cache [CacheEntry]
+        """
+
+        if entry.size > self.__max_size:
+            self.delete(key)
+            return
+
+        entry.body = None
+        with self.__lock:
+            self.__remove(key)
+            self.__entries[key] = entry
+            self.__size += entry.size
+
+            while self.__size > self.__max_size or (self.__max_entries and len(self.__entries) > self.__max_entries):
+                self.__remove(next(iter(self.__entries)))
+
+    def revalidated(self, key: str, entry: CacheEntry) -> None:
+        """Record that the server confirmed a cached entry (HTTP 304), so it is fresh again (see <ttl>)."""
+        entry.stored_at = time.time()
+
+    def delete(self, key: str) -> None:
+        """Remove an entry from the cache."""
+        with self.__lock:
+            self.__remove(key)
+
+    def clear(self) -> None:
+        """Remove all the entries from the cache."""
+        with self.__lock:
+            self.__entries.clear()
+            self.__size = 0
+
+    def __remove(self, key: str) -> None:
+        """Remove an entry. Must be called with the lock held."""
+        entry = self.__entries.pop(key, None)
+        if entry is not None:
+            self.__size -= entry.size
+
+
+class DiskCache:
+    """On-disk LRU response cache: one JSON file per entry, holding the raw response, so it survives the process.
+    Served entries hold the raw body of the response only (<CacheEntry.body>): the API clients parse it again, instead
+    of downloading it. The least recently used entries are evicted first, based on the modification time of their files.
+    """
+
+    __slots__ = ('__directory', '__max_size', '__ttl', '__files', '__size', '__lock')
+
+    FILE_SUFFIX = ".cache"
+
+    def __init__(self, directory: str, max_size: int = CACHE_MAX_SIZE, ttl: float = None) -> None:
+        """CTOR.
+        :param directory: Directory holding the cache files; created if missing [str]
+        :param max_size: Maximum total size of the cache files, in bytes [int]
+        :param ttl: Number of seconds after which an entry is evicted; no expiration by default [float]
+        """
+        self.__directory = pathlib.Path(directory)
+        self.__directory.mkdir(parents=True, exist_ok=True)
+        self.__max_size = max_size
+        self.__ttl = ttl
+        self.__lock = threading.Lock()
+
+        # Cache files, least recently used first: {file name: file size}
+        cache_files = sorted(
+            (file_path.stat().st_mtime, file_path.name, file_path.stat().st_size)
+            for file_path in self.__directory.glob(f"*{self.FILE_SUFFIX}")
+        )
+        self.__files = OrderedDict((file_name, file_size) for _, file_name, file_size in cache_files)
+        self.__size = sum(self.__files.values())
+
+    def __len__(self) -> int:
+        return len(self.__files)
+
+    @property
+    def directory(self) -> pathlib.Path:
+        """Get the directory holding the cache files."""
+        return self.__directory
+
+    @property
+    def size(self) -> int:
+        """Get the total size of the cache files."""
+        return self.__size
+
+    def get(self, key: str) -> CacheEntry:
+        """Get a cached entry, marking it as the most recently used one.
+
+        :param key: Cache key [str]
+        :return: The cached entry; None if not cached, expired or unreadable
+        """
+
+        file_name = self.__get_file_name(key)
+        with self.__lock:
+            if file_name not in self.__files:
+                return None
+
+            file_path = self.__directory / file_name
+            try:
+                with open(file_path, 'r') as fd_in:
+                    entry = CacheEntry.from_dict(json.load(fd_in))
+                os.utime(file_path)
+            except (OSError, ValueError, KeyError, TypeError):
+                self.__remove(file_name)
+                return None
+
+            if entry.is_expired(self.__ttl):
+                self.__remove(file_name)
+                return None
+
+            self.__files.move_to_end(file_name)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Cache an entry, evicting the least recently used ones if the cache is full.
+        Entries without their raw body cannot be served again, so they are not stored.
+
+        :param key: Cache key [str]
+        :param entry: Entry to cache [CacheEntry]
+        """
+
+        file_name = self.__get_file_name(key)
+        data = json.dumps(entry.to_dict()).encode('utf-8') if entry.body is not None else None
+
+        with self.__lock:
+            self.__remove(file_name)
+            if data is None or len(data) > self.__max_size:
+                return
+
+            # Write to a temporary file first, so readers never see a partial entry
+            file_path = self.__directory / file_name
+            temporary_file_path = file_path.with_name(f"{file_name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            temporary_file_path.write_bytes(data)
+            os.replace(temporary_file_path, file_path)
+
+            self.__files[file_name] = len(data)
+            self.__size += len(data)
+
+            while self.__size > self.__max_size:
+                self.__remove(next(iter(self.__files)))
+
+    def revalidated(self, key: str, entry: CacheEntry) -> None:
+        """Record that the server confirmed a cached entry (HTTP 304), so it is fresh again (see <ttl>)."""
+        entry.stored_at = time.time()
+        self.set(key, entry)
+
+    def delete(self, key: str) -> None:
+        """Remove an entry from the cache."""
+        with self.__lock:
+            self.__remove(self.__get_file_name(key))
+
+    def clear(self) -> None:
+        """Remove all the entries from the cache."""
+        with self.__lock:
+            for file_name in list(self.__files):
+                self.__remove(file_name)
+
+    def __get_file_name(self, key: str) -> str:
+        """Get the name of the file holding the entry of a key."""
+        return f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}{self.FILE_SUFFIX}"
+
+    def __remove(self, file_name: str) -> None:
+        """Remove an entry file. Must be called with the lock held."""
+        self.__size -= self.__files.pop(file_name, 0)
+        try:
+            os.remove(self.__directory / file_name)
+        except FileNotFoundError:
+            pass
+
+
+def hash_file(hasher, file_path: str):
+    """Feed the content of a file to a hasher (hashlib object).
+
+    :param hasher: The hasher, e.g. hashlib.sha256() [hashlib object]
+    :param file_path: Full path to the file [str]
+    :return: The hasher
+    """
+
+    with open(file_path, 'rb') as fd_in:
+        for chunk in iter(lambda: fd_in.read(HASH_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+
+    return hasher
+
+
+def deliver_file(source_file: str, destination_file: str, delivery_modes: tuple = DELIVERY_MODES) -> str:
+    """Deliver a file to its destination with the first delivery mode supported by the file systems:
+        "reflink" - clone sharing the blocks of the source until either file is modified (Linux, Btrfs/XFS/...)
+        "hardlink" - second name of the source file: same content, same permissions
+        "copy" - plain copy
+    The file shows up whole at the destination, replacing any existing file.
+
+    :param source_file: Full path to the source file [str]
+    :param destination_file: Full path to the destination file [str]
+    :param delivery_modes: Delivery modes, tried in order [tuple]
+    :return: The delivery mode used
+    :raise: OSError if no delivery mode succeeded
+    """
+
+    temporary_file = f"{destination_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    error = OSError(f"No delivery mode in {delivery_modes}")
+    for delivery_mode in delivery_modes:
+        try:
+            if delivery_mode == REFLINK_DELIVERY:
+                if fcntl is None:
+                    continue
+                with open(source_file, 'rb') as fd_in, open(temporary_file, 'wb') as fd_out:
+                    fcntl.ioctl(fd_out.fileno(), FICLONE, fd_in.fileno())
+            elif delivery_mode == HARDLINK_DELIVERY:
+                os.link(source_file, temporary_file)
+            else:
+                shutil.copyfile(source_file, temporary_file)
+
+            os.replace(temporary_file, destination_file)
+            return delivery_mode
+        except OSError as exception:
+            error = exception
+            try:
+                os.remove(temporary_file)
+            except FileNotFoundError:
+                pass
+
+    raise error
+
+
+class ArtifactEntry(CacheEntry):
+    """Cached artifact: validators of its download and SHA-256 digest of its content, the address of the content."""
+
+    __slots__ = ('url', 'sha256')
+
+    def __init__(self, url: str, sha256: str, size: int, etag: str = None, last_modified: str = None) -> None:
+        """CTOR.
+        :param url: URL of the artifact [str]
+        :param sha256: SHA-256 digest of the artifact content, hexadecimal [str]
+        :param size: Size of the artifact, in bytes [int]
+        :param etag: Value of the 'ETag' response header [str]
+        :param last_modified: Value of the 'Last-Modified' response header [str]
+        """
+        super().__init__(etag=etag, last_modified=last_modified, size=size)
+        self.url = url
+        self.sha256 = sha256
+
+    def to_dict(self) -> dict:
+        """Get the entry as a JSON serializable dictionary."""
+        return {
+            'url': self.url, 'sha256': self.sha256, 'size': self.size, 'etag': self.etag,
+            'last_modified': self.last_modified, 'stored_at': self.stored_at
+        }
+
+    @classmethod
+    def from_dict(cls, values: dict):
+        """Get an entry from its dictionary (see <to_dict>)."""
+        entry = cls(
+            url=values['url'], sha256=values['sha256'], size=values['size'], etag=values.get('etag'),
+            last_modified=values.get('last_modified')
+        )
+        entry.stored_at = values['stored_at']
+        return entry
+
+
+class ArtifactCache:
+    """On-disk content-addressed artifact cache, shared by the processes using the same directory.
+    The content of the artifacts is stored once per SHA-256 digest ('objects/<digest>'), whatever the number of URLs
+    serving it; an index file per URL ('index/') holds the validators of its last download and the digest of its
+    content. By default, artifacts are delivered as reflinks or copies, independent of the cache files. Opting in to
+    hard links ("hardlink" delivery mode) saves the copies on file systems without reflinks, but the delivered files
+    are then the cache files themselves: a delivered artifact must be replaced, never modified in place. A cache file
+    whose size changed is evicted when next delivered.
+    The least recently used contents are evicted first, based on the modification time of their files.
+    """
+
+    __slots__ = ('__directory', '__max_size', '__max_age', '__delivery_modes', '__objects', '__size', '__lock')
+
+    OBJECTS_DIR = "objects"
+    INDEX_DIR = "index"
+
+    def __init__(
+            self,
+            directory: str,
+            max_size: int = ARTIFACT_CACHE_MAX_SIZE,
+            max_age: float = None,
+            delivery_modes: tuple = DELIVERY_MODES
+    ) -> None:
+        """CTOR.
+        :param directory: Directory holding the cache files; created if missing [str]
+        :param max_size: Maximum total size of the cached artifacts, in bytes [int]
+        :param max_age: Number of seconds a cached artifact is served without revalidating it with the server
+        (conditional request); always revalidated by default [float]
+        :param delivery_modes: Ways of delivering the cached artifacts, tried in order, among "reflink", "copy" and
+        "hardlink" (opt-in, see <ArtifactCache>); see <deliver_file> [tuple]
+        """
+        self.__directory = pathlib.Path(directory)
+        (self.__directory / self.OBJECTS_DIR).mkdir(parents=True, exist_ok=True)
+        (self.__directory / self.INDEX_DIR).mkdir(parents=True, exist_ok=True)
+        self.__max_size = max_size
+        self.__max_age = max_age
+        self.__delivery_modes = tuple(delivery_modes)
+        self.__lock = threading.Lock()
+
+        # Cached contents, least recently used first: {digest: size}
+        object_files = sorted(
+            (file_path.stat().st_mtime, file_path.name, file_path.stat().st_size)
+            for file_path in (self.__directory / self.OBJECTS_DIR).iterdir() if not file_path.name.endswith(".tmp")
+        )
+        self.__objects = OrderedDict((digest, size) for _, digest, size in object_files)
+        self.__size = sum(self.__objects.values())
+
+    def __len__(self) -> int:
+        return len(self.__objects)
+
+    @property
+    def directory(self) -> pathlib.Path:
+        """Get the directory holding the cache files."""
+        return self.__directory
+
+    @property
+    def size(self) -> int:
+        """Get the total size of the cached artifacts."""
+        return self.__size
+
+    def get(self, url: str) -> ArtifactEntry:
+        """Get the cached entry of an artifact.
+
+        :param url: URL of the artifact [str]
+        :return: The cached entry; None if not cached, evicted or unreadable
+        """
+
+        index_file = self.__get_index_file(url)
+        try:
+            with open(index_file, 'r') as fd_in:
+                entry = ArtifactEntry.from_dict(json.load(fd_in))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError):
+            self.delete(url)
+            return None
+
+        with self.__lock:
+            # Content stored by another process meanwhile
+            if entry.url != url or not self.__adopt(entry.sha256):
+                self.__remove_file(index_file)
+                return None
+
+        return entry
+
+    def is_fresh(self, entry: ArtifactEntry) -> bool:
+        """Check if a cached artifact can be served without revalidating it with the server."""
+        return self.__max_age is not None and not entry.is_expired(self.__max_age)
+
+    def store(
+            self, url: str, file_path: str, sha256: str, etag: str = None, last_modified: str = None
+    ) -> ArtifactEntry:
+        """Cache a downloaded artifact, evicting the least recently used contents if the cache is full.
+        The file is left in place: its content is delivered to the cache (see <deliver_file>) unless already cached.
+        The content is delivered to a temporary file without holding the lock of the cache, so a large artifact stored
+        without reflinks does not hold up the lookups and deliveries of the other artifacts.
+
+        :param url: URL of the artifact [str]
+        :param file_path: Full path to the downloaded artifact [str]
+        :param sha256: SHA-256 digest of the artifact content, hexadecimal [str]
+        :param etag: Value of the 'ETag' response header [str]
+        :param last_modified: Value of the 'Last-Modified' response header [str]
+        :return: The cached entry; None if the artifact is larger than the cache
+        """
+
+        entry = ArtifactEntry(
+            url=url, sha256=sha256, size=os.path.getsize(file_path), etag=etag, last_modified=last_modified
+        )
+        if entry.size > self.__max_size:
+            self.delete(url)
+            return None
+
+        object_file = self.__get_object_file(sha256)
+        with self.__lock:
+            is_cached = self.__touch_object(sha256)
+
+        if not is_cached:
+            temporary_file = object_file.with_name(f"{sha256}.{os.getpid()}.{threading.get_ident()}.tmp")
+            deliver_file(file_path, str(temporary_file), delivery_modes=self.__delivery_modes)
+
+            with self.__lock:
+                # Same content stored by another thread or process meanwhile
+                if self.__touch_object(sha256):
+                    self.__remove_file(temporary_file)
+                else:
+                    os.replace(temporary_file, object_file)
+                    self.__objects[sha256] = entry.size
+                    self.__size += entry.size
+
+                    while self.__size > self.__max_size:
+                        self.__remove_object(next(iter(self.__objects)))
+
+        self.__write_entry(entry)
+        return entry
+
+    def revalidated(self, entry: ArtifactEntry) -> None:
+        """Record that the server confirmed a cached artifact (HTTP 304), so it is fresh again (see <max_age>)."""
+        entry.stored_at = time.time()
+        self.__write_entry(entry)
+
+    def deliver(self, entry: ArtifactEntry, destination_file: str) -> str:
+        """Deliver a cached artifact to its destination, marking it as the most recently used one.
+
+        :param entry: Cached entry of the artifact [ArtifactEntry]
+        :param destination_file: Full path to destination file [str]
+        :return: The delivery mode used (see <deliver_file>); None if the artifact was evicted meanwhile
+        :raise: OSError if the artifact cannot be written to its destination, e.g. missing destination directory
+        """
+
+        object_file = self.__get_object_file(entry.sha256)
+        with self.__lock:
+            if not self.__adopt(entry.sha256):
+                return None
+
+            self.__objects.move_to_end(entry.sha256)
+            try:
+                os.utime(object_file)
+                # Modified in place through a hard link
+                is_altered = object_file.stat().st_size != entry.size
+            except FileNotFoundError:
+                # Evicted by another process
+                is_altered = True
+
+            if is_altered:
+                self.__remove_object(entry.sha256)
+                return None
+
+        try:
+            return deliver_file(str(object_file), destination_file, delivery_modes=self.__delivery_modes)
+        except FileNotFoundError:
+            # The destination path is invalid unless the artifact was evicted by another process meanwhile
+            if object_file.exists():
+                raise
+
+        with self.__lock:
+            self.__remove_object(entry.sha256)
+
+        return None
+
+    def delete(self, url: str) -> None:
+        """Remove the entry of an artifact; its content is left to the eviction, as other URLs may serve it."""
+        self.__remove_file(self.__get_index_file(url))
+
+    def clear(self) -> None:
+        """Remove all the entries and contents from the cache."""
+        with self.__lock:
+            for index_file in (self.__directory / self.INDEX_DIR).iterdir():
+                self.__remove_file(index_file)
+            for digest in list(self.__objects):
+                self.__remove_object(digest)
+
+    def __get_object_file(self, digest: str) -> pathlib.Path:
+        """Get the file holding a content."""
+        return self.__directory / self.OBJECTS_DIR / digest
+
+    def __get_index_file(self, url: str) -> pathlib.Path:
+        """Get the file holding the entry of an artifact URL."""
+        return self.__directory / self.INDEX_DIR / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    def __write_entry(self, entry: ArtifactEntry) -> None:
+        """Write the entry of an artifact; readers never see a partial entry."""
+        index_file = self.__get_index_file(entry.url)
+        temporary_file = index_file.with_name(f"{index_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temporary_file.write_text(json.dumps(entry.to_dict()))
+        os.replace(temporary_file, index_file)
+
+    def __adopt(self, digest: str) -> bool:
+        """Check if a content is cached, tracking the ones stored by other processes. Must be called with the lock
+        held.
+        """
+
+        if digest in self.__objects:
+            return True
+
+        try:
+            size = self.__get_object_file(digest).stat().st_size
+        except FileNotFoundError:
+            return False
+
+        self.__objects[digest] = size
+        self.__size += size
+        return True
+
+    def __touch_object(self, digest: str) -> bool:
+        """Mark a content as the most recently used one, if cached. Must be called with the lock held."""
+
+        if not self.__adopt(digest):
+            return False
+
+        self.__objects.move_to_end(digest)
+        try:
+            os.utime(self.__get_object_file(digest))
+        except FileNotFoundError:
+            # Evicted by another process
+            self.__remove_object(digest)
+            return False
+
+        return True
+
+    def __remove_object(self, digest: str) -> None:
+        """Remove a content. Must be called with the lock held."""
+        self.__size -= self.__objects.pop(digest, 0)
+        self.__remove_file(self.__get_object_file(digest))
+
+    @staticmethod
+    def __remove_file(file_path: pathlib.Path) -> None:
+        """Remove a file, if it exists."""
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
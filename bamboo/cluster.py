@@ -0,0 +1,185 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Cluster module: load balancing and failover across the nodes of a Bamboo server cluster."""
+
+import threading
+import time
+
+
+# Node selection strategies
+LEAST_OUTSTANDING = "least_outstanding"
+LATENCY_WEIGHTED = "latency"
+STRATEGIES = (LEAST_OUTSTANDING, LATENCY_WEIGHTED)
+
+
+class ServerNode:
+    """Health and load of a Bamboo server node."""
+
+    __slots__ = ('url', 'outstanding', 'latency', 'requests', 'failures', 'consecutive_failures', 'ejected_until')
+
+    def __init__(self, url: str) -> None:
+        """CTOR.
+        :param url: Bamboo server URL [str]
+        """
+        self.url = url
+        # Requests in flight
+        self.outstanding = 0
+        # Moving average of the response time, in seconds; None until the first response
+        self.latency = None
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        # Monotonic time until which the node is not used, unless all the nodes are ejected
+        self.ejected_until = 0.0
+
+    def is_ejected(self, now: float) -> bool:
+        """Check if the node is ejected from the pool at the monotonic time <now>."""
+        return self.ejected_until > now
+
+
+class ServerPool:
+    """Pool of Bamboo server nodes serving the same data.
+    Requests are routed to the healthy node with the least requests in flight ("least_outstanding") or with the best
+    response time weighted by the requests in flight ("latency"). A node failing <max_failures> times in a row is
+    ejected for <ejection_time> seconds; it gets requests again afterwards and is ejected again on the first failure.
+    """
+
+    __slots__ = ('__nodes', '__strategy', '__max_failures', '__ejection_time', '__latency_decay', '__lock')
+
+    def __init__(
+            self,
+            server_urls: list,
+            strategy: str = LEAST_OUTSTANDING,
+            max_failures: int = 3,
+            ejection_time: float = 30.0,
+            latency_decay: float = 0.3
+    ) -> None:
+        """CTOR.
+        :param server_urls: URLs of the Bamboo server nodes [list]
+        :param strategy: Node selection strategy, one of STRATEGIES [str]
+        :param max_failures: Number of consecutive failures ejecting a node [int]
+        :param ejection_time: Number of seconds an ejected node does not get requests [float]
+        :param latency_decay: Weight of the last response time in the response time moving average [float]
+        """
+        if not server_urls:
+            raise ValueError("No Bamboo server supplied!")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown node selection strategy: '{strategy}'! Please use one of: {STRATEGIES}")
+
+        self.__nodes = [ServerNode(url=server_url.rstrip("/")) for server_url in server_urls]
+        self.__strategy = strategy
+        self.__max_failures = max_failures
+        self.__ejection_time = ejection_time
+        self.__latency_decay = latency_decay
+        self.__lock = threading.Lock()
+
+    @property
+    def server_urls(self) -> list:
+        """Get the URLs of the Bamboo server nodes."""
+        return [node.url for node in self.__nodes]
+
+    @property
+    def strategy(self) -> str:
+        """Get the node selection strategy."""
+        return self.__strategy
+
+    @property
+    def stats(self) -> dict:
+        """Get the health and load of every node."""
+        now = time.monotonic()
+        with self.__lock:
+            return {
+                node.url: {
+                    'outstanding': node.outstanding,
+                    'latency': node.latency,
+                    'requests': node.requests,
+                    'failures': node.failures,
+                    'ejected': node.is_ejected(now)
+                }
+                for node in self.__nodes
+            }
+
+    def split_url(self, url: str) -> str:
+        """Get the part of a URL following the URL of the node it points to.
+
+        :param url: URL to split [str]
+        :return: The URL path, query included; None if the URL does not point to a node of the pool
+        """
+
+        for node in self.__nodes:
+            if url == node.url or url.startswith(f"{node.url}/") or url.startswith(f"{node.url}?"):
+                return url[len(node.url):]
+
+        return None
+
+    def get_candidates(self) -> list:
+        """Get the node URLs in the order they must be tried: healthy nodes first, best one first, then the ejected
+        nodes, the ones coming back first being first.
+        """
+
+        now = time.monotonic()
+        with self.__lock:
+            healthy_nodes = [node for node in self.__nodes if not node.is_ejected(now)]
+            ejected_nodes = sorted(
+                (node for node in self.__nodes if node.is_ejected(now)), key=lambda node: node.ejected_until
+            )
+            healthy_nodes.sort(key=self.__get_score)
+
+        return [node.url for node in healthy_nodes + ejected_nodes]
+
+    def start_request(self, server_url: str) -> float:
+        """Record a request sent to a node.
+
+        :param server_url: URL of the node [str]
+        :return: Monotonic time the request started at, to pass to <finish_request> [float]
+        """
+        with self.__lock:
+            self.__get_node(server_url).outstanding += 1
+
+        return time.monotonic()
+
+    def finish_request(self, server_url: str, start_time: float, success: bool) -> None:
+        """Record the outcome of a request sent to a node.
+
+        :param server_url: URL of the node [str]
+        :param start_time: Value returned by <start_request> [float]
+        :param success: False if the node failed to answer [bool]
+        """
+
+        response_time = time.monotonic() - start_time
+        with self.__lock:
+            node = self.__get_node(server_url)
+            node.outstanding -= 1
+            node.requests += 1
+
+            if success:
+                node.consecutive_failures = 0
+                node.ejected_until = 0.0
+                node.latency = response_time if node.latency is None else (
+                    self.__latency_decay * response_time + (1 - self.__latency_decay) * node.latency
+                )
+                return
+
+            node.failures += 1
+            node.consecutive_failures += 1
+            # Nodes coming back from an ejection are ejected again on the first failure
+            if node.consecutive_failures >= self.__max_failures or node.ejected_until:
+                node.ejected_until = time.monotonic() + self.__ejection_time
+
+    def __get_node(self, server_url: str) -> ServerNode:
+        """Get a node by its URL."""
+        for node in self.__nodes:
+            if node.url == server_url:
+                return node
+
+        raise ValueError(f"Unknown Bamboo server: '{server_url}'")
+
+    def __get_score(self, node: ServerNode) -> tuple:
+        """Get the score of a node (lower is better). Must be called with the lock held."""
+        # Nodes that never answered get the best latency, so every node gets probed
+        latency = node.latency or 0.0
+        if self.__strategy == LATENCY_WEIGHTED:
+            return latency * (node.outstanding + 1), node.outstanding
+
+        return node.outstanding, latency
@@ -0,0 +1,101 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Coalescing module: share the outcome of identical calls running at the same time, or that just ended."""
+
+import threading
+import time
+
+from collections import OrderedDict
+
+
+class PendingCall:
+    """Call in flight, waited for by the callers coalesced into it."""
+
+    __slots__ = ('done', 'result', 'exception')
+
+    def __init__(self) -> None:
+        """CTOR."""
+        self.done = threading.Event()
+        self.result = None
+        self.exception = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls sharing the same key.
+    The first caller of a key runs the call; the callers arriving while it runs wait for it and get the same result
+    (or exception), instead of running the call again. Results can also be kept for <ttl> seconds, so the callers
+    arriving shortly after the call ended get its result too. Exceptions are never kept.
+    """
+
+    __slots__ = ('__ttl', '__calls', '__results', '__lock')
+
+    def __init__(self, ttl: float = None) -> None:
+        """CTOR.
+        :param ttl: Number of seconds the result of a call is reused for; results are not kept by default [float]
+        """
+        self.__ttl = ttl
+        self.__calls = dict()
+        # Results kept, oldest first: {key: (monotonic expiration time, result)}
+        self.__results = OrderedDict()
+        self.__lock = threading.Lock()
+
+    @property
+    def ttl(self) -> float:
+        """Get the number of seconds the result of a call is reused for."""
+        return self.__ttl
+
+    def clear(self) -> None:
+        """Forget the results kept."""
+        with self.__lock:
+            self.__results.clear()
+
+    def do(self, key, func, *args, **kwargs):
+        """Run <func>, unless a call with the same key is already running: wait for its outcome then.
+
+        :param key: Key identifying the call [hashable]
+        :param func: Callable to run [callable]
+        :param args: Positional arguments of <func>
+        :param kwargs: Keyword arguments of <func>
+        :return: The result of the call
+        :raise: The exception raised by the call
+        """
+
+        with self.__lock:
+            self.__evict_results()
+            if key in self.__results:
+                return self.__results[key][1]
+
+            call = self.__calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self.__calls[key] = PendingCall()
+
+        if not is_leader:
+            call.done.wait()
+            if call.exception is not None:
+                raise call.exception
+
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as exception:
+            call.exception = exception
+            raise
+        finally:
+            with self.__lock:
+                del self.__calls[key]
+                if self.__ttl and call.exception is None:
+                    self.__results.pop(key, None)
+                    self.__results[key] = (time.monotonic() + self.__ttl, call.result)
+            call.done.set()
+
+        return call.result
+
+    def __evict_results(self) -> None:
+        """Forget the expired results. Must be called with the lock held."""
+        # All the results share the same TTL: the oldest ones expire first
+        now = time.monotonic()
+        while self.__results and next(iter(self.__results.values()))[0] <= now:
+            self.__results.popitem(last=False)
@@ -1,12 +1,11 @@
 #!/usr/bin/python -tt
 # -*- coding: utf-8 -*-
 
-"""Config module: holds data for authentication."""
+"""Config module: holds data for authentication, and the optional logging setup."""
 
-import logging.config
+import logging
 import os
 import pathlib
-import yaml
 
 # Default attempt to get the credentials
 BAMBOO_USER = os.getenv('BAMBOO_USER')
@@ -15,9 +14,24 @@ BAMBOO_PASS = os.getenv('BAMBOO_PASS', "NO_PASS")
 # Current working dir
 CURRENT_DIR = pathlib.Path(__file__).resolve().parent
 
-with open(str(CURRENT_DIR / 'logging_config.yaml'), 'r') as fd_in:
-    logging_config = yaml.safe_load(fd_in.read())
-    logging.config.dictConfig(logging_config)
+# Logging configuration applied by <configure_logging>: DEBUG records of all the loggers printed on stdout
+LOGGING_CONFIG_FILE = CURRENT_DIR / 'logging_config.yaml'
 
-# Create a logger
+# Create a logger; the records go to the handlers set up by the application (see <configure_logging>)
 LOGGER = logging.getLogger(__name__)
+LOGGER.addHandler(logging.NullHandler())
+
+
+def configure_logging(config_file: str = None) -> None:
+    """Apply a logging configuration (YAML, dictConfig schema), replacing the one of the application: only call it
+    from the scripts owning their logging setup. Importing the package leaves the logging configuration untouched.
+
+    :param config_file: Path of the configuration file; LOGGING_CONFIG_FILE by default [str]
+    """
+
+    # Imported on request only: the import of the package does not pay for them
+    import logging.config
+    import yaml
+
+    with open(str(config_file or LOGGING_CONFIG_FILE), 'r') as fd_in:
+        logging.config.dictConfig(yaml.safe_load(fd_in.read()))
@@ -0,0 +1,115 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Decoders module: decode the JSON documents returned by the Bamboo server, straight from the response bytes."""
+
+import json
+
+# Third-party libs
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+# JSON decoders
+STDLIB_DECODER = "json"
+ORJSON_DECODER = "orjson"
+UJSON_DECODER = "ujson"
+# Fastest decoder installed
+AUTO_DECODER = "auto"
+JSON_DECODERS = (STDLIB_DECODER, ORJSON_DECODER, UJSON_DECODER, AUTO_DECODER)
+
+DECODERS = {
+    STDLIB_DECODER: json.loads,
+    ORJSON_DECODER: orjson.loads if orjson is not None else None,
+    UJSON_DECODER: ujson.loads if ujson is not None else None
+}
+
+
+def holds_objects(value: list) -> bool:
+    """Check whether a decoded list holds objects not empty once filtered, at any depth.
+
+    :param value: Decoded JSON list [list]
+    :return: True if any of its elements is such an object, or a list holding one
+    """
+    for item in value:
+        item_type = type(item)
+        if (item_type is dict and item) or (item_type is list and holds_objects(item)):
+            return True
+
+    return False
+
+
+class FieldSelector:
+    """Hook of the stdlib JSON decoder keeping only some fields of the decoded objects, at any depth.
+    Objects are filtered as soon as they are decoded, so the parts of the document not selected are dropped on the fly
+    instead of being built into a tree first. The objects and lists holding selected fields are kept; a kept list keeps
+    all its elements, so the objects without any selected field stay in place as empty objects.
+    """
+
+    __slots__ = ('fields',)
+
+    def __init__(self, fields: frozenset) -> None:
+        """CTOR.
+        :param fields: Names of the fields to keep [frozenset]
+        """
+        self.fields = fields
+
+    def __call__(self, pairs: list) -> dict:
+        # Called for every object of the document: kept as lean as possible
+        selected_pairs = dict()
+        for key, value in pairs:
+            if key in self.fields:
+                selected_pairs[key] = value
+            elif value:
+                value_type = type(value)
+                # Objects are kept if not empty once filtered, lists if any of their elements holds such objects
+                if value_type is dict or (value_type is list and holds_objects(value)):
+                    selected_pairs[key] = value
+
+        return selected_pairs
+
+
+def get_json_decoder(decoder: str) -> str:
+    """Get the JSON decoder to use for a decoder name, resolving AUTO_DECODER.
+
+    :param decoder: Decoder name, one of JSON_DECODERS [str]
+    :return: The decoder name
+    :raise: ValueError if the decoder is unknown or not installed
+    """
+
+    if decoder == AUTO_DECODER:
+        return next(name for name in (ORJSON_DECODER, UJSON_DECODER, STDLIB_DECODER) if DECODERS[name] is not None)
+
+    if decoder not in DECODERS:
+        raise ValueError(f"Unknown JSON decoder: '{decoder}'! Please use one of: {JSON_DECODERS}")
+
+    if DECODERS[decoder] is None:
+        raise ValueError(f"JSON decoder '{decoder}' is not installed!")
+
+    return decoder
+
+
+def decode_json(content, decoder: str = STDLIB_DECODER, fields: frozenset = None):
+    """Decode a JSON document.
+
+    :param content: JSON document; bytes are decoded as is by orjson/ujson, and their encoding is detected by the
+    stdlib decoder [bytes/str]
+    :param decoder: Decoder to use, one of JSON_DECODERS [str]
+    :param fields: Names of the fields to keep, at any depth (see <FieldSelector>); the stdlib decoder is used then,
+    as filtering while decoding is as fast as decoding the whole document with a faster decoder then filtering it,
+    without building the whole tree [frozenset]
+    :return: The decoded JSON document
+    :raise: ValueError on invalid JSON document, or unknown decoder
+    """
+
+    if fields:
+        return json.loads(content, object_pairs_hook=FieldSelector(frozenset(fields)))
+
+    return DECODERS[get_json_decoder(decoder)](content)
@@ -0,0 +1,279 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Downloads module: partial files, resume points, integrity checks and artifact cache delivery of the artifact
+downloads, shared by the API clients. Every function here does blocking disk I/O: the asyncio client runs them in the
+default executor.
+"""
+
+import hashlib
+import json
+import os
+
+# Add custom packages
+from bamboo.config import LOGGER
+from bamboo.exceptions import DownloadErrorException
+
+
+# Suffix of the file used while downloading, renamed to the destination file only once the download completed
+PARTIAL_DOWNLOAD_SUFFIX = '.part'
+# Suffix of the file kept next to a partial download, holding the validators used to resume the download
+DOWNLOAD_VALIDATOR_SUFFIX = '.json'
+
+
+def get_partial_files(destination_file: str) -> tuple:
+    """Get the files used while downloading an artifact.
+
+    :param destination_file: Full path to destination file [str]
+    :return: A tuple (partial file, file holding the partial file validators)
+    """
+    partial_file = f"{destination_file}{PARTIAL_DOWNLOAD_SUFFIX}"
+    return partial_file, f"{partial_file}{DOWNLOAD_VALIDATOR_SUFFIX}"
+
+
+def remove_file(file_path: str) -> None:
+    """Remove a file, if it exists."""
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
+
+
+def remove_partial_files(destination_file: str) -> None:
+    """Remove the partial file of a download and its validators."""
+    for file_path in get_partial_files(destination_file):
+        remove_file(file_path)
+
+
+def get_resume_point(url: str, destination_file: str) -> tuple:
+    """Get the offset a partial download can be resumed from and the validator to send in the 'If-Range' header.
+
+    :param url: URL used in to download the artifact [str]
+    :param destination_file: Full path to destination file [str]
+    :return: A tuple (offset, validator); offset is 0 when the download cannot be resumed
+    """
+
+    partial_file, validator_file = get_partial_files(destination_file)
+    if not os.path.isfile(partial_file):
+        return 0, None
+
+    try:
+        with open(validator_file, 'r') as fd_in:
+            validator = json.load(fd_in)
+    except (OSError, ValueError):
+        return 0, None
+
+    # The partial file belongs to another artifact
+    if validator.get('url') != url:
+        return 0, None
+
+    # Weak ETags cannot be used in 'If-Range' headers (RFC 7233)
+    etag = validator.get('etag')
+    if_range = etag if etag and not etag.startswith('W/') else validator.get('last_modified')
+    if not if_range:
+        return 0, None
+
+    return os.path.getsize(partial_file), if_range
+
+
+def save_download_validator(url: str, destination_file: str, headers) -> None:
+    """Save the validators of the artifact being downloaded next to the partial file.
+
+    :param url: URL used in to download the artifact [str]
+    :param destination_file: Full path to destination file [str]
+    :param headers: Headers of the HTTP response of the artifact download [mapping]
+    """
+
+    content_length = headers.get('Content-Length')
+    validator = {
+        'url': url,
+        'etag': headers.get('ETag'),
+        'last_modified': headers.get('Last-Modified'),
+        'size': int(content_length) if content_length and content_length.isdigit() else None
+    }
+
+    with open(get_partial_files(destination_file)[1], 'w') as fd_out:
+        json.dump(validator, fd_out)
+
+
+def parse_content_range(headers) -> tuple:
+    """Parse the 'Content-Range' header of a HTTP response.
+    E.g.: 'bytes 100-199/200' -> (100, 200); 'bytes */200' -> (None, 200)
+
+    :param headers: Headers of the HTTP response [mapping]
+    :return: A tuple (first byte position, complete length); unknown values are set to None
+    """
+
+    content_range = headers.get('Content-Range', "")
+    unit, _, byte_range = content_range.partition(" ")
+    if unit.strip().lower() != "bytes":
+        return None, None
+
+    range_spec, _, total = byte_range.partition("/")
+    start = range_spec.partition("-")[0].strip()
+
+    return (
+        int(start) if start.isdigit() else None,
+        int(total) if total.strip().isdigit() else None
+    )
+
+
+def check_resumed_response(status_code: int, headers, resume_offset: int) -> str:
+    """Check how the server answered a HTTP Range request.
+
+    :param status_code: HTTP code of the artifact download response [int]
+    :param headers: Headers of the HTTP response [mapping]
+    :param resume_offset: Offset the download was resumed from; 0 if no range was requested [int]
+    :return: One of:
+        "none" - no range was requested or the server ignored it
+        "resumed" - the server sent the missing bytes
+        "complete" - the partial file already holds the whole artifact
+        "restart" - the partial file cannot be resumed
+    """
+
+    if not resume_offset or status_code not in [206, 416]:
+        return "none"
+
+    content_range_start, content_range_total = parse_content_range(headers)
+    if status_code == 416:
+        return "complete" if content_range_total == resume_offset else "restart"
+
+    return "resumed" if content_range_start == resume_offset else "restart"
+
+
+def check_content_length(headers, received_bytes: int) -> None:
+    """Check that the whole body announced by the server was received.
+
+    :param headers: Headers of the HTTP response [mapping]
+    :param received_bytes: Number of body bytes received [int]
+    :raise: ValueError if the body is shorter or longer than announced
+    """
+
+    content_length = headers.get('Content-Length', "")
+    if content_length.isdigit() and int(content_length) != received_bytes:
+        raise ValueError(f"received {received_bytes} bytes out of {content_length}")
+
+
+def get_download_hasher(destination_file: str, is_resumed: bool, sha256: str = None, artifact_cache=None):
+    """Get the hasher fed with the content of a download while streamed, if a checksum is needed.
+
+    :param destination_file: Full path to destination file [str]
+    :param is_resumed: The download appends to the partial file, whose bytes are read back once [bool]
+    :param sha256: Expected SHA-256 checksum of the artifact, hexadecimal [str]
+    :param artifact_cache: Cache the artifact is stored in [bamboo.cache.ArtifactCache]
+    :return: A SHA-256 hasher; None if no checksum is needed
+    """
+
+    if not sha256 and artifact_cache is None:
+        return None
+
+    hasher = hashlib.sha256()
+    if is_resumed:
+        # Imported on first use, like the artifact cache: downloads without checksums do not need it
+        from bamboo.cache import hash_file
+
+        hash_file(hasher, get_partial_files(destination_file)[0])
+
+    return hasher
+
+
+def write_chunk(fd_out, chunk: bytes, hasher=None) -> None:
+    """Write a chunk of a download to the partial file, feeding the hasher with it.
+
+    :param fd_out: Partial file, opened for writing [file object]
+    :param chunk: Chunk of the artifact [bytes]
+    :param hasher: SHA-256 hasher fed with the content while streamed, if any [hashlib object]
+    """
+    if hasher is not None:
+        hasher.update(chunk)
+    fd_out.write(chunk)
+
+
+def finish_download(
+        url: str, headers, destination_file: str, hasher=None, sha256: str = None, artifact_cache=None
+) -> None:
+    """Verify the checksum of a complete partial file, cache it and move it to its destination.
+
+    :param url: URL used in to download the artifact [str]
+    :param headers: Headers of the HTTP response of the artifact download [mapping]
+    :param destination_file: Full path to destination file [str]
+    :param hasher: SHA-256 hasher fed with the content while streamed; the partial file is hashed if needed and not
+    given [hashlib object]
+    :param sha256: Expected SHA-256 checksum of the artifact, hexadecimal [str]
+    :param artifact_cache: Cache the artifact is stored in [bamboo.cache.ArtifactCache]
+    :raise: Custom exception on checksum mismatch
+    """
+
+    partial_file, validator_file = get_partial_files(destination_file)
+
+    if hasher is None and (sha256 or artifact_cache is not None):
+        from bamboo.cache import hash_file
+
+        hasher = hash_file(hashlib.sha256(), partial_file)
+    digest = hasher.hexdigest() if hasher is not None else None
+
+    # A corrupt partial file cannot be resumed
+    if sha256 and digest != sha256.lower():
+        remove_partial_files(destination_file)
+        error_message = f"Error when downloading artifact: SHA-256 checksum {digest} instead of {sha256.lower()}"
+        LOGGER.error(error_message)
+        exception = DownloadErrorException(error_message=error_message)
+        raise exception
+
+    if artifact_cache is not None:
+        try:
+            artifact_cache.store(
+                url=url,
+                file_path=partial_file,
+                sha256=digest,
+                etag=headers.get('ETag'),
+                last_modified=headers.get('Last-Modified')
+            )
+        except OSError as exception:
+            LOGGER.warning(f"Artifact not cached: {exception}")
+
+    os.replace(partial_file, destination_file)
+    remove_file(validator_file)
+
+
+def deliver_cached_artifact(artifact_cache, cached_entry, destination_file: str) -> bool:
+    """Deliver a cached artifact to its destination.
+
+    :param artifact_cache: Cache holding the artifact [bamboo.cache.ArtifactCache]
+    :param cached_entry: Cached entry of the artifact [bamboo.cache.ArtifactEntry]
+    :param destination_file: Full path to destination file [str]
+    :return: True if delivered; False if evicted from the cache meanwhile
+    :raise: Custom exception if the artifact cannot be written to its destination
+    """
+
+    try:
+        return bool(artifact_cache.deliver(cached_entry, destination_file))
+    except OSError as exception:
+        error_message = f"Error when delivering cached artifact: {exception}"
+        LOGGER.error(error_message)
+        exception = DownloadErrorException(error_message=error_message)
+        raise exception
+
+
+def get_cached_artifact(artifact_cache, url: str, destination_file: str, sha256: str = None) -> tuple:
+    """Get the cached entry of an artifact, delivering it right away if fresh (see <ArtifactCache.max_age>).
+
+    :param artifact_cache: Cache of the artifacts; None if disabled [bamboo.cache.ArtifactCache]
+    :param url: URL used in to download the artifact [str]
+    :param destination_file: Full path to destination file [str]
+    :param sha256: Expected SHA-256 checksum of the artifact; entries of another content are ignored [str]
+    :return: A tuple (cached entry or None, whether the artifact was delivered)
+    :raise: Custom exception if the artifact cannot be written to its destination
+    """
+
+    cached_entry = artifact_cache.get(url) if artifact_cache is not None else None
+    if cached_entry is None or (sha256 and cached_entry.sha256 != sha256.lower()):
+        return None, False
+
+    if not artifact_cache.is_fresh(cached_entry):
+        return cached_entry, False
+
+    if deliver_cached_artifact(artifact_cache, cached_entry, destination_file):
+        return cached_entry, True
+
+    return None, False
@@ -7,11 +7,14 @@
 class HTTPErrorException(Exception):
     """Custom exception for HTTP requests."""
 
-    def __init__(self, error_message: str) -> None:
+    def __init__(self, error_message: str, is_request_sent: bool = True) -> None:
         """CTOR.
         :param error_message: Error message to return
+        :param is_request_sent: False if the request never reached the server, e.g. connection refused; such a
+        request is safe to send again whatever its method
         """
         super(HTTPErrorException, self).__init__(error_message)
+        self.is_request_sent = is_request_sent
 
 
 class EncodingJSONException(Exception):
@@ -0,0 +1,143 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Index module: local persistent index of the plan results already fetched from the Bamboo server."""
+
+import json
+import sqlite3
+import threading
+
+# Add custom packages
+from bamboo.models import FINAL_LIFE_CYCLE_STATES
+
+
+class PlanResultsIndex:
+    """SQLite index of plan results, keyed by plan key and build number.
+    Used by <BambooAPIClient.sync_plan_results> to only fetch the results not seen yet, and to answer queries about
+    the latest builds of a plan without going to the Bamboo server. The index can be shared between threads.
+    """
+
+    __slots__ = ('__database', '__connection', '__lock')
+
+    def __init__(self, database: str = ":memory:") -> None:
+        """CTOR.
+        :param database: Path to the SQLite database file; kept in memory by default [str]
+        """
+        self.__database = database
+        self.__lock = threading.Lock()
+
+        self.__connection = sqlite3.connect(database, check_same_thread=False)
+        with self.__connection:
+            self.__connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS plan_results (
+                    plan_key TEXT NOT NULL,
+                    build_number INTEGER NOT NULL,
+                    build_result_key TEXT,
+                    build_state TEXT,
+                    life_cycle_state TEXT,
+                    content TEXT NOT NULL,
+                    PRIMARY KEY (plan_key, build_number)
+                )
+                """
+            )
+            self.__connection.execute(
+                "CREATE INDEX IF NOT EXISTS plan_results_key ON plan_results (build_result_key)"
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def database(self) -> str:
+        """Get the path to the SQLite database file."""
+        return self.__database
+
+    def close(self) -> None:
+        """Close the SQLite database."""
+        with self.__lock:
+            self.__connection.close()
+
+    def get_sync_point(self, plan_key: str) -> int:
+        """Get the build number the next sync of a plan must go back to.
+        Results newer than this build number are either unknown or still running, so they must be fetched again.
+
+        :param plan_key: Bamboo plan key [str]
+        :return: The build number; None if the plan was never synced
+        """
+
+        placeholders = ", ".join("?" * len(FINAL_LIFE_CYCLE_STATES))
+        with self.__lock:
+            latest_build_number, oldest_running_build_number = self.__connection.execute(
+                f"""
+                SELECT
+                    MAX(build_number),
+                    MIN(CASE WHEN life_cycle_state NOT IN ({placeholders}) THEN build_number END)
+                FROM plan_results WHERE plan_key = ?
+                """,
+                (*FINAL_LIFE_CYCLE_STATES, plan_key)
+            ).fetchone()
+
+        if oldest_running_build_number is not None:
+            return oldest_running_build_number - 1
+
+        return latest_build_number
+
+    def store_results(self, plan_key: str, results: list) -> int:
+        """Add results to the index, replacing the known ones.
+
+        :param plan_key: Bamboo plan key [str]
+        :param results: Plan results, as decoded from the Bamboo JSON pages [list]
+        :return: Number of results stored [int]
+        """
+
+        rows = [
+            (
+                plan_key,
+                result['buildNumber'],
+                result.get('buildResultKey') or result.get('key'),
+                result.get('buildState'),
+                result.get('lifeCycleState'),
+                json.dumps(result)
+            )
+            for result in results
+            if result.get('buildNumber') is not None
+        ]
+
+        with self.__lock, self.__connection:
+            self.__connection.executemany("INSERT OR REPLACE INTO plan_results VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+        return len(rows)
+
+    def get_latest_results(self, plan_key: str, count: int = 1) -> list:
+        """Get the latest results of a plan, newest first.
+
+        :param plan_key: Bamboo plan key [str]
+        :param count: Number of results to get [int]
+        :return: A list of plan results
+        """
+
+        with self.__lock:
+            rows = self.__connection.execute(
+                "SELECT content FROM plan_results WHERE plan_key = ? ORDER BY build_number DESC LIMIT ?",
+                (plan_key, count)
+            ).fetchall()
+
+        return [json.loads(content) for content, in rows]
+
+    def get_result(self, plan_build_key: str) -> dict:
+        """Get the result of a build.
+
+        :param plan_build_key: Bamboo plan build key, e.g. "PROJ-PLAN-123" [str]
+        :return: The plan result; None if not in the index
+        """
+
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT content FROM plan_results WHERE build_result_key = ?", (plan_build_key,)
+            ).fetchone()
+
+        return json.loads(row[0]) if row else None
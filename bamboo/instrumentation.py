@@ -0,0 +1,334 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Instrumentation module: timing events of the API clients, collected as histograms and exported to Prometheus."""
+
+import bisect
+import threading
+import time
+
+from contextlib import contextmanager
+
+# Add custom packages
+from bamboo.config import LOGGER
+from bamboo.tracing import get_api_method
+
+
+# Upper bounds of the buckets of the duration histograms (seconds)
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Name, type and help of the metrics of the histogram collector
+METRICS = {
+    'bamboo_call_duration_seconds': ("histogram", "Duration of the public API method calls."),
+    'bamboo_request_duration_seconds': ("histogram", "Duration of the HTTP requests, until the response was returned."),
+    'bamboo_request_phase_seconds': (
+        "histogram", "Duration of the DNS resolution, connection, TLS handshake and time to first byte of the requests."
+    ),
+    'bamboo_parse_duration_seconds': ("histogram", "Duration of the parsing of the responses (json, html, models)."),
+    'bamboo_request_bytes_total': ("counter", "Bytes sent (out) and received (in) over HTTP."),
+    'bamboo_parsed_bytes_total': ("counter", "Bytes of the parsed responses."),
+    'bamboo_request_retries_total': ("counter", "Requests sent again after a transient error."),
+    'bamboo_connections_total': ("counter", "Requests sent over a new (reused=false) or a reused connection.")
+}
+
+
+class Instrumentation:
+    """Event bus of the timing events of the API clients.
+    Listeners are called synchronously, in the thread (or task) doing the work, with every event as a dictionary:
+
+        {'event': "call", 'api_method', 'duration', 'error'} - call of a public API method
+        {'event': "request", 'api_method', 'http_method', 'host', 'status_code', 'error', 'attempt', 'dns_time',
+         'connect_time', 'tls_time', 'ttfb', 'total_time', 'bytes_sent', 'bytes_received', 'connection_reused'}
+         - attempt of a HTTP request; retries have an attempt above 1
+        {'event': "parse", 'api_method', 'parser', 'bytes', 'duration', 'error'} - parsing of a response, with the
+         "json", "html" or "models" parser
+        {'event': "download", 'api_method', 'host', 'bytes', 'duration', 'error'} - artifact streamed to disk
+
+    Durations are in seconds, <error> is the name of the exception raised, if any. Requests and parsing done by the
+    public API methods are reported under the name of the outermost method called (<api_method>), None otherwise.
+    Listener errors are logged, and never reach the API clients.
+    """
+
+    __slots__ = ('__listeners', '__lock')
+
+    def __init__(self, listeners: list = None) -> None:
+        """CTOR.
+        :param listeners: Callables getting every event [list]
+        """
+        self.__listeners = tuple(listeners or ())
+        self.__lock = threading.Lock()
+
+    @property
+    def listeners(self) -> tuple:
+        """Get the callables getting every event."""
+        return self.__listeners
+
+    def subscribe(self, listener) -> None:
+        """Add a callable getting every event, e.g. a <HistogramCollector>."""
+        with self.__lock:
+            self.__listeners += (listener,)
+
+    def unsubscribe(self, listener) -> None:
+        """Remove a callable getting every event."""
+        with self.__lock:
+            self.__listeners = tuple(item for item in self.__listeners if item is not listener)
+
+    def emit(self, event: dict) -> None:
+        """Send an event to all the listeners.
+
+        :param event: The event [dict]
+        """
+        for listener in self.__listeners:
+            try:
+                listener(event)
+            except Exception as exception:
+                LOGGER.error(f"Error in instrumentation listener {listener!r}: {exception}")
+
+    @contextmanager
+    def measure(self, event: str, **fields):
+        """Measure the duration of a block of code, emitted as an event once the block is over.
+
+        :param event: Name of the event [str]
+        :param fields: Remaining fields of the event
+        :return: A context manager, giving the fields of the event; the block may update them (e.g. byte counts)
+        """
+
+        start_time = time.perf_counter()
+        error = None
+        try:
+            yield fields
+        except BaseException as exception:
+            error = type(exception).__name__
+            raise
+        finally:
+            self.emit({
+                'event': event,
+                'api_method': get_api_method(),
+                'duration': time.perf_counter() - start_time,
+                'error': error,
+                **fields
+            })
+
+
+class Histogram:
+    """Histogram of observed values: count of the values per bucket, number and sum of the values."""
+
+    __slots__ = ('__buckets', '__counts', '__sum', '__count')
+
+    def __init__(self, buckets: tuple = DURATION_BUCKETS) -> None:
+        """CTOR.
+        :param buckets: Upper bounds of the buckets, increasing; values above the last one go to the +Inf bucket [tuple]
+        """
+        self.__buckets = tuple(buckets)
+        self.__counts = [0] * (len(self.__buckets) + 1)
+        self.__sum = 0.0
+        self.__count = 0
+
+    @property
+    def buckets(self) -> tuple:
+        """Get the upper bounds of the buckets, +Inf excluded."""
+        return self.__buckets
+
+    @property
+    def cumulative_counts(self) -> list:
+        """Get the number of values lower or equal to the upper bound of every bucket, +Inf included."""
+        cumulative_counts, total = [], 0
+        for count in self.__counts:
+            total += count
+            cumulative_counts.append(total)
+
+        return cumulative_counts
+
+    @property
+    def sum(self) -> float:
+        """Get the sum of the values."""
+        return self.__sum
+
+    @property
+    def count(self) -> int:
+        """Get the number of values."""
+        return self.__count
+
+    def copy(self):
+        """Get a copy of the histogram."""
+        histogram = Histogram(buckets=self.__buckets)
+        histogram.__counts = list(self.__counts)
+        histogram.__sum = self.__sum
+        histogram.__count = self.__count
+        return histogram
+
+    def observe(self, value: float) -> None:
+        """Add a value to the histogram."""
+        self.__counts[bisect.bisect_left(self.__buckets, value)] += 1
+        self.__sum += value
+        self.__count += 1
+
+
+class HistogramCollector:
+    """In-memory, thread safe collector of the instrumentation events, as histograms and counters (see <METRICS>).
+    Subscribe it to the instrumentation of the clients, and export the metrics with <to_prometheus_text>:
+
+        collector = HistogramCollector()
+        bamboo_api_client = BambooAPIClient(server_url=..., instrumentation=Instrumentation(listeners=[collector]))
+    """
+
+    __slots__ = ('__buckets', '__histograms', '__counters', '__lock')
+
+    def __init__(self, buckets: tuple = DURATION_BUCKETS) -> None:
+        """CTOR.
+        :param buckets: Upper bounds of the buckets of the duration histograms, in seconds [tuple]
+        """
+        self.__buckets = tuple(buckets)
+        # (metric name, labels) -> Histogram or counter value, labels being a tuple of (name, value) pairs
+        self.__histograms = dict()
+        self.__counters = dict()
+        self.__lock = threading.Lock()
+
+    def __call__(self, event: dict) -> None:
+        """Collect an event."""
+
+        kind = event.get('event')
+        api_method = event.get('api_method') or ""
+        with self.__lock:
+            if kind == "request":
+                self.__collect_request(event, api_method)
+            elif kind == "call":
+                outcome = "error" if event.get('error') else "success"
+                self.__observe('bamboo_call_duration_seconds', event['duration'], api_method=api_method,
+                               outcome=outcome)
+            elif kind == "parse":
+                parser = event.get('parser') or ""
+                self.__observe('bamboo_parse_duration_seconds', event['duration'], api_method=api_method, parser=parser)
+                if event.get('bytes'):
+                    self.__increment('bamboo_parsed_bytes_total', event['bytes'], parser=parser)
+            elif kind == "download":
+                self.__increment('bamboo_request_bytes_total', event.get('bytes') or 0, host=event.get('host') or "",
+                                 direction="in")
+
+    def __collect_request(self, event: dict, api_method: str) -> None:
+        """Collect a request event."""
+
+        host = event.get('host') or ""
+        http_method = event.get('http_method') or ""
+        status_code = event.get('status_code')
+
+        self.__observe(
+            'bamboo_request_duration_seconds', event['total_time'], api_method=api_method, http_method=http_method,
+            host=host, status="error" if status_code is None else str(status_code)
+        )
+        for phase in ("dns", "connect", "tls", "ttfb"):
+            value = event.get('ttfb' if phase == "ttfb" else f"{phase}_time")
+            if value is not None:
+                self.__observe('bamboo_request_phase_seconds', value, api_method=api_method, host=host, phase=phase)
+
+        self.__increment('bamboo_request_bytes_total', event.get('bytes_sent') or 0, host=host, direction="out")
+        self.__increment('bamboo_request_bytes_total', event.get('bytes_received') or 0, host=host, direction="in")
+        if (event.get('attempt') or 1) > 1:
+            self.__increment('bamboo_request_retries_total', 1, api_method=api_method, http_method=http_method,
+                             host=host)
+        if status_code is not None:
+            self.__increment('bamboo_connections_total', 1, host=host,
+                             reused="true" if event.get('connection_reused') else "false")
+
+    def __observe(self, name: str, value: float, **labels) -> None:
+        """Add a value to a histogram."""
+        key = (name, tuple(labels.items()))
+        histogram = self.__histograms.get(key)
+        if histogram is None:
+            histogram = self.__histograms[key] = Histogram(buckets=self.__buckets)
+
+        histogram.observe(value)
+
+    def __increment(self, name: str, value: float, **labels) -> None:
+        """Add a value to a counter."""
+        key = (name, tuple(labels.items()))
+        self.__counters[key] = self.__counters.get(key, 0) + value
+
+    def get_histogram(self, name: str, **labels) -> Histogram:
+        """Get a copy of a histogram by metric name and labels (all of them); None if no value was observed."""
+        with self.__lock:
+            histogram = self.__histograms.get((name, tuple(labels.items())))
+            return None if histogram is None else histogram.copy()
+
+    def get_counter(self, name: str, **labels) -> float:
+        """Get the sum of the counters of a metric having the given labels (any of them)."""
+        with self.__lock:
+            return sum(
+                value for (metric_name, metric_labels), value in self.__counters.items()
+                if metric_name == name and set(labels.items()) <= set(metric_labels)
+            )
+
+    def get_samples(self) -> dict:
+        """Get a snapshot of the metrics.
+
+        :return: A dictionary mapping every metric name to a list of (labels, value) tuples; labels are a tuple of
+        (name, value) pairs, values a Histogram or a number
+        """
+
+        samples = dict()
+        with self.__lock:
+            for (name, labels), histogram in self.__histograms.items():
+                samples.setdefault(name, []).append((labels, histogram.copy()))
+            for (name, labels), value in self.__counters.items():
+                samples.setdefault(name, []).append((labels, value))
+
+        return samples
+
+    def reset(self) -> None:
+        """Drop all the collected values."""
+        with self.__lock:
+            self.__histograms.clear()
+            self.__counters.clear()
+
+
+def format_metric_value(value: float) -> str:
+    """Format a value in the Prometheus text format."""
+
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+
+    return repr(value)
+
+
+def format_labels(labels: tuple) -> str:
+    """Format labels, as (name, value) pairs, in the Prometheus text format."""
+
+    if not labels:
+        return ""
+
+    escaped_labels = (
+        (name, str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r'\"')) for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped_labels) + "}"
+
+
+def to_prometheus_text(collector: HistogramCollector) -> str:
+    """Export the metrics of a collector in the Prometheus text exposition format (version 0.0.4).
+
+    :param collector: The collector [HistogramCollector]
+    :return: The metrics, e.g. to serve on a /metrics endpoint [str]
+    """
+
+    lines = []
+    samples = collector.get_samples()
+    for name, (metric_type, help_text) in METRICS.items():
+        if name not in samples:
+            continue
+
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for labels, value in sorted(samples[name], key=lambda sample: sample[0]):
+            if metric_type != "histogram":
+                lines.append(f"{name}{format_labels(labels)} {format_metric_value(value)}")
+                continue
+
+            bounds = value.buckets + (float("inf"),)
+            for bound, count in zip(bounds, value.cumulative_counts):
+                bucket_labels = labels + (('le', "+Inf" if bound == float("inf") else repr(float(bound))),)
+                lines.append(f"{name}_bucket{format_labels(bucket_labels)} {count}")
+            lines.append(f"{name}_sum{format_labels(labels)} {format_metric_value(value.sum)}")
+            lines.append(f"{name}_count{format_labels(labels)} {value.count}")
+
+    return "\n".join(lines) + "\n" if lines else ""
@@ -0,0 +1,172 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Models module: compact read-only objects holding the plan results and artifacts returned by the Bamboo server.
+Only the commonly used fields of the decoded JSON documents are kept, in slots, so the objects take a fraction of the
+memory of the nested dictionaries they are built from. Fields needing a conversion (dates, artifacts) are converted
+when accessed.
+"""
+
+from datetime import datetime
+
+
+# Life cycle states of the results that will not change any more
+FINAL_LIFE_CYCLE_STATES = ('Finished', 'NotBuilt')
+
+
+class Artifact:
+    """Artifact of a plan build."""
+
+    __slots__ = ('name', 'url', 'producer_job_key', 'shared', 'size')
+
+    def __init__(
+            self, name: str, url: str, producer_job_key: str = None, shared: bool = None, size: int = None
+    ) -> None:
+        """CTOR.
+        :param name: Artifact name [str]
+        :param url: Artifact URL [str]
+        :param producer_job_key: Key of the job that produced the artifact [str]
+        :param shared: Whether the artifact is shared with the other jobs [bool]
+        :param size: Artifact size, in bytes [int]
+        """
+        self.name = name
+        self.url = url
+        self.producer_job_key = producer_job_key
+        self.shared = shared
+        self.size = size
+
+    def __repr__(self) -> str:
+        return f"Artifact(name={self.name!r}, url={self.url!r})"
+
+    @classmethod
+    def from_json(cls, artifact: dict):
+        """Get an artifact from its JSON description, as listed in the expanded plan results.
+
+        :param artifact: Decoded JSON description of the artifact [dict]
+        :return: An Artifact
+        """
+        return cls(
+            name=artifact.get('name'),
+            url=(artifact.get('link') or {}).get('href'),
+            producer_job_key=artifact.get('producerJobKey'),
+            shared=artifact.get('shared'),
+            size=artifact.get('size')
+        )
+
+
+class BuildResult:
+    """Result of a plan build.
+    The plain fields are references to the decoded values, copied when the model is built so the decoded result can be
+    freed; only the fields needing a conversion are converted lazily.
+    """
+
+    __slots__ = (
+        'key', 'plan_key', 'build_number', 'life_cycle_state', 'build_state', 'duration', 'vcs_revision_key',
+        '__started', '__completed', '__artifacts'
+    )
+
+    def __init__(self, result: dict) -> None:
+        """CTOR.
+        :param result: Decoded JSON result of the build [dict]
+        """
+        self.key = result.get('buildResultKey') or result.get('key')
+        self.plan_key = (result.get('plan') or {}).get('key') or result.get('planKey')
+        self.build_number = result.get('buildNumber')
+        self.life_cycle_state = result.get('lifeCycleState')
+        self.build_state = result.get('buildState')
+        self.duration = result.get('buildDurationInSeconds')
+        self.vcs_revision_key = result.get('vcsRevisionKey')
+        # Converted on access
+        self.__started = result.get('buildStartedTime')
+        self.__completed = result.get('buildCompletedTime')
+        self.__artifacts = (result.get('artifacts') or {}).get('artifact') or ()
+
+    def __repr__(self) -> str:
+        return (
+            f"BuildResult(key={self.key!r}, life_cycle_state={self.life_cycle_state!r}, "
+            f"build_state={self.build_state!r})"
+        )
+
+    @property
+    def finished(self) -> bool:
+        """Check if the build reached a final state."""
+        return self.life_cycle_state in FINAL_LIFE_CYCLE_STATES
+
+    @property
+    def successful(self) -> bool:
+        """Check if the build succeeded."""
+        return self.build_state == "Successful"
+
+    @property
+    def started_time(self) -> datetime:
+        """Get the time the build started at; None if not started."""
+        return datetime.fromisoformat(self.__started) if self.__started else None
+
+    @property
+    def completed_time(self) -> datetime:
+        """Get the time the build completed at; None if not completed."""
+        return datetime.fromisoformat(self.__completed) if self.__completed else None
+
+    @property
+    def artifacts(self) -> tuple:
+        """Get the artifacts of the build; listed only by the results queried with their artifacts expanded."""
+        if self.__artifacts and not isinstance(self.__artifacts[0], Artifact):
+            self.__artifacts = tuple(Artifact.from_json(artifact) for artifact in self.__artifacts)
+
+        return tuple(self.__artifacts)
+
+
+class PlanResult:
+    """Page of results of a plan, newest first."""
+
+    __slots__ = ('size', 'start_index', 'max_result', 'results')
+
+    def __init__(self, content: dict) -> None:
+        """CTOR.
+        :param content: Decoded JSON page of plan results [dict]
+        """
+        results = content.get('results') or {}
+        self.size = results.get('size')
+        self.start_index = results.get('start-index')
+        self.max_result = results.get('max-result')
+        self.results = tuple(BuildResult(result) for result in results.get('result', ()))
+
+    def __repr__(self) -> str:
+        return f"PlanResult(size={self.size!r}, results={len(self.results)})"
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def __getitem__(self, index: int) -> BuildResult:
+        return self.results[index]
+
+
+def get_artifacts(artifacts: dict) -> list:
+    """Get the models of the artifacts found in artifact pages.
+
+    :param artifacts: Mapping between the artifact names and their URLs [dict]
+    :return: A list of Artifact
+    """
+    return [Artifact(name=name, url=url) for name, url in artifacts.items()]
+
+
+def decode_results(content: dict):
+    """Get the model of the decoded JSON content of a plan results query.
+
+    :param content: Decoded JSON page of plan results, or result of a single build [dict]
+    :return: A PlanResult for a page of results, a BuildResult for a single build; <content> as is otherwise
+    """
+
+    if not isinstance(content, dict):
+        return content
+
+    if isinstance(content.get('results'), dict):
+        return PlanResult(content)
+
+    if 'buildNumber' in content or 'buildResultKey' in content:
+        return BuildResult(content)
+
+    return content
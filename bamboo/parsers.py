@@ -0,0 +1,124 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Parsers module: extract the links listed in the Bamboo artifact pages."""
+
+from html.parser import HTMLParser
+
+
+# Link added by Bamboo to its error pages (e.g. PAGE NOT FOUND), not an artifact
+SITE_HOMEPAGE_LINK = "Site homepage"
+
+# Parser backends
+STDLIB_BACKEND = "stdlib"
+BS4_BACKEND = "bs4"
+PARSER_BACKENDS = (STDLIB_BACKEND, BS4_BACKEND)
+
+
+class AnchorParser(HTMLParser):
+    """Streaming extractor of the '<a href>' elements of a HTML page.
+    Only the anchors are looked at while the page is tokenized; no document tree is built.
+    """
+
+    def __init__(self) -> None:
+        """CTOR."""
+        super().__init__(convert_charrefs=True)
+
+        self.__links = list()
+        # Href and text chunks of the anchor being parsed; None when outside of an anchor
+        self.__href = None
+        self.__text_chunks = list()
+
+    @property
+    def links(self) -> list:
+        """Get the (link text, link href) tuples found so far."""
+        return self.__links
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        """Start collecting the text of an anchor."""
+        if tag != 'a':
+            return
+
+        # Anchors cannot be nested: a new one closes the previous one
+        self.__close_anchor()
+
+        for name, value in attrs:
+            if name == 'href':
+                self.__href = value or ""
+                break
+
+    def handle_endtag(self, tag: str) -> None:
+        """Store the anchor being parsed."""
+        if tag == 'a':
+            self.__close_anchor()
+
+    def handle_data(self, data: str) -> None:
+        """Collect the text of the anchor being parsed."""
+        if self.__href is not None:
+            self.__text_chunks.append(data)
+
+    def close(self) -> None:
+        """Flush the page and store an anchor left open."""
+        super().close()
+        self.__close_anchor()
+
+    def __close_anchor(self) -> None:
+        """Store the anchor being parsed, if any."""
+        if self.__href is not None:
+            self.__links.append(("".join(self.__text_chunks), self.__href))
+
+        self.__href = None
+        self.__text_chunks = list()
+
+
+def parse_with_stdlib(page: str) -> list:
+    """Get all the '<a href>' elements of a HTML page by using the standard library HTML tokenizer.
+
+    :param page: HTML content of the page [str]
+    :return: A list of (link text, link href) tuples
+    """
+
+    anchor_parser = AnchorParser()
+    anchor_parser.feed(page)
+    anchor_parser.close()
+
+    return anchor_parser.links
+
+
+def parse_with_bs4(page: str) -> list:
+    """Get all the '<a href>' elements of a HTML page by using BeautifulSoup.
+
+    :param page: HTML content of the page [str]
+    :return: A list of (link text, link href) tuples
+    """
+
+    # Third-party libs, imported on first use: the stdlib backend is the default one
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(page, 'html.parser')
+
+    return [
+        (a_href_element.extract().get_text(), a_href_element['href'])
+        for a_href_element in soup.find_all('a', href=True)
+    ]
+
+
+PARSERS = {
+    STDLIB_BACKEND: parse_with_stdlib,
+    BS4_BACKEND: parse_with_bs4
+}
+
+
+def parse_artifact_links(page: str, backend: str = STDLIB_BACKEND) -> list:
+    """Get the links listed in a Bamboo artifact page.
+
+    :param page: HTML content of the artifact page [str]
+    :param backend: Parser to use, one of PARSER_BACKENDS [str]
+    :return: A list of (link text, link href) tuples
+    """
+
+    if backend not in PARSERS:
+        raise ValueError(f"Unknown artifact page parser: '{backend}'! Please use one of: {PARSER_BACKENDS}")
+
+    # Do not add HREF value in case PAGE NOT FOUND error
+    return [(text, href) for text, href in PARSERS[backend](page) if text != SITE_HOMEPAGE_LINK]
@@ -3,19 +3,135 @@
 
 """Requests specific settings."""
 
+import requests
+import threading
+import time
+import weakref
+
 from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.connection import (
+    HTTPConnection,
+    HTTPSConnection
+)
+from requests.packages.urllib3.connectionpool import (
+    HTTPConnectionPool,
+    HTTPSConnectionPool
+)
+from requests.packages.urllib3.exceptions import ConnectTimeoutError
 from requests.packages.urllib3.util.retry import Retry
 
+# Add custom packages
+from bamboo.tracing import ConnectionTimings
+
 
+# Retry strategy of the sessions created for other uses than the API clients, whose requests are retried following
+# their retry policy (see <bamboo.retry.RetryPolicy>). POST requests are not idempotent, so never retried.
+# The methods retried are given as <allowed_methods> since urllib3 1.26, <method_whitelist> before (removed in 2.0).
 RETRY_STRATEGY = Retry(
     backoff_factor=1,
     total=3,
     status_forcelist=[429, 500, 502, 503, 504],
-    method_whitelist=["HEAD", "GET", "POST", "OPTIONS"]
+    **{
+        'allowed_methods' if hasattr(Retry, 'DEFAULT_ALLOWED_METHODS') else 'method_whitelist': [
+            "HEAD", "GET", "OPTIONS"
+        ]
+    }
 )
 
 DEFAULT_TIMEOUT = 5  # seconds
 
+# Default connection pool settings: number of per-host pools kept and number of connections kept per host
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 10
+
+# Timings of the connections of the request in flight in the current thread, if measured (<start_connection_timings>)
+_CONNECTION_TIMINGS = threading.local()
+
+
+def start_connection_timings() -> ConnectionTimings:
+    """Measure the connections used by the next request of the current thread, until <stop_connection_timings>.
+
+    :return: The timings, filled in while the request is in flight [ConnectionTimings]
+    """
+    timings = _CONNECTION_TIMINGS.current = ConnectionTimings()
+    return timings
+
+
+def stop_connection_timings() -> None:
+    """Stop measuring the connections used by the requests of the current thread."""
+    _CONNECTION_TIMINGS.current = None
+
+
+class TimedConnectionMixin:
+    """Reports the connect time (DNS resolution included), the bytes sent and the time the response headers were
+    received to the connection timings of the current thread, if measured.
+    """
+
+    def _new_conn(self):
+        """Open the socket, timing the connection. urllib3 resolves the host and connects in one call, so the DNS
+        resolution is counted in the connect time and its own time is left unknown.
+        """
+
+        timings = getattr(_CONNECTION_TIMINGS, 'current', None)
+        if timings is None:
+            return super()._new_conn()
+
+        start_time = time.perf_counter()
+        conn = super()._new_conn()
+        timings.connected_time = time.perf_counter()
+        timings.connect_time = timings.connected_time - start_time
+        timings.new_connections += 1
+        return conn
+
+    def send(self, data):
+        """Send data to the server, counting the bytes sent."""
+
+        timings = getattr(_CONNECTION_TIMINGS, 'current', None)
+        if timings is not None and isinstance(data, (bytes, bytearray, memoryview)):
+            timings.bytes_sent += len(data)
+
+        return super().send(data)
+
+    def getresponse(self, *args, **kwargs):
+        """Get the response, once its headers were received."""
+
+        response = super().getresponse(*args, **kwargs)
+        timings = getattr(_CONNECTION_TIMINGS, 'current', None)
+        if timings is not None:
+            timings.response_time = time.perf_counter()
+
+        return response
+
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    """HTTP connection reporting its timings (see <TimedConnectionMixin>)."""
+
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+    """HTTPS connection reporting its timings (see <TimedConnectionMixin>), TLS handshake included."""
+
+    def connect(self):
+        """Open the connection and do the TLS handshake, once the socket is open."""
+
+        super().connect()
+        timings = getattr(_CONNECTION_TIMINGS, 'current', None)
+        if timings is not None and timings.connected_time is not None:
+            timings.tls_time = time.perf_counter() - timings.connected_time
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    """HTTP connection pool opening timed connections."""
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    """HTTPS connection pool opening timed connections."""
+    ConnectionCls = TimedHTTPSConnection
+
+
+# Connection pool classes of the sessions, per URL scheme
+TIMED_POOL_CLASSES = {'http': TimedHTTPConnectionPool, 'https': TimedHTTPSConnectionPool}
+
 
 class TimeoutHTTPAdapter(HTTPAdapter):
     """Custom timeout adapter."""
@@ -31,6 +147,12 @@ class TimeoutHTTPAdapter(HTTPAdapter):
 
         super().__init__(max_retries=max_retries, *args, **kwargs)
 
+    def init_poolmanager(self, *args, **kwargs):
+        """Overwrite method from HTTPAdapter base class: connections report their timings when measured."""
+
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = TIMED_POOL_CLASSES
+
     def send(self, request, **kwargs):
         """Overwrite method from HTTPAdapter base class."""
 
@@ -39,3 +161,99 @@ class TimeoutHTTPAdapter(HTTPAdapter):
             kwargs["timeout"] = self.timeout
 
         return super().send(request, **kwargs)
+
+
+def create_session(
+        timeout: float = DEFAULT_TIMEOUT,
+        pool_connections: int = POOL_CONNECTIONS,
+        pool_maxsize: int = POOL_MAXSIZE,
+        pool_block: bool = False,
+        max_retries: Retry = RETRY_STRATEGY
+) -> requests.Session:
+    """Create a HTTP session with a timeout adapter mounted for both http and https usage.
+
+    :param timeout: Default timeout of the requests, in seconds [float]
+    :param pool_connections: Number of per-host connection pools kept by the session [int]
+    :param pool_maxsize: Maximum number of connections kept per host [int]
+    :param pool_block: Wait for a free connection when the pool of a host is full, instead of opening a connection
+    that is discarded once used [bool]
+    :param max_retries: Retry strategy of the requests [Retry]
+    :return: The HTTP session [requests.Session]
+    """
+
+    adapter = TimeoutHTTPAdapter(
+        timeout=timeout,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+        max_retries=max_retries
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return session
+
+
+def get_pool_stats(session: requests.Session) -> dict:
+    """Get the connection pool statistics of a HTTP session.
+
+    :param session: The HTTP session [requests.Session]
+    :return: A dictionary mapping every host ("scheme://host:port") to its number of requests, of new connections
+    opened, of requests sent over a reused connection and of idle connections in the pool
+    """
+
+    stats = dict()
+    for adapter in set(session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        for pool_key in list(pools.keys()):
+            pool = pools.get(pool_key)
+            if pool is None:
+                continue
+
+            stats[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                'requests': pool.num_requests,
+                'new_connections': pool.num_connections,
+                'reused_connections': max(pool.num_requests - pool.num_connections, 0),
+                'idle_connections': pool.pool.qsize() if pool.pool else 0
+            }
+
+    return stats
+
+
+def release_on_close(response: requests.Response, release) -> None:
+    """Call <release> once a streamed response is closed, or garbage collected if it never is.
+    The body of a streamed response is read after the request returned: whatever is held for the request (e.g. a
+    request slot) has to be held until then.
+
+    :param response: The streamed HTTP response [requests.Response]
+    :param release: Function called once, without arguments [callable]
+    """
+
+    # Finalizers run at most once, whether called or collected
+    release_once = weakref.finalize(response, release)
+    close = response.close
+
+    def close_and_release() -> None:
+        try:
+            close()
+        finally:
+            release_once()
+
+    response.close = close_and_release
+
+
+def is_request_sent(exception: requests.RequestException) -> bool:
+    """Check if a failed request may have reached the server: False if the connection could not be opened.
+
+    :param exception: Exception raised by the request [requests.RequestException]
+    """
+
+    if isinstance(exception, requests.ConnectTimeout):
+        return False
+
+    # Connection errors wrap the urllib3 error, itself wrapping the reason of the failure (NewConnectionError is a
+    # ConnectTimeoutError)
+    reason = getattr(exception.args[0], 'reason', None) if exception.args else None
+    return not isinstance(reason, ConnectTimeoutError)
@@ -0,0 +1,216 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Retry module: when and how long to wait before sending a failed request again."""
+
+import random
+import threading
+import time
+
+from email.utils import parsedate_to_datetime
+
+# Add custom packages
+from bamboo.config import LOGGER
+
+
+# HTTP methods safe to send twice
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+# HTTP codes of the transient server errors
+RETRY_STATUS_CODES = frozenset((429, 500, 502, 503, 504))
+
+
+class RetryBudget:
+    """Cap on the share of the requests that are retries, shared by all the requests of a client.
+    Every request sent for the first time deposits <ratio> token, every retry withdraws one token; retries are refused
+    when the budget is empty. A server failing every request then gets at most (1 + <ratio>) times the requests it
+    would get without retries, instead of (1 + <total>) times, so retries cannot turn an overload into an outage.
+    """
+
+    __slots__ = ('__ratio', '__max_tokens', '__tokens', '__lock')
+
+    def __init__(self, ratio: float = 0.2, max_tokens: float = 10.0) -> None:
+        """CTOR.
+        :param ratio: Maximum number of retries per request, in the long run [float]
+        :param max_tokens: Maximum number of retries saved up, allowing bursts of retries after a quiet period [float]
+        """
+        if ratio < 0 or max_tokens < 1:
+            raise ValueError(f"Invalid retry budget: ratio {ratio}, max tokens {max_tokens}")
+
+        self.__ratio = ratio
+        self.__max_tokens = max_tokens
+        self.__tokens = max_tokens
+        self.__lock = threading.Lock()
+
+    @property
+    def tokens(self) -> float:
+        """Get the number of retries currently allowed."""
+        return self.__tokens
+
+    def deposit(self) -> None:
+        """Record a request sent for the first time."""
+        with self.__lock:
+            self.__tokens = min(self.__max_tokens, self.__tokens + self.__ratio)
+
+    def withdraw(self) -> bool:
+        """Take a retry out of the budget.
+
+        :return: False if the budget is empty: the request must not be retried [bool]
+        """
+        with self.__lock:
+            if self.__tokens < 1:
+                return False
+
+            self.__tokens -= 1
+            return True
+
+
+class RetryPolicy:
+    """Retry policy of the HTTP requests.
+    Requests failing on a transient error (connection error, HTTP 429/5xx) are sent again up to <total> times, after an
+    exponential backoff with jitter, or after the delay asked for by the server ('Retry-After' header). Requests with
+    a non idempotent method (POST) are only sent again when the previous attempt never reached the server (connection
+    refused or timed out), unless flagged as idempotent by the caller: a trigger plan request is never sent twice.
+    """
+
+    __slots__ = (
+        'total', 'backoff_factor', 'max_backoff', 'status_codes', 'respect_retry_after', 'max_retry_after', 'budget'
+    )
+
+    def __init__(
+            self,
+            total: int = 3,
+            backoff_factor: float = 0.5,
+            max_backoff: float = 10.0,
+            status_codes: frozenset = RETRY_STATUS_CODES,
+            respect_retry_after: bool = True,
+            max_retry_after: float = 60.0,
+            budget: RetryBudget = None
+    ) -> None:
+        """CTOR.
+        :param total: Maximum number of retries of a request [int]
+        :param backoff_factor: Delay before the first retry, in seconds; doubled on every retry [float]
+        :param max_backoff: Maximum delay between two attempts, in seconds [float]
+        :param status_codes: HTTP codes of the responses worth retrying [frozenset]
+        :param respect_retry_after: Wait for the delay asked for by the server in the 'Retry-After' header [bool]
+        :param max_retry_after: Maximum delay accepted from a 'Retry-After' header, in seconds; the response is
+        returned as is if the server asks for more [float]
+        :param budget: Budget shared by the requests the policy applies to; no budget by default [RetryBudget]
+        """
+        self.total = total
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.status_codes = frozenset(status_codes)
+        self.respect_retry_after = respect_retry_after
+        self.max_retry_after = max_retry_after
+        self.budget = budget
+
+    def __repr__(self) -> str:
+        return f"RetryPolicy(total={self.total}, backoff_factor={self.backoff_factor}, budget={self.budget})"
+
+    def is_retryable_status(self, method: str, status_code: int, idempotent: bool = None) -> bool:
+        """Check if a response is worth retrying.
+
+        :param method: HTTP method of the request [str]
+        :param status_code: HTTP code of the response [int]
+        :param idempotent: Whether the request is safe to send twice; guessed from the method by default [bool]
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        return idempotent and status_code in self.status_codes
+
+    @staticmethod
+    def is_retryable_error(method: str, is_request_sent: bool, idempotent: bool = None) -> bool:
+        """Check if a connection error is worth retrying.
+
+        :param method: HTTP method of the request [str]
+        :param is_request_sent: False if the request never reached the server, e.g. connection refused [bool]
+        :param idempotent: Whether the request is safe to send twice; guessed from the method by default [bool]
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        return idempotent or not is_request_sent
+
+    def get_delay(self, retry_number: int, headers: dict = None) -> float:
+        """Get the number of seconds to wait before a retry.
+
+        :param retry_number: Number of the retry, starting at 1 [int]
+        :param headers: Headers of the failed response, if any [dict]
+        :return: The delay; None if the server asks for a longer delay than accepted [float]
+        """
+
+        retry_after = self.get_retry_after(headers) if self.respect_retry_after and headers else None
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_retry_after else None
+
+        backoff = min(self.max_backoff, self.backoff_factor * 2 ** (retry_number - 1))
+        # Equal jitter: clients failing at the same time do not retry at the same time
+        return backoff / 2 + random.uniform(0, backoff / 2)
+
+    @staticmethod
+    def get_retry_after(headers: dict) -> float:
+        """Get the delay asked for by the server in the 'Retry-After' header, in seconds; None if missing or invalid.
+
+        :param headers: Response headers [dict]
+        """
+
+        retry_after = headers.get('Retry-After')
+        if not retry_after:
+            return None
+
+        retry_after = retry_after.strip()
+        if retry_after.isdigit():
+            return float(retry_after)
+
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError, IndexError):
+            return None
+
+    def get_retry_delay(
+            self,
+            method: str,
+            retry_number: int,
+            idempotent: bool = None,
+            status_code: int = None,
+            headers: dict = None,
+            is_request_sent: bool = True
+    ) -> float:
+        """Check if a failed request is to be sent again, taking the retry out of the budget if so.
+
+        :param method: HTTP method of the request [str]
+        :param retry_number: Number of the retry, starting at 1 [int]
+        :param idempotent: Whether the request is safe to send twice; guessed from the method by default [bool]
+        :param status_code: HTTP code of the response; None if the request failed on a connection error [int]
+        :param headers: Headers of the response, if any [dict]
+        :param is_request_sent: False if the request never reached the server, e.g. connection refused [bool]
+        :return: Number of seconds to wait before sending the request again; None if not to be retried [float]
+        """
+
+        if status_code is None:
+            is_retryable = self.is_retryable_error(method, is_request_sent=is_request_sent, idempotent=idempotent)
+        else:
+            is_retryable = self.is_retryable_status(method, status_code=status_code, idempotent=idempotent)
+
+        if not is_retryable or retry_number > self.total:
+            return None
+
+        delay = self.get_delay(retry_number, headers=headers)
+        if delay is None:
+            return None
+
+        if self.budget is not None and not self.budget.withdraw():
+            LOGGER.warning("Retry budget exhausted, the failed request is not retried")
+            return None
+
+        return delay
+
+    def record_request(self) -> None:
+        """Record a request sent for the first time."""
+        if self.budget is not None:
+            self.budget.deposit()
+
+
+# Requests are never retried
+NO_RETRY = RetryPolicy(total=0)
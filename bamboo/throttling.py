@@ -0,0 +1,452 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Throttling module: primitives used to bound the load put on the Bamboo server(s) and on the network."""
+
+import os
+import re
+import threading
+import time
+
+from contextlib import (
+    contextmanager,
+    nullcontext
+)
+from urllib.parse import urlsplit
+
+# POSIX only: limits shared across processes
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Add custom packages
+from bamboo.config import LOGGER
+
+
+# HTTP codes of the responses of an overloaded server, slowing the requests down
+OVERLOAD_STATUS_CODES = frozenset((429, 503))
+# Factor applied to the request rate of an overloaded server, and minimum delay between two decreases (seconds), so a
+# burst of responses to requests sent at the same rate divides it once
+RATE_DECREASE_FACTOR = 0.5
+RATE_DECREASE_COOLDOWN = 1.0
+# Number of seconds the request rate takes to grow back from zero to its setting, once the server recovered
+RATE_RECOVERY_TIME = 30.0
+# Bounds of the interval between two attempts to get a slot held by another process (seconds)
+SLOT_POLL_MIN_INTERVAL = 0.005
+SLOT_POLL_MAX_INTERVAL = 0.1
+
+
+def get_host(url: str) -> str:
+    """Get the host (scheme://host:port) an URL points to.
+
+    :param url: URL [str]
+    """
+    url_parts = urlsplit(url)
+    return f"{url_parts.scheme}://{url_parts.netloc}".lower()
+
+
+class TokenBucket:
+    """Thread safe token bucket.
+    Tokens are added at <rate> tokens per second, up to <capacity> tokens. Consumers asking for more tokens than
+    available are put to sleep until the bucket refills, so the long term throughput never exceeds <rate>.
+    """
+
+    __slots__ = ('__rate', '__capacity', '__tokens', '__timestamp', '__lock')
+
+    def __init__(self, rate: float, capacity: float = None) -> None:
+        """CTOR.
+        :param rate: Number of tokens added to the bucket every second [float]
+        :param capacity: Maximum number of tokens the bucket holds (burst size); defaults to <rate> [float]
+        """
+        if not rate or rate <= 0:
+            raise ValueError(f"Invalid token bucket rate: {rate}")
+
+        self.__rate = rate
+        self.__capacity = capacity or rate
+        self.__tokens = self.__capacity
+        self.__timestamp = time.monotonic()
+        self.__lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        """Get the number of tokens added every second."""
+        return self.__rate
+
+    @rate.setter
+    def rate(self, rate: float) -> None:
+        """Sets the number of tokens added every second; the tokens earned so far are kept."""
+        if not rate or rate <= 0:
+            raise ValueError(f"Invalid token bucket rate: {rate}")
+
+        with self.__lock:
+            self.__refill()
+            self.__rate = rate
+
+    @property
+    def capacity(self) -> float:
+        """Get the maximum number of tokens the bucket holds."""
+        return self.__capacity
+
+    def consume(self, amount: float = 1) -> float:
+        """Take tokens out of the bucket, sleeping until they are available.
+        Requests bigger than the bucket capacity are allowed: the bucket goes into debt and the caller (and the
+        following ones) wait until it is paid back.
+
+        :param amount: Number of tokens to take [float]
+        :return: Number of seconds the caller waited [float]
+        """
+
+        with self.__lock:
+            self.__refill()
+            self.__tokens -= amount
+            wait_time = -self.__tokens / self.__rate if self.__tokens < 0 else 0.0
+
+        if wait_time:
+            time.sleep(wait_time)
+
+        return wait_time
+
+    def __refill(self) -> None:
+        """Add the tokens earned since the last refill. Must be called with the lock held."""
+        now = time.monotonic()
+        self.__tokens = min(self.__capacity, self.__tokens + (now - self.__timestamp) * self.__rate)
+        self.__timestamp = now
+
+
+class HostLimiter:
+    """Bound the number of concurrent operations per host (scheme://host:port)."""
+
+    __slots__ = ('__max_per_host', '__semaphores', '__lock')
+
+    def __init__(self, max_per_host: int) -> None:
+        """CTOR.
+        :param max_per_host: Maximum number of concurrent operations against the same host [int]
+        """
+        if not max_per_host or max_per_host < 1:
+            raise ValueError(f"Invalid number of concurrent operations per host: {max_per_host}")
+
+        self.__max_per_host = max_per_host
+        self.__semaphores = dict()
+        self.__lock = threading.Lock()
+
+    @property
+    def max_per_host(self) -> int:
+        """Get the maximum number of concurrent operations per host."""
+        return self.__max_per_host
+
+    @contextmanager
+    def limit(self, url: str):
+        """Context manager holding one of the slots of the host <url> points to.
+
+        :param url: URL of the resource accessed while holding the slot [str]
+        """
+
+        host = get_host(url)
+
+        with self.__lock:
+            semaphore = self.__semaphores.setdefault(host, threading.BoundedSemaphore(self.__max_per_host))
+
+        with semaphore:
+            yield
+
+
+class FileTokenBucket:
+    """Token bucket shared by the processes of the machine, its state kept in a file guarded by an exclusive lock.
+    Same interface as <TokenBucket>; the rate is shared too, so a rate adjusted by a process applies to all.
+    """
+
+    __slots__ = ('__path', '__rate', '__capacity')
+
+    def __init__(self, path: str, rate: float, capacity: float = None) -> None:
+        """CTOR.
+        :param path: Path of the state file, created on first use [str]
+        :param rate: Number of tokens added to the bucket every second, unless set by another process [float]
+        :param capacity: Maximum number of tokens the bucket holds (burst size); defaults to <rate> [float]
+        """
+        if fcntl is None:
+            raise ValueError("Token buckets shared across processes require POSIX file locks!")
+
+        if not rate or rate <= 0:
+            raise ValueError(f"Invalid token bucket rate: {rate}")
+
+        self.__path = path
+        self.__rate = rate
+        self.__capacity = capacity or rate
+
+    @property
+    def rate(self) -> float:
+        """Get the number of tokens added every second."""
+        with self.__locked_state() as state:
+            return state['rate']
+
+    @rate.setter
+    def rate(self, rate: float) -> None:
+        """Sets the number of tokens added every second, for all the processes; the tokens earned so far are kept."""
+        if not rate or rate <= 0:
+            raise ValueError(f"Invalid token bucket rate: {rate}")
+
+        with self.__locked_state() as state:
+            state['rate'] = rate
+
+    @property
+    def capacity(self) -> float:
+        """Get the maximum number of tokens the bucket holds."""
+        return self.__capacity
+
+    def consume(self, amount: float = 1) -> float:
+        """Take tokens out of the bucket, sleeping until they are available (see <TokenBucket.consume>).
+
+        :param amount: Number of tokens to take [float]
+        :return: Number of seconds the caller waited [float]
+        """
+
+        with self.__locked_state() as state:
+            state['tokens'] -= amount
+            wait_time = -state['tokens'] / state['rate'] if state['tokens'] < 0 else 0.0
+
+        if wait_time:
+            time.sleep(wait_time)
+
+        return wait_time
+
+    @contextmanager
+    def __locked_state(self):
+        """Context manager holding the lock of the state file, yielding the refilled state to update."""
+
+        with open(self.__path, 'a+') as state_file:
+            fcntl.flock(state_file, fcntl.LOCK_EX)
+
+            state_file.seek(0)
+            try:
+                tokens, timestamp, rate = (float(value) for value in state_file.read().split())
+            except ValueError:
+                tokens, timestamp, rate = self.__capacity, time.time(), self.__rate
+
+            # Wall clock time: the monotonic clock is not comparable across processes on every platform
+            now = time.time()
+            state = {'tokens': min(self.__capacity, tokens + max(now - timestamp, 0) * rate), 'rate': rate}
+
+            yield state
+
+            state_file.truncate(0)
+            state_file.write(f"{state['tokens']!r} {now!r} {state['rate']!r}")
+            state_file.flush()
+
+
+class FileSemaphore:
+    """Semaphore shared by the processes of the machine: one lock file per slot."""
+
+    __slots__ = ('__path', '__value')
+
+    def __init__(self, path: str, value: int) -> None:
+        """CTOR.
+        :param path: Path prefix of the lock files, created on first use [str]
+        :param value: Number of slots [int]
+        """
+        if fcntl is None:
+            raise ValueError("Semaphores shared across processes require POSIX file locks!")
+
+        if not value or value < 1:
+            raise ValueError(f"Invalid number of slots: {value}")
+
+        self.__path = path
+        self.__value = value
+
+    @contextmanager
+    def slot(self):
+        """Context manager holding one of the slots, waiting until one is free."""
+
+        poll_interval = SLOT_POLL_MIN_INTERVAL
+        while True:
+            for slot_number in range(self.__value):
+                lock_file = open(f"{self.__path}.{slot_number}.lock", 'a')
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    lock_file.close()
+                    continue
+
+                # Closing the file releases the lock
+                with lock_file:
+                    yield
+                return
+
+            time.sleep(poll_interval)
+            poll_interval = min(poll_interval * 2, SLOT_POLL_MAX_INTERVAL)
+
+
+class ServerLimiter:
+    """Rate limiter and concurrency governor of the requests to a single server.
+    The request rate adapts to the load of the server (AIMD): it is divided on HTTP 429/503 responses, and grows back
+    linearly to its setting while the server answers normally.
+    """
+
+    __slots__ = (
+        '__bucket', '__semaphore', '__max_rate', '__min_rate', '__adaptive', '__last_decrease', '__last_adjustment',
+        '__lock'
+    )
+
+    def __init__(
+            self,
+            rate: float = None,
+            burst: float = None,
+            max_concurrency: int = None,
+            min_rate: float = None,
+            adaptive: bool = True,
+            lock_path: str = None
+    ) -> None:
+        """CTOR.
+        :param rate: Maximum number of requests per second; not limited if None [float]
+        :param burst: Maximum number of requests sent at once after a quiet period; defaults to 1 [float]
+        :param max_concurrency: Maximum number of requests in flight; not limited if None [int]
+        :param min_rate: Lowest rate an overloaded server slows the requests down to; defaults to 1/10 of <rate> [float]
+        :param adaptive: Adjust the rate to the HTTP 429/503 responses of the server [bool]
+        :param lock_path: Path prefix of the files holding the limits shared with the other processes; the limits
+        are per process if None [str]
+        """
+        self.__bucket = None
+        if rate:
+            self.__bucket = (
+                TokenBucket(rate=rate, capacity=burst or 1) if lock_path is None
+                else FileTokenBucket(path=f"{lock_path}.bucket", rate=rate, capacity=burst or 1)
+            )
+
+        self.__semaphore = None
+        if max_concurrency:
+            self.__semaphore = (
+                threading.BoundedSemaphore(max_concurrency) if lock_path is None
+                else FileSemaphore(path=lock_path, value=max_concurrency)
+            )
+
+        self.__max_rate = rate
+        self.__min_rate = min_rate or (rate or 0) / 10
+        self.__adaptive = adaptive
+        self.__last_decrease = float('-inf')
+        self.__last_adjustment = time.monotonic()
+        self.__lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        """Get the current maximum number of requests per second; None if not limited."""
+        return self.__bucket.rate if self.__bucket is not None else None
+
+    @contextmanager
+    def limit(self):
+        """Context manager holding a request slot, once the rate allows a new request."""
+
+        with self.__get_slot():
+            if self.__bucket is not None:
+                self.__bucket.consume()
+            yield self
+
+    def __get_slot(self):
+        """Get the context manager holding a request slot."""
+
+        if self.__semaphore is None:
+            return nullcontext()
+
+        if isinstance(self.__semaphore, FileSemaphore):
+            return self.__semaphore.slot()
+
+        return self.__semaphore
+
+    def record_status(self, status_code: int) -> None:
+        """Adjust the request rate to the HTTP code of a response of the server.
+
+        :param status_code: HTTP code of the response [int]
+        """
+
+        if not self.__adaptive or self.__bucket is None or status_code >= 500 and status_code != 503:
+            return
+
+        now = time.monotonic()
+        with self.__lock:
+            rate = self.__bucket.rate
+            if status_code in OVERLOAD_STATUS_CODES:
+                if now - self.__last_decrease < RATE_DECREASE_COOLDOWN:
+                    return
+                new_rate = max(self.__min_rate, rate * RATE_DECREASE_FACTOR)
+                self.__last_decrease = now
+            else:
+                recovered_rate = self.__max_rate * (now - self.__last_adjustment) / RATE_RECOVERY_TIME
+                new_rate = min(self.__max_rate, rate + recovered_rate)
+
+            self.__last_adjustment = now
+            if new_rate == rate:
+                return
+
+            self.__bucket.rate = new_rate
+
+        if new_rate < rate:
+            LOGGER.warning(f"Server overloaded (HTTP {status_code}), request rate lowered to {new_rate:.2f}/s")
+
+
+class RequestGovernor:
+    """Rate limiter and concurrency governor of the requests of the API clients, per server (scheme://host:port).
+    Limits can be shared by all the processes of the machine (POSIX only), through files kept in <lock_dir>: a fleet of
+    scripts running on a machine then puts the load of a single client on the server.
+    """
+
+    __slots__ = ('__limits', '__server_limits', '__lock_dir', '__limiters', '__lock')
+
+    def __init__(
+            self,
+            rate: float = None,
+            burst: float = None,
+            max_concurrency: int = None,
+            min_rate: float = None,
+            adaptive: bool = True,
+            server_limits: dict = None,
+            lock_dir: str = None
+    ) -> None:
+        """CTOR.
+        :param rate: Maximum number of requests per second to a server; not limited if None [float]
+        :param burst: Maximum number of requests sent at once to a server after a quiet period; defaults to 1 [float]
+        :param max_concurrency: Maximum number of requests in flight to a server; not limited if None [int]
+        :param min_rate: Lowest rate an overloaded server slows the requests down to; defaults to 1/10 of <rate> [float]
+        :param adaptive: Adjust the rate to the HTTP 429/503 responses of the servers [bool]
+        :param server_limits: Limits overriding the above ones per server URL, e.g. {"https://bamboo:8085": {"rate": 5,
+        "max_concurrency": 2}} [dict]
+        :param lock_dir: Directory of the files holding the limits shared with the other processes; the limits are
+        per process if None [str]
+        """
+        if lock_dir is not None and fcntl is None:
+            raise ValueError("Limits shared across processes require POSIX file locks!")
+
+        self.__limits = {
+            'rate': rate, 'burst': burst, 'max_concurrency': max_concurrency, 'min_rate': min_rate, 'adaptive': adaptive
+        }
+        self.__server_limits = {get_host(url): limits for url, limits in (server_limits or {}).items()}
+        self.__lock_dir = lock_dir
+        self.__limiters = dict()
+        self.__lock = threading.Lock()
+
+    def get_limiter(self, url: str) -> ServerLimiter:
+        """Get the limiter of the server an URL points to, created on first use.
+
+        :param url: URL [str]
+        """
+
+        host = get_host(url)
+        limiter = self.__limiters.get(host)
+        if limiter is not None:
+            return limiter
+
+        with self.__lock:
+            if host not in self.__limiters:
+                limits = dict(self.__limits, **self.__server_limits.get(host, {}))
+                if self.__lock_dir is not None:
+                    os.makedirs(self.__lock_dir, exist_ok=True)
+                    limits['lock_path'] = os.path.join(self.__lock_dir, re.sub(r"[^\w.-]", "_", host))
+
+                self.__limiters[host] = ServerLimiter(**limits)
+
+            return self.__limiters[host]
+
+    def limit(self, url: str):
+        """Context manager holding a request slot of the server an URL points to, yielding its <ServerLimiter>.
+
+        :param url: URL of the request [str]
+        """
+        return self.get_limiter(url).limit()
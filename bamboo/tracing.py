@@ -0,0 +1,86 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Tracing module: hooks the API clients report their timings through, to their instrumentation if any.
+Kept apart from <bamboo.instrumentation>, so the clients do not load the instrumentation until one is used.
+"""
+
+import contextvars
+import functools
+
+from contextlib import nullcontext
+from inspect import iscoroutinefunction
+
+
+# Returned instead of a measure when the instrumentation is disabled: gives no event fields
+NO_MEASURE = nullcontext()
+
+
+# Name of the public API method in progress in the current thread or task; None outside of the API methods
+_API_METHOD = contextvars.ContextVar('bamboo_api_method', default=None)
+
+
+def get_api_method() -> str:
+    """Get the name of the public API method in progress, the requests and parsing are reported under."""
+    return _API_METHOD.get()
+
+
+class ConnectionTimings:
+    """Timings of the connections used by a HTTP request, filled in by the HTTP stack while the request is in flight.
+    Times are in seconds; the ones of the phases that did not happen (e.g. on a reused connection) or that are not
+    measured apart (the DNS resolution of the requests client, counted in its connect time) are None.
+    """
+
+    __slots__ = ('dns_time', 'connect_time', 'tls_time', 'connected_time', 'response_time', 'new_connections',
+                 'bytes_sent')
+
+    def __init__(self) -> None:
+        """CTOR."""
+        self.dns_time = None
+        self.connect_time = None
+        self.tls_time = None
+        # Performance counter values: end of the last connection opened, response headers received
+        self.connected_time = None
+        self.response_time = None
+        self.new_connections = 0
+        self.bytes_sent = 0
+
+
+def instrumented(method):
+    """Decorator measuring the calls of a public API method (or coroutine) of a client with an instrumentation set.
+    Calls made from another public API method are not measured on their own: their requests and parsing are reported
+    under the outermost method.
+    """
+
+    name = method.__name__
+
+    if iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def async_inner(self, *args, **kwargs):
+            instrumentation = self.instrumentation
+            if instrumentation is None or _API_METHOD.get() is not None:
+                return await method(self, *args, **kwargs)
+
+            token = _API_METHOD.set(name)
+            try:
+                with instrumentation.measure("call"):
+                    return await method(self, *args, **kwargs)
+            finally:
+                _API_METHOD.reset(token)
+
+        return async_inner
+
+    @functools.wraps(method)
+    def inner(self, *args, **kwargs):
+        instrumentation = self.instrumentation
+        if instrumentation is None or _API_METHOD.get() is not None:
+            return method(self, *args, **kwargs)
+
+        token = _API_METHOD.set(name)
+        try:
+            with instrumentation.measure("call"):
+                return method(self, *args, **kwargs)
+        finally:
+            _API_METHOD.reset(token)
+
+    return inner
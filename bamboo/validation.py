@@ -3,8 +3,79 @@
 
 """Validation module: used to check if the method input params were initialized with actual values."""
 
-from functools import wraps
-from inspect import getcallargs as ins_getcallargs
+import contextvars
+
+from contextlib import contextmanager
+from functools import (
+    lru_cache,
+    wraps
+)
+from inspect import (
+    Parameter,
+    iscoroutinefunction,
+    signature as ins_signature
+)
+
+
+# Whether the inputs of the method calls are validated in the current thread or task (see <Validation.disabled>)
+_IS_VALIDATION_ENABLED = contextvars.ContextVar('bamboo_is_validation_enabled', default=True)
+
+
+class InputValidator:
+    """Checks the mandatory arguments of the calls of a method: Bamboo server URL (unless set on the client) and
+    Bamboo plan/build key. The position and default value of every checked parameter are read once from the signature
+    of the method, so checking a call only looks up its arguments.
+    """
+
+    __slots__ = ('__func_name', '__server_url', '__plan_build_key', '__plan_key')
+
+    def __init__(self, func) -> None:
+        """CTOR.
+        :param func: The method [callable]
+        """
+        parameters = list(ins_signature(func).parameters.values())
+        positions = {
+            parameter.name: position for position, parameter in enumerate(parameters)
+            if parameter.kind in (Parameter.POSITIONAL_ONLY, Parameter.POSITIONAL_OR_KEYWORD)
+        }
+        defaults = {
+            parameter.name: parameter.default for parameter in parameters if parameter.default is not Parameter.empty
+        }
+
+        self.__func_name = func.__name__
+        # (name, position, default value) of every checked parameter; never passed positionally if not positional
+        self.__server_url, self.__plan_build_key, self.__plan_key = (
+            (name, positions.get(name, len(parameters)), defaults.get(name))
+            for name in ('server_url', 'plan_build_key', 'plan_key')
+        )
+
+    def get_error(self, args: tuple, kwargs: dict):
+        """Check the mandatory arguments of a call.
+
+        :param args: Positional arguments of the call, <self> first [tuple]
+        :param kwargs: Keyword arguments of the call [dict]
+        :return: A dictionary containing the error content; None if the arguments are valid
+        """
+
+        # Check if the method received the Bamboo server URL
+        client = args[0] if args else kwargs.get('self')
+        if not client.server_url:
+            name, position, default = self.__server_url
+            if not (kwargs[name] if name in kwargs else args[position] if position < len(args) else default):
+                return {'content': f"Error in <{self.__func_name}> method: No Bamboo server supplied!"}
+
+        # Check if the method received the Bamboo plan/build key
+        for name, position, default in (self.__plan_build_key, self.__plan_key):
+            if kwargs[name] if name in kwargs else args[position] if position < len(args) else default:
+                return None
+
+        return {'content': f"Error in <{self.__func_name}> method: No Bamboo plan/build build key supplied!"}
+
+
+@lru_cache(maxsize=None)
+def get_input_validator(func) -> InputValidator:
+    """Get the input validator of a method, built on first use."""
+    return InputValidator(func)
 
 
 class Validation:
@@ -12,23 +83,84 @@ class Validation:
 
     @staticmethod
     def check_input(func):
-        """Wrapper validate mandatory arguments inside method(s) call."""
+        """Wrapper validate mandatory arguments inside method(s) call.
+        Coroutine functions are wrapped by a coroutine function, so the error is returned when awaited.
+        The signature of the method is read once, when wrapped: calls only look up their arguments.
+        """
+
+        input_validator = get_input_validator(func)
+
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def async_inner(*args, **kwargs):
+                if _IS_VALIDATION_ENABLED.get():
+                    error = input_validator.get_error(args, kwargs)
+                    if error:
+                        return error
+
+                return await func(*args, **kwargs)
+
+            return async_inner
+
         @wraps(func)
         def inner(*args, **kwargs):
-            # Get the method name
-            func_name = func.__name__
+            if _IS_VALIDATION_ENABLED.get():
+                error = input_validator.get_error(args, kwargs)
+                if error:
+                    return error
 
-            # Get all method arguments as a dict
-            get_call_args = ins_getcallargs(func, *args, **kwargs)
+            return func(*args, **kwargs)
 
-            # Check if the method received the Bamboo server URL
-            if not get_call_args['self'].server_url and not get_call_args['server_url']:
-                return {'content': f"Error in <{func_name}> method: No Bamboo server supplied!"}
+        return inner
 
-            # Check if the method received the Bamboo plan/build key
-            if not any(get_call_args.get('plan_build_key', []) or get_call_args.get('plan_key', [])):
-                return {'content': f"Error in <{func_name}> method: No Bamboo plan/build build key supplied!"}
+    @staticmethod
+    def check_iterator_input(func):
+        """Wrapper validate mandatory arguments inside the call of method(s) returning an iterator (generator APIs).
+        Invalid inputs raise a ValueError when the method is called: an error dictionary returned instead of the
+        iterator would be iterated over silently.
+        """
+
+        input_validator = get_input_validator(func)
+
+        @wraps(func)
+        def inner(*args, **kwargs):
+            if _IS_VALIDATION_ENABLED.get():
+                error = input_validator.get_error(args, kwargs)
+                if error:
+                    raise ValueError(error['content'])
 
             return func(*args, **kwargs)
 
         return inner
+
+    @staticmethod
+    @contextmanager
+    def disabled():
+        """Skip the validation of the method inputs in the current thread or task, e.g. in batch paths calling the
+        API methods many times with inputs already validated:
+
+            with Validation.disabled():
+                for plan_build_key in plan_build_keys:
+                    bamboo_api_client.query_plan(plan_key=plan_build_key)
+        """
+
+        token = _IS_VALIDATION_ENABLED.set(False)
+        try:
+            yield
+        finally:
+            _IS_VALIDATION_ENABLED.reset(token)
+
+    @staticmethod
+    def is_positive(value, types=(int, float)) -> bool:
+        """Check if a numeric argument, e.g. a limit or a rate, is a positive number of the expected types.
+        Booleans are not accepted as numbers.
+        """
+        return isinstance(value, types) and not isinstance(value, bool) and value > 0
+
+    @staticmethod
+    def get_input_error(func, *args, **kwargs):
+        """Check the mandatory arguments of a method call.
+
+        :return: A dictionary containing the error content; None if the arguments are valid
+        """
+        return get_input_validator(func).get_error(args, kwargs)
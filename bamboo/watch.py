@@ -0,0 +1,130 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Watch module: turn the successive snapshots of the latest results of plans into build change events."""
+
+# Add custom packages
+from bamboo.models import FINAL_LIFE_CYCLE_STATES
+
+
+# Expansion of the plan results listing the artifacts of every build
+WATCH_RESULTS_EXPAND = "results.result.artifacts"
+# Default number of seconds between two snapshots of a watched plan
+WATCH_INTERVAL = 10.0
+
+# Build events
+BUILD_STARTED = "build_started"
+STATE_CHANGED = "state_changed"
+BUILD_FINISHED = "build_finished"
+ARTIFACTS_PUBLISHED = "artifacts_published"
+
+
+def get_build_snapshot(result: dict) -> tuple:
+    """Get the part of a plan result the events are computed from.
+
+    :param result: Plan result, as decoded from the Bamboo JSON pages [dict]
+    :return: A tuple (life cycle state, build state, artifact names)
+    """
+
+    artifacts = (result.get('artifacts') or {}).get('artifact', ())
+    artifact_names = frozenset(
+        artifact['name'] for artifact in artifacts if isinstance(artifact, dict) and artifact.get('name')
+    )
+
+    return result.get('lifeCycleState'), result.get('buildState'), artifact_names
+
+
+def get_build_event(event: str, plan_key: str, result: dict, previous_snapshot: tuple = None, **values) -> dict:
+    """Get a build event.
+
+    :param event: Event type: BUILD_STARTED, STATE_CHANGED, BUILD_FINISHED or ARTIFACTS_PUBLISHED [str]
+    :param plan_key: Bamboo plan key [str]
+    :param result: Plan result the event is about [dict]
+    :param previous_snapshot: Snapshot of the build on the previous update, if any [tuple]
+    :param values: Extra values of the event
+    :return: A dictionary describing the event
+    """
+
+    build_event = {
+        'event': event,
+        'plan_key': plan_key,
+        'build_result_key': result.get('buildResultKey') or result.get('key'),
+        'build_number': result.get('buildNumber'),
+        'life_cycle_state': result.get('lifeCycleState'),
+        'build_state': result.get('buildState')
+    }
+    if previous_snapshot is not None:
+        build_event['previous_life_cycle_state'], build_event['previous_build_state'], _ = previous_snapshot
+    build_event.update(values)
+
+    return build_event
+
+
+class BuildWatcher:
+    """Compute the build events between successive snapshots of the latest results of plans.
+    Only a snapshot of the state of every build (life cycle state, build state, artifact names) is kept, for the builds
+    listed in the last update of the plan: each update is compared build per build to the previous one, and the
+    results themselves are not kept.
+    """
+
+    __slots__ = ('__snapshots', '__emit_initial')
+
+    def __init__(self, emit_initial: bool = False) -> None:
+        """CTOR.
+        :param emit_initial: Report the builds listed in the first update of a plan as new builds; by default the first
+        update is only used as a reference [bool]
+        """
+        self.__snapshots = dict()
+        self.__emit_initial = emit_initial
+
+    def update(self, plan_key: str, results: list) -> list:
+        """Get the events between the previous update of a plan and its latest results.
+
+        :param plan_key: Bamboo plan key [str]
+        :param results: Latest results of the plan, newest first, as decoded from the Bamboo JSON pages [list]
+        :return: A list of build events, oldest build first
+        """
+
+        previous_snapshots = self.__snapshots.get(plan_key)
+        is_reference = previous_snapshots is None and not self.__emit_initial
+        previous_snapshots = previous_snapshots or {}
+
+        events = []
+        snapshots = dict()
+        for result in reversed(results):
+            build_number = result.get('buildNumber')
+            if build_number is None:
+                continue
+
+            snapshot = get_build_snapshot(result)
+            snapshots[build_number] = snapshot
+            if not is_reference:
+                events.extend(self.__diff_build(plan_key, result, previous_snapshots.get(build_number), snapshot))
+
+        # Builds no longer listed are forgotten, so the memory used does not grow with the plan history
+        self.__snapshots[plan_key] = snapshots
+
+        return events
+
+    @staticmethod
+    def __diff_build(plan_key: str, result: dict, previous_snapshot: tuple, snapshot: tuple) -> list:
+        """Get the events between two snapshots of a build; <previous_snapshot> is None for new builds."""
+
+        life_cycle_state, _, artifact_names = snapshot
+        if previous_snapshot is None:
+            events = [get_build_event(BUILD_STARTED, plan_key, result)]
+            previous_life_cycle_state, previous_artifact_names = None, frozenset()
+        else:
+            events = []
+            previous_life_cycle_state, _, previous_artifact_names = previous_snapshot
+            if previous_snapshot[:2] != snapshot[:2]:
+                events.append(get_build_event(STATE_CHANGED, plan_key, result, previous_snapshot))
+
+        if life_cycle_state in FINAL_LIFE_CYCLE_STATES and previous_life_cycle_state not in FINAL_LIFE_CYCLE_STATES:
+            events.append(get_build_event(BUILD_FINISHED, plan_key, result))
+
+        new_artifact_names = artifact_names - previous_artifact_names
+        if new_artifact_names:
+            events.append(get_build_event(ARTIFACTS_PUBLISHED, plan_key, result, artifacts=sorted(new_artifact_names)))
+
+        return events
@@ -0,0 +1,4 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Benchmarks for BambooAPI REST client hot paths."""
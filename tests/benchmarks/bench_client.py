@@ -0,0 +1,222 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Load test the API client against the in-process mock Bamboo server.
+
+Every scenario runs in a fresh process (the server stays in this one), so its peak RSS is the one of the client alone.
+Reports the calls per second, the p50/p99 latency of the calls and the peak RSS per scenario; compare the results with
+a saved baseline to catch regressions (exit code 1).
+
+Usage: python -m tests.benchmarks.bench_client [--threads 8] [--latency 0.005] [--save results.json]
+                                               [--compare baseline.json] [--instrument] [--artifact-cache]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Add custom packages
+from bamboo import BambooAPIClient, HistogramCollector, Instrumentation
+from bamboo.cache import ArtifactCache
+from tests.mock_bamboo_server import MockBambooServer
+
+
+PLAN_KEY = "BENCH-PLAN"
+BUILD_KEY = f"{PLAN_KEY}-1"
+JOB_NAME = "JOB1"
+ARTIFACT_NAME = "Build-log"
+ARTIFACT_PATH = f"{ARTIFACT_NAME}/build.bin"
+SCENARIOS = ("query_plan", "query_job_for_artifacts", "get_artifact")
+
+# Metrics compared with the baseline, and whether a higher value is better
+COMPARED_METRICS = {'calls_per_second': True, 'p50_ms': False, 'p99_ms': False, 'peak_rss_mib': False}
+
+
+def get_percentile(sorted_values: list, percentile: float) -> float:
+    """Get a percentile of sorted values (nearest rank)."""
+    return sorted_values[min(len(sorted_values) - 1, max(0, round(percentile / 100 * len(sorted_values)) - 1))]
+
+
+def get_peak_rss() -> int:
+    """Get the peak resident set size of the current process, in bytes."""
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def run_scenario(
+        scenario: str, server_url: str, calls: int, threads: int, instrument: bool = False, artifact_cache: bool = False
+) -> dict:
+    """Run a scenario in the current process.
+
+    :param scenario: One of SCENARIOS [str]
+    :param server_url: URL of the mock Bamboo server [str]
+    :param calls: Number of API calls [int]
+    :param threads: Number of threads making the calls [int]
+    :param instrument: Collect the timings of the client (see <bamboo.instrumentation>) [bool]
+    :param artifact_cache: Cache the downloaded artifacts (see <bamboo.cache.ArtifactCache>), revalidated on every
+    call [bool]
+    :return: The metrics of the scenario
+    """
+
+    destination_dir = tempfile.mkdtemp(prefix="bench_client_")
+    # Every call is sent: identical calls in flight at the same time are not coalesced
+    bamboo_api_client = BambooAPIClient(
+        server_url=server_url,
+        pool_maxsize=threads,
+        coalesce_requests=False,
+        instrumentation=Instrumentation(listeners=[HistogramCollector()]) if instrument else None,
+        artifact_cache=ArtifactCache(directory=os.path.join(destination_dir, "cache")) if artifact_cache else None
+    )
+    bamboo_api_client.is_auth_enabled = False
+
+    def call(index: int) -> bool:
+        if scenario == "query_plan":
+            return bamboo_api_client.query_plan(plan_key=PLAN_KEY).get('response')
+
+        if scenario == "query_job_for_artifacts":
+            return bamboo_api_client.query_job_for_artifacts(
+                plan_build_key=BUILD_KEY, job_name=JOB_NAME, artifact_names=(ARTIFACT_NAME,)
+            ).get('artifacts')
+
+        destination_file = os.path.join(destination_dir, f"artifact_{index}")
+        response = bamboo_api_client.get_artifact(
+            url=f"{server_url}/browse/{BUILD_KEY}/artifact/{JOB_NAME}/{ARTIFACT_PATH}",
+            destination_file=destination_file
+        )
+        os.remove(destination_file)
+        return response.get('response')
+
+    def timed_call(index: int) -> tuple:
+        start_time = time.perf_counter()
+        success = call(index)
+        return time.perf_counter() - start_time, bool(success)
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        outcomes = list(executor.map(timed_call, range(calls)))
+    elapsed_time = time.perf_counter() - start_time
+
+    bamboo_api_client.close()
+    shutil.rmtree(destination_dir)
+
+    latencies = sorted(latency for latency, _ in outcomes)
+    return {
+        'calls': calls,
+        'failed_calls': sum(1 for _, success in outcomes if not success),
+        'calls_per_second': calls / elapsed_time,
+        'p50_ms': get_percentile(latencies, 50) * 1000,
+        'p99_ms': get_percentile(latencies, 99) * 1000,
+        'peak_rss_mib': get_peak_rss() / 1024 / 1024
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Get the regressions of the results over a baseline.
+
+    :param results: Metrics per scenario [dict]
+    :param baseline: Metrics per scenario of the baseline [dict]
+    :param tolerance: Relative change tolerated, e.g. 0.2 for 20% [float]
+    :return: A list of messages, one per regression
+    """
+
+    regressions = list()
+    for scenario, metrics in results.items():
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            reference = baseline.get(scenario, {}).get(metric)
+            if not reference:
+                continue
+
+            change = (metrics[metric] - reference) / reference
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(
+                    f"{scenario}: {metric} {metrics[metric]:.1f} vs {reference:.1f} in the baseline ({change:+.0%})"
+                )
+
+    return regressions
+
+
+def get_arguments(argv: list) -> argparse.Namespace:
+    """Parse the command line."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--calls", type=int, default=50, help="API calls per scenario (default: 50)")
+    parser.add_argument("--artifact-calls", type=int, default=2, help="downloads (default: 2)")
+    parser.add_argument("--threads", type=int, default=1, help="threads making the calls (default: 1)")
+    parser.add_argument("--results", type=int, default=10000, help="plan history length (default: 10000)")
+    parser.add_argument("--artifact-files", type=int, default=1000, help="files in the artifact page (default: 1000)")
+    parser.add_argument("--artifact-size", type=int, default=1024, help="artifact size, MiB (default: 1024)")
+    parser.add_argument("--latency", type=float, default=0.0, help="server latency, seconds (default: 0)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of HTTP 500 responses (default: 0)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of HTTP 429 responses (default: 0)")
+    parser.add_argument("--save", help="save the results to this JSON file")
+    parser.add_argument("--compare", help="compare the results with this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="regression tolerance (default: 0.2)")
+    parser.add_argument("--instrument", action="store_true", help="collect the timings of the client")
+    parser.add_argument("--artifact-cache", action="store_true", help="cache the downloaded artifacts")
+
+    return parser.parse_args(argv)
+
+
+def main(argv: list = None) -> dict:
+    """Run the scenarios and report their metrics."""
+
+    arguments = get_arguments(argv)
+
+    mock_bamboo_server = MockBambooServer(
+        latency=arguments.latency, error_rate=arguments.error_rate, throttle_rate=arguments.throttle_rate, seed=0
+    )
+    mock_bamboo_server.add_plan(PLAN_KEY, results_count=arguments.results)
+    files = {f"{ARTIFACT_NAME}/file_{index}.txt": index for index in range(arguments.artifact_files)}
+    files[ARTIFACT_PATH] = arguments.artifact_size * 1024 * 1024
+    mock_bamboo_server.add_artifacts(BUILD_KEY, JOB_NAME, files)
+    # Results are generated on first request: not measured
+    mock_bamboo_server.get_results_page(PLAN_KEY, max_results=arguments.results, start_index=0, expand=None)
+
+    print(f"Mock Bamboo server: {arguments.results} plan results, {arguments.artifact_files} artifact files, "
+          f"{arguments.artifact_size} MiB artifact, {arguments.latency * 1000:.0f} ms latency; "
+          f"{arguments.threads} client thread(s)")
+
+    results = dict()
+    with mock_bamboo_server:
+        for scenario in arguments.scenarios:
+            calls = arguments.artifact_calls if scenario == "get_artifact" else arguments.calls
+            # Fresh process per scenario: peak RSS of the scenario alone
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+                results[scenario] = executor.submit(
+                    run_scenario, scenario, mock_bamboo_server.url, calls, arguments.threads, arguments.instrument,
+                    arguments.artifact_cache
+                ).result()
+
+            metrics = results[scenario]
+            print(f"{scenario:>24}: {metrics['calls_per_second']:8.1f} calls/s, p50 {metrics['p50_ms']:8.1f} ms, "
+                  f"p99 {metrics['p99_ms']:8.1f} ms, peak RSS {metrics['peak_rss_mib']:6.1f} MiB, "
+                  f"{metrics['failed_calls']} failed")
+
+    if arguments.save:
+        with open(arguments.save, "w") as results_file:
+            json.dump(results, results_file, indent=2)
+
+    if arguments.compare:
+        with open(arguments.compare) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), tolerance=arguments.tolerance)
+
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Benchmark the import time of the package, with 'python -X importtime'.
+
+Every statement runs in fresh interpreters; reports the median import time of the bamboo modules (including the
+modules they import) and the heavy third-party modules loaded. 'import bamboo' must not load any of them, and its
+import time must stay under --max-ms if given (exit code 1 otherwise).
+
+Usage: python -m tests.benchmarks.bench_import [--repeat 5] [--max-ms 50]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+
+STATEMENTS = (
+    "import bamboo",
+    "from bamboo import BambooAPIClient",
+    "from bamboo import AsyncBambooAPIClient"
+)
+
+# Third-party modules loaded on first use only
+HEAVY_MODULES = ("requests", "aiohttp", "bs4", "yaml")
+
+
+def measure_import(statement: str) -> tuple:
+    """Run a statement in a fresh interpreter.
+
+    :param statement: Python statement importing from the package [str]
+    :return: The import time of the bamboo modules in milliseconds, and the heavy modules loaded
+    """
+
+    process = subprocess.run(
+        [
+            sys.executable, "-X", "importtime", "-c",
+            f"{statement}; import sys; print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))"
+        ],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True
+    )
+
+    # Lines: "import time: self [us] | cumulative [us] | <indentation>module"
+    cumulative_time = 0
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or line.endswith("| package"):
+            continue
+
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Top-level bamboo modules only: the modules they import are in their cumulative time
+        if name.startswith(" bamboo"):
+            cumulative_time += int(cumulative)
+
+    heavy_modules = process.stdout.strip()
+    return cumulative_time / 1000, heavy_modules.split(",") if heavy_modules else []
+
+
+def get_arguments(argv: list) -> argparse.Namespace:
+    """Parse the command line."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="interpreters per statement (default: 5)")
+    parser.add_argument("--max-ms", type=float, help="maximum import time of 'import bamboo', milliseconds")
+
+    return parser.parse_args(argv)
+
+
+def main(argv: list = None) -> dict:
+    """Measure the import time of every statement."""
+
+    arguments = get_arguments(argv)
+
+    results = dict()
+    for statement in STATEMENTS:
+        measures = [measure_import(statement) for _ in range(arguments.repeat)]
+        results[statement] = statistics.median(import_time for import_time, _ in measures), measures[0][1]
+        print(f"{statement:>40}: {results[statement][0]:7.1f} ms, loads {', '.join(measures[0][1]) or 'nothing heavy'}")
+
+    import_time, heavy_modules = results[STATEMENTS[0]]
+    failures = [f"'import bamboo' loads {name}" for name in heavy_modules]
+    if arguments.max_ms is not None and import_time > arguments.max_ms:
+        failures.append(f"'import bamboo' takes {import_time:.1f} ms, over {arguments.max_ms:.1f} ms")
+
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    if failures:
+        sys.exit(1)
+
+    return results
+
+
+if __name__ == '__main__':
+    main()
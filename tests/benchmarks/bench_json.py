@@ -0,0 +1,49 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Benchmark the JSON decoders on a large page of plan results.
+
+Usage: python -m tests.benchmarks.bench_json [number of results]
+"""
+
+import json
+import sys
+import timeit
+
+# Add custom packages
+from bamboo.decoders import (
+    DECODERS,
+    decode_json
+)
+from tests.benchmarks.bench_models import build_plan_results_page
+
+
+# Fields needed to follow the state of the builds
+BUILD_STATE_FIELDS = frozenset({'buildNumber', 'buildState', 'lifeCycleState'})
+
+
+def main(results_count: int = 10000, repeat: int = 5) -> dict:
+    """Time every decoder installed, and the field selection; the best run out of <repeat> is kept."""
+
+    content = build_plan_results_page(results_count).encode("utf-8")
+    print(f"Plan results page: {results_count} results, {len(content) / 1024 / 1024:.1f} MiB")
+
+    cases = {
+        # Former decoding path: bytes decoded to a string first
+        'json (str)': lambda: json.loads(content.decode("utf-8")),
+        'json (fields)': lambda: decode_json(content, fields=BUILD_STATE_FIELDS)
+    }
+    for decoder, loads in DECODERS.items():
+        if loads is not None:
+            cases[f"{decoder} (bytes)"] = lambda decoder=decoder: decode_json(content, decoder=decoder)
+
+    timings = dict()
+    for case, decode in cases.items():
+        timings[case] = min(timeit.repeat(decode, number=1, repeat=repeat))
+        print(f"{case:>16}: {timings[case] * 1000:8.1f} ms")
+
+    return timings
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,73 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Benchmark the memory used to keep plan results, as decoded JSON documents and as models.
+
+Usage: python -m tests.benchmarks.bench_models [number of results]
+"""
+
+import json
+import pathlib
+import sys
+import tracemalloc
+
+# Add custom packages
+from bamboo.models import decode_results
+
+
+# Database of the mock server, holding the result of a build as returned by a live Bamboo server
+MOCK_DB = pathlib.Path(__file__).resolve().parent.parent / "db.json"
+
+
+def build_plan_results_page(results_count: int) -> str:
+    """Build a JSON page listing <results_count> plan results, the way Bamboo renders it."""
+
+    with open(MOCK_DB) as json_file:
+        result = json.load(json_file)['query_plan_reference'][0]['results']
+
+    results = []
+    for build_number in range(results_count, 0, -1):
+        results.append(dict(
+            result, buildNumber=build_number, number=build_number, buildResultKey=f"TEST-XYZ-{build_number}"
+        ))
+
+    return json.dumps({'results': {'size': results_count, 'start-index': 0, 'max-result': results_count,
+                                   'result': results}})
+
+
+def measure(page: str, as_models: bool) -> int:
+    """Get the number of bytes held by the decoded page."""
+
+    tracemalloc.start()
+    content = json.loads(page)
+    if as_models:
+        content = decode_results(content)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Keep the content alive until measured
+    del content
+
+    return size
+
+
+def main(results_count: int = 10000) -> dict:
+    """Measure the memory used by the decoded JSON documents and by the models."""
+
+    page = build_plan_results_page(results_count)
+    print(f"Plan results page: {results_count} results, {len(page) / 1024 / 1024:.1f} MiB")
+
+    sizes = {
+        'dict': measure(page, as_models=False),
+        'models': measure(page, as_models=True)
+    }
+    for kind, size in sizes.items():
+        print(f"{kind:>8}: {size / 1024 / 1024:8.1f} MiB, {size / results_count:8.0f} bytes per result")
+
+    print(f"Memory saved by the models: {sizes['dict'] / sizes['models']:.1f}x")
+
+    return sizes
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
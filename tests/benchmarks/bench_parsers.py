@@ -0,0 +1,57 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Benchmark the artifact page parser backends on large artifact pages.
+
+Usage: python -m tests.benchmarks.bench_parsers [number of files listed in the page]
+"""
+
+import sys
+import timeit
+
+# Add custom packages
+from bamboo.parsers import (
+    PARSER_BACKENDS,
+    STDLIB_BACKEND,
+    parse_artifact_links
+)
+
+
+ROW_MASK = """    <tr>
+        <td><img alt="(file)" src="/images/icons/icon_file.gif"/><a href="/log/file_{index}.txt">file_{index}.txt</a></td>
+        <td align="right">{index} bytes</td>
+        <td>Jan 1, 1970 0:00:01 AM</td>
+    </tr>
+"""
+
+
+def build_artifact_page(files_count: int) -> str:
+    """Build an artifact page listing <files_count> files, the way Bamboo renders it."""
+
+    rows = "".join(ROW_MASK.format(index=index) for index in range(files_count))
+
+    return f"<html><head><title>Build-log</title></head><body><table>{rows}</table></body></html>"
+
+
+def main(files_count: int = 10000, repeat: int = 5) -> dict:
+    """Time every parser backend; the best run out of <repeat> is kept."""
+
+    page = build_artifact_page(files_count)
+    print(f"Artifact page: {files_count} files, {len(page) / 1024 / 1024:.1f} MiB")
+
+    timings = dict()
+    for backend in PARSER_BACKENDS:
+        timings[backend] = min(timeit.repeat(
+            lambda: parse_artifact_links(page=page, backend=backend), number=1, repeat=repeat
+        ))
+        print(f"{backend:>8}: {timings[backend] * 1000:8.1f} ms")
+
+    for backend in PARSER_BACKENDS:
+        if backend != STDLIB_BACKEND:
+            print(f"Speedup of '{STDLIB_BACKEND}' over '{backend}': {timings[backend] / timings[STDLIB_BACKEND]:.1f}x")
+
+    return timings
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
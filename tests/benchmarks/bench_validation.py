@@ -0,0 +1,83 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Benchmark the per-call overhead of the input validation of the API methods.
+
+Compares the validation reading the arguments with <inspect.getcallargs> on every call (as before), the one reading
+them from the positions precomputed when the method is wrapped, and calls with the validation disabled.
+
+Usage: python -m tests.benchmarks.bench_validation [number of calls]
+"""
+
+import sys
+import timeit
+
+from functools import wraps
+from inspect import getcallargs as ins_getcallargs
+
+# Add custom packages
+from bamboo.validation import Validation
+
+
+def check_input_getcallargs(func):
+    """Validation wrapper reading the arguments with <inspect.getcallargs> on every call."""
+
+    @wraps(func)
+    def inner(*args, **kwargs):
+        get_call_args = ins_getcallargs(func, *args, **kwargs)
+        if not get_call_args['self'].server_url and not get_call_args['server_url']:
+            return {'content': "No Bamboo server supplied!"}
+        if not (get_call_args.get('plan_build_key') or get_call_args.get('plan_key')):
+            return {'content': "No Bamboo plan/build build key supplied!"}
+
+        return func(*args, **kwargs)
+
+    return inner
+
+
+def query_plan(self, server_url: str = None, plan_key: str = None, raw: bool = True, fields: frozenset = None):
+    """API method doing nothing, so only the validation is timed."""
+    return plan_key
+
+
+class Client:
+    """API client with the same method wrapped in several ways."""
+
+    server_url = "http://bamboo:8085"
+
+    query_plan = query_plan
+    query_plan_getcallargs = check_input_getcallargs(query_plan)
+    query_plan_validated = Validation.check_input(query_plan)
+
+
+def main(calls: int = 200000, repeat: int = 5) -> dict:
+    """Time every way of calling the method; the best run out of <repeat> is kept, per call."""
+
+    client = Client()
+
+    def call_disabled():
+        with Validation.disabled():
+            for _ in range(calls):
+                client.query_plan_validated(plan_key="PROJ-PLAN")
+
+    variants = {
+        'not validated': lambda: [client.query_plan(plan_key="PROJ-PLAN") for _ in range(calls)],
+        'getcallargs': lambda: [client.query_plan_getcallargs(plan_key="PROJ-PLAN") for _ in range(calls)],
+        'precomputed': lambda: [client.query_plan_validated(plan_key="PROJ-PLAN") for _ in range(calls)],
+        'disabled': call_disabled
+    }
+
+    timings = dict()
+    for name, variant in variants.items():
+        timings[name] = min(timeit.repeat(variant, number=1, repeat=repeat)) / calls
+        overhead = timings[name] - timings['not validated']
+        print(f"{name:>14}: {timings[name] * 1e9:8.0f} ns/call, validation overhead {overhead * 1e9:8.0f} ns/call")
+
+    print(f"Validation overhead, 'getcallargs' over 'precomputed': "
+          f"{(timings['getcallargs'] - timings['not validated']) / (timings['precomputed'] - timings['not validated']):.1f}x")
+
+    return timings
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
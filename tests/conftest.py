@@ -9,10 +9,14 @@ import pathlib
 import psutil
 import pytest
 import subprocess
+import threading
 import time
 
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 # Add custom packages
 from bamboo import BambooAPIClient
+from tests.mock_bamboo_server import MockBambooServer
 
 
 # Current working dir
@@ -131,9 +135,13 @@ def test_app():
     elif test_type == "MOCK":
         plan_key_trigger_build = "TEST"
         build_key_to_query = "TEST-123"
-        artifacts_url = {}
 
         mock_server_url = config_opts.get("mock_server_url")
+        artifacts_url = {
+            "stderr_log.txt": f"{mock_server_url}/log/stderr_log.txt",
+            "stdout_log.txt": f"{mock_server_url}/log/stdout_log.txt",
+            "WDG_log.txt": f"{mock_server_url}/log/WDG_log.txt"
+        }
         local_test_bamboo_api = LocalTestBambooAPI(server_url=mock_server_url, verbose=True)
         bamboo_api_test_type = local_test_bamboo_api.bamboo_api_client
     else:
@@ -186,3 +194,63 @@ def test_app():
         print(f"JSON server was killed (PID): {psutil_proc_to_kill}")
 
         print(f"{os.linesep}Teardown has ended!{os.linesep}")
+
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    """Answers the requests with the next status code of the script of the server, then with HTTP 200."""
+
+    def do_GET(self):
+        self.__answer()
+
+    def do_POST(self):
+        self.__answer()
+
+    def __answer(self):
+        with self.server.lock:
+            self.server.requests.append(self.command)
+            status_code, headers = self.server.script.pop(0) if self.server.script else (200, {})
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+
+        time.sleep(self.server.delay)
+        with self.server.lock:
+            self.server.in_flight -= 1
+
+        body = b'{"state": "ok"}'
+        self.send_response(status_code)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def scripted_server():
+    """Start a HTTP server answering with scripted status codes, after <delay> seconds."""
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ScriptedHandler)
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    server.script = []
+    server.requests = []
+    server.delay = 0
+    server.lock = threading.Lock()
+    server.in_flight = server.max_in_flight = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def mock_bamboo_server():
+    """Start an in-process mock Bamboo server on a free port (see <tests.mock_bamboo_server>)."""
+
+    with MockBambooServer(seed=0) as server:
+        yield server
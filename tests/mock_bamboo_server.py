@@ -0,0 +1,539 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""In-process mock ("fake") Bamboo server, used by the tests and the benchmarks.
+
+Serves the endpoints used by the API clients, from generated data:
+    - POST /rest/api/latest/queue/<plan_key>.json: trigger a build
+    - GET /rest/api/latest/result/<plan_key>.json: page of plan results (max-results, start-index, expand)
+    - GET /rest/api/latest/result/<plan_build_key>.json: result of a build
+    - POST /build/admin/stopPlan.action?planResultKey=<plan_build_key>: stop a build
+    - GET /browse/<plan_build_key>/artifact/<job_name>/<path>: artifact directory pages (path ending with '/') and
+    artifact files, streamed, with byte ranges
+
+Plan histories of any length and artifacts of any size are generated on demand, so 10k results histories and
+multi-GB artifacts take no memory. Latency, server errors and throttling (HTTP 429) can be injected.
+
+    with MockBambooServer(latency=0.01) as server:
+        server.add_plan("PROJ-PLAN", results_count=10000)
+        server.add_artifacts("PROJ-PLAN-10000", "JOB1", {"logs/build.log": 4 * 1024 ** 3})
+        BambooAPIClient(server_url=server.url).query_plan(plan_key="PROJ-PLAN")
+"""
+
+import copy
+import hashlib
+import json
+import pathlib
+import random
+import re
+import threading
+import time
+
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+
+# Database of the json-server mock, holding the result of a build as returned by a live Bamboo server
+MOCK_DB = pathlib.Path(__file__).resolve().parent / "db.json"
+
+QUEUE_PATH = re.compile(r"^/rest/api/latest/queue/(?P<key>[^/]+?)(?:\.json)?/?$")
+RESULT_PATH = re.compile(r"^/rest/api/latest/result/(?P<key>[^/]+?)(?:\.json)?/?$")
+STOP_PATH = "/build/admin/stopPlan.action"
+ARTIFACT_PATH = re.compile(r"^/browse/(?P<key>[^/]+)/artifact/(?P<job>[^/]+)/(?P<path>.*)$")
+
+# Size of the repeated block the artifact contents are made of, and of the chunks they are sent in (bytes)
+ARTIFACT_BLOCK_SIZE = 64 * 1024
+ARTIFACT_CHUNK_SIZE = 256 * 1024
+# Fixed modification time of the artifacts
+ARTIFACT_LAST_MODIFIED = formatdate(1577836800, usegmt=True)
+
+
+def get_result_template() -> dict:
+    """Get the result of a build as returned by a live Bamboo server, used as template of the generated results."""
+
+    with open(MOCK_DB) as json_file:
+        return json.load(json_file)['query_plan_reference'][0]['results']
+
+
+def get_artifact_block(path: str) -> bytes:
+    """Get the block of bytes repeated in the content of an artifact.
+
+    :param path: Relative path of the artifact [str]
+    """
+    return (hashlib.sha256(path.encode("utf-8")).digest() * (ARTIFACT_BLOCK_SIZE // 32))[:ARTIFACT_BLOCK_SIZE]
+
+
+def get_artifact_content(path: str, start: int, end: int) -> bytes:
+    """Get a range of the content of an artifact; the content only depends on the artifact path.
+
+    :param path: Relative path of the artifact [str]
+    :param start: Offset of the first byte [int]
+    :param end: Offset after the last byte [int]
+    """
+
+    block = get_artifact_block(path)
+    first_block, last_block = start // ARTIFACT_BLOCK_SIZE, (end - 1) // ARTIFACT_BLOCK_SIZE + 1
+    content = block * (last_block - first_block)
+    offset = first_block * ARTIFACT_BLOCK_SIZE
+
+    return content[start - offset:end - offset]
+
+
+class MockBambooServer:
+    """Mock Bamboo server, running in a thread of the current process on a free port."""
+
+    def __init__(
+            self,
+            latency=0.0,
+            error_rate: float = 0.0,
+            throttle_rate: float = 0.0,
+            retry_after: int = 1,
+            seed: int = None,
+            host: str = "127.0.0.1",
+            port: int = 0
+    ) -> None:
+        """CTOR.
+        :param latency: Delay before answering a request, in seconds; random in a (min, max) range if a tuple [float]
+        :param error_rate: Share of the requests answered with HTTP 500 [float]
+        :param throttle_rate: Share of the requests answered with HTTP 429 [float]
+        :param retry_after: Value of the 'Retry-After' header of the HTTP 429 responses, in seconds [int]
+        :param seed: Seed of the random generator picking the latencies and the failed requests [int]
+        :param host: Address the server listens on [str]
+        :param port: Port the server listens on; a free one by default [int]
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+
+        self.__random = random.Random(seed)
+        self.__lock = threading.Lock()
+        self.__template = get_result_template()
+        # Plan key: number of builds; build key: result overriding the generated one
+        self.__plans = dict()
+        self.__results = dict()
+        # (build key, job name): {relative path: size}
+        self.__artifacts = dict()
+        self.__encoded_results = dict()
+        self.__stats = dict()
+
+        self.__http_server = ThreadingHTTPServer((host, port), MockBambooRequestHandler)
+        self.__http_server.daemon_threads = True
+        self.__http_server.bamboo = self
+        self.__thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        """Get the URL of the server."""
+        host, port = self.__http_server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def stats(self) -> dict:
+        """Get the number of requests answered, per endpoint and HTTP code, e.g. {('result', 200): 12}."""
+        with self.__lock:
+            return dict(self.__stats)
+
+    def start(self):
+        """Start serving in a background thread."""
+        self.__thread = threading.Thread(
+            target=self.__http_server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self.__thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the listening socket."""
+        self.__http_server.shutdown()
+        self.__http_server.server_close()
+
+    def add_plan(self, plan_key: str, results_count: int = 1, running_count: int = 0) -> None:
+        """Add a plan with a generated history; the <running_count> latest builds are in progress.
+
+        :param plan_key: Plan key, e.g. "PROJ-PLAN" [str]
+        :param results_count: Number of builds of the plan [int]
+        :param running_count: Number of builds in progress [int]
+        """
+
+        with self.__lock:
+            self.__plans[plan_key] = results_count
+            for build_number in range(results_count - running_count + 1, results_count + 1):
+                self.__set_state(f"{plan_key}-{build_number}", "InProgress", "Unknown")
+
+    def add_artifacts(self, plan_build_key: str, job_name: str, files: dict) -> None:
+        """Add artifact files to a job of a build.
+
+        :param plan_build_key: Build key, e.g. "PROJ-PLAN-12" [str]
+        :param job_name: Job name [str]
+        :param files: Mapping between the relative paths of the files, e.g. "logs/build.log", and their sizes [dict]
+        """
+
+        with self.__lock:
+            self.__artifacts.setdefault((plan_build_key, job_name), dict()).update(files)
+            self.__encoded_results.pop(plan_build_key, None)
+
+    def finish_build(self, plan_build_key: str, build_state: str = "Successful") -> None:
+        """Finish a build in progress.
+
+        :param plan_build_key: Build key [str]
+        :param build_state: Final state of the build, e.g. "Successful" or "Failed" [str]
+        """
+        with self.__lock:
+            self.__set_state(plan_build_key, "Finished", build_state)
+
+    def get_result(self, plan_build_key: str) -> dict:
+        """Get the result of a build, as served; None if unknown.
+
+        :param plan_build_key: Build key [str]
+        """
+        encoded_result = self.get_encoded_result(plan_build_key)
+        return json.loads(encoded_result) if encoded_result is not None else None
+
+    def pick_fault(self) -> tuple:
+        """Pick the latency and the failure (HTTP code, or None) of a request."""
+
+        with self.__lock:
+            latency = self.__random.uniform(*self.latency) if isinstance(self.latency, tuple) else self.latency
+            draw = self.__random.random()
+
+        if draw < self.throttle_rate:
+            return latency, 429
+
+        if draw < self.throttle_rate + self.error_rate:
+            return latency, 500
+
+        return latency, None
+
+    def record(self, endpoint: str, status_code: int) -> None:
+        """Count a request answered."""
+        with self.__lock:
+            self.__stats[(endpoint, status_code)] = self.__stats.get((endpoint, status_code), 0) + 1
+
+    def trigger_build(self, plan_key: str) -> dict:
+        """Add a queued build to a plan.
+
+        :param plan_key: Plan key [str]
+        :return: The queued build, as served by Bamboo
+        """
+
+        with self.__lock:
+            build_number = self.__plans.get(plan_key, 0) + 1
+            self.__plans[plan_key] = build_number
+            build_key = f"{plan_key}-{build_number}"
+            self.__set_state(build_key, "Queued", "Unknown")
+
+        return {
+            'planKey': plan_key,
+            'buildNumber': build_number,
+            'buildResultKey': build_key,
+            'triggerReason': "Manual build",
+            'link': {'href': f"{self.url}/rest/api/latest/result/{build_key}", 'rel': "self"}
+        }
+
+    def stop_build(self, plan_build_key: str) -> bool:
+        """Stop a build; False if unknown."""
+
+        if self.__get_build_number(plan_build_key) is None:
+            return False
+
+        with self.__lock:
+            self.__set_state(plan_build_key, "NotBuilt", "Unknown")
+        return True
+
+    def get_results_page(
+            self, plan_key: str, max_results: int, start_index: int, expand: str, include_all_states: bool = False
+    ) -> bytes:
+        """Get a page of the results of a plan, newest first, as served; None if the plan is unknown.
+        Like Bamboo, the queued and running builds are only listed with <include_all_states> (includeAllStates=true).
+        """
+
+        results_count = self.__plans.get(plan_key)
+        if results_count is None:
+            return None
+
+        with self.__lock:
+            build_numbers = [
+                build_number for build_number in range(results_count, 0, -1)
+                if include_all_states or self.__is_final(f"{plan_key}-{build_number}")
+            ]
+
+        with_artifacts = "artifacts" in (expand or "")
+        page_numbers = build_numbers[start_index:start_index + max_results]
+        results = b",".join(
+            self.get_encoded_result(f"{plan_key}-{build_number}", with_artifacts=with_artifacts)
+            for build_number in page_numbers
+        )
+        page_header = json.dumps({
+            'expand': "results", 'link': {'href': f"{self.url}/rest/api/latest/result/{plan_key}", 'rel': "self"}
+        })[:-1].encode("utf-8")
+
+        return b"".join((
+            page_header,
+            b', "results": {"size": %d, "start-index": %d, "max-result": %d, "result": [' % (
+                len(build_numbers), start_index, len(page_numbers)
+            ),
+            results,
+            b"]}}"
+        ))
+
+    def get_artifact_files(self, plan_build_key: str, job_name: str) -> dict:
+        """Get the artifact files of a job, {relative path: size}; None if the job has no artifacts."""
+        return self.__artifacts.get((plan_build_key, job_name))
+
+    def __get_build_number(self, plan_build_key: str) -> int:
+        """Get the number of a build; None if unknown."""
+
+        plan_key, _, build_number = plan_build_key.rpartition("-")
+        if not build_number.isdigit() or not 0 < int(build_number) <= self.__plans.get(plan_key, 0):
+            return None
+
+        return int(build_number)
+
+    def __is_final(self, plan_build_key: str) -> bool:
+        """Tell whether a build is finished. Must be called with the lock held."""
+        return self.__results.get(plan_build_key, {'lifeCycleState': "Finished"})['lifeCycleState'] in (
+            "Finished", "NotBuilt"
+        )
+
+    def __set_state(self, plan_build_key: str, life_cycle_state: str, build_state: str) -> None:
+        """Set the state of a build. Must be called with the lock held."""
+
+        self.__results[plan_build_key] = {'lifeCycleState': life_cycle_state, 'buildState': build_state}
+        self.__encoded_results.pop(plan_build_key, None)
+
+    def get_encoded_result(self, plan_build_key: str, with_artifacts: bool = False) -> bytes:
+        """Get the JSON result of a build, as served, encoded once; None if the build is unknown.
+
+        :param plan_build_key: Build key [str]
+        :param with_artifacts: List the artifacts of the build (expand=artifacts) [bool]
+        """
+
+        cache_key = (plan_build_key, with_artifacts)
+        encoded_results = self.__encoded_results.get(plan_build_key)
+        if encoded_results is not None and cache_key in encoded_results:
+            return encoded_results[cache_key]
+
+        build_number = self.__get_build_number(plan_build_key)
+        if build_number is None:
+            return None
+
+        with self.__lock:
+            result = self.__build_result(plan_build_key, build_number, with_artifacts)
+            encoded_result = json.dumps(result).encode("utf-8")
+            self.__encoded_results.setdefault(plan_build_key, dict())[cache_key] = encoded_result
+
+        return encoded_result
+
+    def __build_result(self, plan_build_key: str, build_number: int, with_artifacts: bool) -> dict:
+        """Generate the result of a build from the template. Must be called with the lock held."""
+
+        plan_key = plan_build_key.rpartition("-")[0]
+        state = self.__results.get(plan_build_key, {'lifeCycleState': "Finished", 'buildState': "Successful"})
+        finished = state['lifeCycleState'] in ("Finished", "NotBuilt")
+
+        result = copy.deepcopy(self.__template)
+        result.update(
+            key=plan_build_key, buildResultKey=plan_build_key, id=build_number, number=build_number,
+            buildNumber=build_number, lifeCycleState=state['lifeCycleState'], buildState=state['buildState'],
+            state=state['buildState'], finished=finished, successful=state['buildState'] == "Successful",
+            link={'href': f"{self.url}/rest/api/latest/result/{plan_build_key}", 'rel': "self"}
+        )
+        result['plan']['key'] = plan_key
+        result['planResultKey'].update(key=plan_build_key, entityKey={'key': plan_key}, resultNumber=build_number)
+        if not with_artifacts:
+            return result
+
+        artifacts = [
+            {
+                'name': relative_path, 'producerJobKey': f"{plan_build_key}-{job_name}", 'shared': False,
+                'size': size, 'link': {'href': f"{self.url}/browse/{plan_build_key}/artifact/{job_name}/"
+                                               f"{quote(relative_path)}", 'rel': "link"}
+            }
+            for (build_key, job_name), files in self.__artifacts.items() if build_key == plan_build_key
+            for relative_path, size in files.items()
+        ]
+        result['artifacts'] = {'size': len(artifacts), 'start-index': 0, 'max-result': len(artifacts),
+                               'artifact': artifacts}
+
+        return result
+
+
+class MockBambooRequestHandler(BaseHTTPRequestHandler):
+    """Request handler of the mock Bamboo server; keeps the connections alive, like a live server."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately: do not wait for the ACK of the headers
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        self.__handle("GET")
+
+    def do_POST(self) -> None:
+        # Drain the request body, so the connection can be reused
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        self.__handle("POST")
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def __handle(self, method: str) -> None:
+        """Route a request, once the injected latency and failure are applied."""
+
+        bamboo = self.server.bamboo
+        url_parts = urlsplit(self.path)
+        path, query = unquote(url_parts.path), parse_qs(url_parts.query)
+
+        endpoint, handler = self.__route(method, path)
+        # Requests are counted before answering, so the client sees up to date stats
+        self.__endpoint = endpoint
+
+        latency, failure = bamboo.pick_fault()
+        if latency:
+            time.sleep(latency)
+
+        if failure == 429:
+            self.__send(429, b'{"message": "Too many requests"}', headers={'Retry-After': str(bamboo.retry_after)})
+        elif failure:
+            self.__send(failure, b'{"message": "Internal server error"}')
+        elif handler is None:
+            self.__send_not_found()
+        else:
+            handler(bamboo, path, query)
+
+    def __route(self, method: str, path: str) -> tuple:
+        """Get the endpoint name and the handler of a request."""
+
+        if method == "POST" and QUEUE_PATH.match(path):
+            return "queue", self.__trigger_build
+
+        if method == "POST" and path == STOP_PATH:
+            return "stop", self.__stop_build
+
+        if method == "GET" and RESULT_PATH.match(path):
+            return "result", self.__get_results
+
+        if method == "GET" and ARTIFACT_PATH.match(path):
+            return "artifact", self.__get_artifact
+
+        return "unknown", None
+
+    def __trigger_build(self, bamboo: MockBambooServer, path: str, query: dict) -> int:
+        plan_key = QUEUE_PATH.match(path).group('key')
+        return self.__send_json(bamboo.trigger_build(plan_key))
+
+    def __stop_build(self, bamboo: MockBambooServer, path: str, query: dict) -> int:
+        if not bamboo.stop_build((query.get('planResultKey') or [""])[0]):
+            return self.__send_not_found()
+
+        return self.__send(200, b"<html><body>Build stopped</body></html>", content_type="text/html;charset=UTF-8")
+
+    def __get_results(self, bamboo: MockBambooServer, path: str, query: dict) -> int:
+        key = RESULT_PATH.match(path).group('key')
+        expand = (query.get('expand') or [None])[0]
+
+        page = bamboo.get_results_page(
+            plan_key=key,
+            max_results=int((query.get('max-results') or [25])[0]),
+            start_index=int((query.get('start-index') or [0])[0]),
+            expand=expand,
+            include_all_states=(query.get('includeAllStates') or ["false"])[0] == "true"
+        )
+        if page is None:
+            page = bamboo.get_encoded_result(key, with_artifacts="artifacts" in (expand or ""))
+
+        return self.__send(200, page) if page else self.__send_not_found()
+
+    def __get_artifact(self, bamboo: MockBambooServer, path: str, query: dict) -> int:
+        match = ARTIFACT_PATH.match(path)
+        plan_build_key, job_name, relative_path = match.group('key', 'job', 'path')
+
+        files = bamboo.get_artifact_files(plan_build_key, job_name) or {}
+        if relative_path in files:
+            return self.__send_artifact(relative_path, files[relative_path])
+
+        # Directory page: files and sub-dirs right below the directory
+        dir_path = relative_path.rstrip("/")
+        prefix = f"{dir_path}/" if dir_path else ""
+        entries = sorted({
+            file_path[len(prefix):].split("/", 1)[0] + ("/" if "/" in file_path[len(prefix):] else "")
+            for file_path in files if file_path.startswith(prefix)
+        })
+        if not entries:
+            return self.__send_not_found()
+
+        links = "".join(
+            f'<tr><td><a href="/browse/{plan_build_key}/artifact/{job_name}/{quote(prefix + entry)}">'
+            f'{entry.rstrip("/")}</a></td></tr>'
+            for entry in entries
+        )
+        page = f"<html><body><table>{links}</table></body></html>".encode("utf-8")
+        return self.__send(200, page, content_type="text/html;charset=UTF-8")
+
+    def __send_artifact(self, relative_path: str, size: int) -> int:
+        """Stream an artifact, honoring byte ranges and conditional requests."""
+
+        etag = f'"{hashlib.sha1(f"{relative_path}:{size}".encode("utf-8")).hexdigest()[:16]}"'
+        headers = {'ETag': etag, 'Last-Modified': ARTIFACT_LAST_MODIFIED, 'Accept-Ranges': "bytes"}
+
+        if self.headers.get('If-None-Match') == etag or self.headers.get('If-Modified-Since') == ARTIFACT_LAST_MODIFIED:
+            return self.__send(304, b"", headers=headers)
+
+        start, end, status_code = 0, size, 200
+        range_match = re.match(r"^bytes=(\d+)-(\d*)$", self.headers.get('Range') or "")
+        if_range = self.headers.get('If-Range')
+        if range_match and (not if_range or if_range in (etag, ARTIFACT_LAST_MODIFIED)):
+            start = int(range_match.group(1))
+            end = min(int(range_match.group(2)) + 1, size) if range_match.group(2) else size
+            if start >= size:
+                headers['Content-Range'] = f"bytes */{size}"
+                return self.__send(416, b"", headers=headers)
+
+            headers['Content-Range'] = f"bytes {start}-{end - 1}/{size}"
+            status_code = 206
+
+        self.server.bamboo.record(self.__endpoint, status_code)
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(end - start))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+
+        try:
+            for offset in range(start, end, ARTIFACT_CHUNK_SIZE):
+                self.wfile.write(get_artifact_content(relative_path, offset, min(offset + ARTIFACT_CHUNK_SIZE, end)))
+        except (BrokenPipeError, ConnectionResetError):
+            # Download cancelled by the client
+            self.close_connection = True
+
+        return status_code
+
+    def __send_json(self, content: dict) -> int:
+        return self.__send(200, json.dumps(content).encode("utf-8"))
+
+    def __send_not_found(self) -> int:
+        return self.__send(404, b'{"message": "Not found", "status-code": 404}')
+
+    def __send(
+            self, status_code: int, body: bytes, content_type: str = "application/json;charset=UTF-8",
+            headers: dict = None
+    ) -> int:
+        """Send a whole response."""
+
+        self.server.bamboo.record(self.__endpoint, status_code)
+        self.send_response(status_code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+        return status_code
@@ -0,0 +1,234 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Module used to test the content-addressed artifact cache and the checksums of the artifact downloads."""
+
+import hashlib
+import os
+import pytest
+import shutil
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+# Add custom packages
+from bamboo import BambooAPIClient
+from bamboo.cache import (
+    COPY_DELIVERY,
+    HARDLINK_DELIVERY,
+    ArtifactCache,
+    deliver_file
+)
+from bamboo.exceptions import DownloadErrorException
+
+
+JOB_NAME = "JOB1"
+ARTIFACT_PATH = "Build-log/build.log"
+ARTIFACT_SIZE = 3 * 1024 * 1024
+
+
+def get_artifact_url(mock_bamboo_server, plan_build_key: str, artifact_path: str = ARTIFACT_PATH) -> str:
+    """Get the URL of an artifact of the mock Bamboo server."""
+    return f"{mock_bamboo_server.url}/browse/{plan_build_key}/artifact/{JOB_NAME}/{artifact_path}"
+
+
+def get_client(mock_bamboo_server, artifact_cache: ArtifactCache = None) -> BambooAPIClient:
+    """Get a client of the mock Bamboo server."""
+    bamboo_api_client = BambooAPIClient(server_url=mock_bamboo_server.url, artifact_cache=artifact_cache)
+    bamboo_api_client.is_auth_enabled = False
+    return bamboo_api_client
+
+
+def test_artifact_cache(mock_bamboo_server, tmp_path):
+    """Test to see if cached artifacts are revalidated, then delivered from the cache, once per content."""
+
+    for plan_build_key in ("PROJ-PLAN-1", "PROJ-PLAN-2"):
+        mock_bamboo_server.add_artifacts(plan_build_key, JOB_NAME, {ARTIFACT_PATH: ARTIFACT_SIZE})
+    artifact_cache = ArtifactCache(directory=str(tmp_path / "cache"), delivery_modes=(COPY_DELIVERY,))
+    bamboo_api_client = get_client(mock_bamboo_server, artifact_cache=artifact_cache)
+    url = get_artifact_url(mock_bamboo_server, "PROJ-PLAN-1")
+
+    response = bamboo_api_client.get_artifact(url=url, destination_file=str(tmp_path / "first.log"))
+    assert response['status_code'] == 200
+    content = (tmp_path / "first.log").read_bytes()
+    assert len(artifact_cache) == 1 and artifact_cache.size == ARTIFACT_SIZE
+    assert artifact_cache.get(url).sha256 == hashlib.sha256(content).hexdigest()
+
+    # Revalidated with a conditional request
+    response = bamboo_api_client.get_artifact(url=url, destination_file=str(tmp_path / "second.log"))
+    assert response == {'response': True, 'status_code': 200, 'content': None, 'url': url}
+    assert (tmp_path / "second.log").read_bytes() == content
+    assert mock_bamboo_server.stats[('artifact', 304)] == 1
+    assert not list(tmp_path.glob("*.part"))
+
+    # Same content from another URL: stored once
+    other_url = get_artifact_url(mock_bamboo_server, "PROJ-PLAN-2")
+    bamboo_api_client.get_artifact(url=other_url, destination_file=str(tmp_path / "other.log"))
+    assert len(artifact_cache) == 1 and artifact_cache.get(other_url).sha256 == artifact_cache.get(url).sha256
+
+    # Fresh entries are served without any request, also by a new cache over the same directory
+    fresh_artifact_cache = ArtifactCache(directory=str(tmp_path / "cache"), max_age=60)
+    assert fresh_artifact_cache.size == ARTIFACT_SIZE
+    bamboo_api_client.artifact_cache = fresh_artifact_cache
+    requests_count = sum(mock_bamboo_server.stats.values())
+    bamboo_api_client.get_artifact(url=url, destination_file=str(tmp_path / "third.log"))
+    assert sum(mock_bamboo_server.stats.values()) == requests_count
+    assert (tmp_path / "third.log").read_bytes() == content
+
+    # Evicted content: downloaded again
+    fresh_artifact_cache.clear()
+    response = bamboo_api_client.get_artifact(url=url, destination_file=str(tmp_path / "third.log"))
+    assert response['status_code'] == 200 and mock_bamboo_server.stats[('artifact', 200)] == 3
+    bamboo_api_client.close()
+
+
+def test_artifact_cache_failed_delivery(mock_bamboo_server, tmp_path):
+    """Test to see if a revalidated artifact that cannot be delivered costs a single request more at most."""
+
+    mock_bamboo_server.add_artifacts("PROJ-PLAN-1", JOB_NAME, {ARTIFACT_PATH: ARTIFACT_SIZE})
+    artifact_cache = ArtifactCache(directory=str(tmp_path / "cache"))
+    bamboo_api_client = get_client(mock_bamboo_server, artifact_cache=artifact_cache)
+    url = get_artifact_url(mock_bamboo_server, "PROJ-PLAN-1")
+    bamboo_api_client.get_artifact(url=url, destination_file=str(tmp_path / "first.log"))
+
+    # Invalid destination: reported, not retried
+    with pytest.raises(DownloadErrorException):
+        bamboo_api_client.get_artifact(url=url, destination_file=str(tmp_path / "missing" / "build.log"))
+    assert mock_bamboo_server.stats == {('artifact', 200): 1, ('artifact', 304): 1}
+    assert len(artifact_cache) == 1
+
+    # Content evicted by another process: downloaded again, unconditionally
+    os.remove(artifact_cache.directory / ArtifactCache.OBJECTS_DIR / artifact_cache.get(url).sha256)
+    response = bamboo_api_client.get_artifact(url=url, destination_file=str(tmp_path / "second.log"))
+    assert response['status_code'] == 200
+    assert mock_bamboo_server.stats == {('artifact', 200): 2, ('artifact', 304): 2}
+    assert (tmp_path / "second.log").read_bytes() == (tmp_path / "first.log").read_bytes()
+    assert len(artifact_cache) == 1
+    bamboo_api_client.close()
+
+
+def test_artifact_cache_delivery_modes(mock_bamboo_server, tmp_path):
+    """Test to see if the delivered artifacts are independent of the cache files, unless hard links are opted in."""
+
+    mock_bamboo_server.add_artifacts("PROJ-PLAN-1", JOB_NAME, {ARTIFACT_PATH: ARTIFACT_SIZE})
+    url = get_artifact_url(mock_bamboo_server, "PROJ-PLAN-1")
+    artifact_cache = ArtifactCache(directory=str(tmp_path / "cache"))
+    bamboo_api_client = get_client(mock_bamboo_server, artifact_cache=artifact_cache)
+
+    for file_name in ("first.log", "second.log"):
+        bamboo_api_client.get_artifact(url=url, destination_file=str(tmp_path / file_name))
+        object_file = artifact_cache.directory / ArtifactCache.OBJECTS_DIR / artifact_cache.get(url).sha256
+        assert not os.path.samefile(object_file, tmp_path / file_name)
+        assert os.access(tmp_path / file_name, os.W_OK) and os.access(object_file, os.W_OK)
+
+    # Hard links: a delivered artifact modified in place is not delivered again
+    bamboo_api_client.artifact_cache = ArtifactCache(
+        directory=str(tmp_path / "cache"), delivery_modes=(HARDLINK_DELIVERY,)
+    )
+    bamboo_api_client.get_artifact(url=url, destination_file=str(tmp_path / "third.log"))
+    assert os.path.samefile(object_file, tmp_path / "third.log")
+    with open(tmp_path / "third.log", "ab") as fd_out:
+        fd_out.write(b"altered")
+
+    bamboo_api_client.get_artifact(url=url, destination_file=str(tmp_path / "fourth.log"))
+    assert (tmp_path / "fourth.log").read_bytes() == (tmp_path / "first.log").read_bytes()
+    assert mock_bamboo_server.stats == {('artifact', 200): 2, ('artifact', 304): 3}
+    bamboo_api_client.close()
+
+
+def test_artifact_cache_store_unlocked(tmp_path, monkeypatch):
+    """Test to see if the cached artifacts are delivered while another artifact is being stored."""
+
+    artifact_cache = ArtifactCache(directory=str(tmp_path / "cache"), delivery_modes=(COPY_DELIVERY,))
+    files = {name: tmp_path / f"{name}.bin" for name in ("small", "large")}
+    files["small"].write_bytes(os.urandom(1024))
+    files["large"].write_bytes(os.urandom(ARTIFACT_SIZE))
+    digests = {name: hashlib.sha256(file_path.read_bytes()).hexdigest() for name, file_path in files.items()}
+    artifact_cache.store(url="http://bamboo/small", file_path=str(files["small"]), sha256=digests["small"])
+
+    # Slow copy of the large artifact to the cache
+    copy_started, copy_released = threading.Event(), threading.Event()
+    copyfile = shutil.copyfile
+
+    def slow_copyfile(source_file, destination_file, **kwargs):
+        if source_file == str(files["large"]):
+            copy_started.set()
+            copy_released.wait(5)
+        return copyfile(source_file, destination_file, **kwargs)
+
+    monkeypatch.setattr(shutil, "copyfile", slow_copyfile)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        stored = executor.submit(
+            artifact_cache.store, url="http://bamboo/large", file_path=str(files["large"]), sha256=digests["large"]
+        )
+        assert copy_started.wait(5)
+
+        start_time = time.monotonic()
+        entry = artifact_cache.get("http://bamboo/small")
+        assert artifact_cache.deliver(entry, str(tmp_path / "delivered.bin")) == COPY_DELIVERY
+        assert time.monotonic() - start_time < 1
+        copy_released.set()
+        assert stored.result().size == ARTIFACT_SIZE
+
+    assert (tmp_path / "delivered.bin").read_bytes() == files["small"].read_bytes()
+    assert len(artifact_cache) == 2 and artifact_cache.size == ARTIFACT_SIZE + 1024
+    assert not list((artifact_cache.directory / ArtifactCache.OBJECTS_DIR).glob("*.tmp"))
+
+
+def test_artifact_cache_eviction(mock_bamboo_server, tmp_path):
+    """Test to see if the least recently used contents are evicted first."""
+
+    files = {f"Build-log/file_{index}.bin": 1024 * 1024 + index for index in range(3)}
+    mock_bamboo_server.add_artifacts("PROJ-PLAN-1", JOB_NAME, files)
+    artifact_cache = ArtifactCache(directory=str(tmp_path / "cache"), max_size=int(2.5 * 1024 * 1024))
+    bamboo_api_client = get_client(mock_bamboo_server, artifact_cache=artifact_cache)
+    urls = [get_artifact_url(mock_bamboo_server, "PROJ-PLAN-1", artifact_path) for artifact_path in files]
+
+    for index in (0, 1, 0, 2):
+        bamboo_api_client.get_artifact(url=urls[index], destination_file=str(tmp_path / f"file_{index}.bin"))
+
+    assert len(artifact_cache) == 2 and artifact_cache.size <= 2.5 * 1024 * 1024
+    assert artifact_cache.get(urls[1]) is None
+    assert artifact_cache.get(urls[0]) is not None and artifact_cache.get(urls[2]) is not None
+    bamboo_api_client.close()
+
+
+def test_get_artifact_checksum(mock_bamboo_server, tmp_path):
+    """Test to see if the artifacts are verified against their expected checksum, computed while streamed."""
+
+    mock_bamboo_server.add_artifacts("PROJ-PLAN-1", JOB_NAME, {ARTIFACT_PATH: ARTIFACT_SIZE})
+    bamboo_api_client = get_client(mock_bamboo_server)
+    url = get_artifact_url(mock_bamboo_server, "PROJ-PLAN-1")
+    destination_file = tmp_path / "build.log"
+
+    with pytest.raises(DownloadErrorException, match="SHA-256"):
+        bamboo_api_client.get_artifact(url=url, destination_file=str(destination_file), sha256="0" * 64, resume=True)
+    assert not list(tmp_path.iterdir())
+
+    bamboo_api_client.get_artifact(url=url, destination_file=str(destination_file))
+    sha256 = hashlib.sha256(destination_file.read_bytes()).hexdigest()
+    response = bamboo_api_client.get_artifact(url=url, destination_file=str(destination_file), sha256=sha256.upper())
+    assert response['status_code'] == 200
+    bamboo_api_client.close()
+
+
+def test_deliver_file(tmp_path):
+    """Test to see if the files are delivered with the first delivery mode supported."""
+
+    source_file = tmp_path / "source.bin"
+    source_file.write_bytes(os.urandom(1024))
+    destination_file = tmp_path / "destination.bin"
+    destination_file.write_bytes(b"previous")
+
+    assert deliver_file(str(source_file), str(destination_file), (HARDLINK_DELIVERY,)) == HARDLINK_DELIVERY
+    assert os.path.samefile(source_file, destination_file)
+
+    assert deliver_file(str(source_file), str(destination_file), (COPY_DELIVERY,)) == COPY_DELIVERY
+    assert not os.path.samefile(source_file, destination_file)
+    assert destination_file.read_bytes() == source_file.read_bytes()
+
+    with pytest.raises(OSError):
+        deliver_file(str(tmp_path / "missing.bin"), str(destination_file))
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["destination.bin", "source.bin"]
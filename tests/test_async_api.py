@@ -0,0 +1,178 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Module used to test the asyncio API client."""
+
+import asyncio
+import hashlib
+import pathlib
+import pytest
+
+# Add custom packages
+from bamboo import AsyncBambooAPIClient
+from bamboo.cache import (
+    ArtifactCache,
+    MemoryCache
+)
+from bamboo.exceptions import DownloadErrorException
+
+
+# Artifacts served by the mock server
+MOCK_ARTIFACTS_DIR = pathlib.Path(__file__).resolve().parent / "public" / "log"
+
+JOB_NAME = "JOB1"
+ARTIFACT_PATH = "Build-log/build.log"
+ARTIFACT_SIZE = 3 * 1024 * 1024
+
+
+pytest.importorskip("aiohttp")
+
+
+def get_async_client(bamboo_api_client) -> AsyncBambooAPIClient:
+    """Get an asyncio client talking to the same server as the sync client, with the same credentials."""
+
+    async_bamboo_api_client = AsyncBambooAPIClient(
+        server_url=bamboo_api_client.server_url,
+        username=bamboo_api_client.username,
+        password=bamboo_api_client.password
+    )
+    async_bamboo_api_client.is_auth_enabled = bamboo_api_client.is_auth_enabled
+
+    return async_bamboo_api_client
+
+
+def test_async_api_same_responses(test_app):
+    """Test to see if the asyncio client gives the same responses as the sync client."""
+
+    bamboo_api_client = test_app.get('bamboo_api_tests').bamboo_api_client
+    plan_key = test_app.get('plan_keys', {}).get('plan_key', '')
+    build_key = test_app.get('plan_keys', {}).get('build_key', '')
+
+    async def run_queries():
+        async with get_async_client(bamboo_api_client) as async_bamboo_api_client:
+            return await asyncio.gather(
+                async_bamboo_api_client.trigger_plan_build(plan_key=plan_key, req_values=(True, {})),
+                async_bamboo_api_client.query_plan(plan_key=build_key),
+                async_bamboo_api_client.stop_build(plan_build_key=build_key)
+            )
+
+    trigger_plan, query_plan, stop_plan = asyncio.run(run_queries())
+
+    assert trigger_plan.get('status_code') == 200, trigger_plan
+    assert trigger_plan.get('content') == bamboo_api_client.trigger_plan_build(
+        plan_key=plan_key, req_values=(True, {})
+    ).get('content')
+
+    assert query_plan.get('status_code') == 200, query_plan
+    assert query_plan.get('content') == bamboo_api_client.query_plan(plan_key=build_key).get('content')
+
+    assert stop_plan.get('status_code') == 302, stop_plan
+
+
+def test_async_api_artifacts(test_app):
+    """Test to see if the asyncio client can query for artifacts and download them."""
+
+    bamboo_api_client = test_app.get('bamboo_api_tests').bamboo_api_client
+    artifacts_destination_dir = test_app.get('artifacts_destination_dir')
+    test_type = test_app.get('test_type')
+
+    if test_type != "MOCK":
+        return
+
+    artifact_names = ("Build-log", "Test-log")
+
+    async def query_and_download():
+        async with get_async_client(bamboo_api_client) as async_bamboo_api_client:
+            query_for_artifacts = await async_bamboo_api_client.query_job_for_artifacts(
+                plan_build_key="TEST-123", job_name="RESULT", artifact_names=artifact_names, max_workers=2
+            )
+            get_artifacts = await asyncio.gather(*[
+                async_bamboo_api_client.get_artifact(
+                    url=artifact_url, destination_file=str(artifacts_destination_dir / f"async_{artifact_name}"),
+                    chunk_size=1024
+                )
+                for artifact_name, artifact_url in query_for_artifacts.get('artifacts', {}).items()
+            ])
+
+            return query_for_artifacts, get_artifacts
+
+    query_for_artifacts, get_artifacts = asyncio.run(query_and_download())
+
+    assert query_for_artifacts == bamboo_api_client.query_job_for_artifacts(
+        plan_build_key="TEST-123", job_name="RESULT", artifact_names=artifact_names
+    )
+    assert all(get_artifact.get('status_code') == 200 for get_artifact in get_artifacts), get_artifacts
+
+    for artifact_name in query_for_artifacts.get('artifacts', {}):
+        downloaded_content = (artifacts_destination_dir / f"async_{artifact_name}").read_bytes()
+        assert downloaded_content == (MOCK_ARTIFACTS_DIR / artifact_name).read_bytes()
+
+
+def test_async_api_invalid_input(test_app):
+    """Test to see if invalid input is reported when the coroutine is awaited."""
+
+    bamboo_api_client = test_app.get('bamboo_api_tests').bamboo_api_client
+
+    async def query_without_plan_key():
+        async with get_async_client(bamboo_api_client) as async_bamboo_api_client:
+            return await async_bamboo_api_client.query_plan()
+
+    query_plan = asyncio.run(query_without_plan_key())
+
+    assert "No Bamboo plan/build build key supplied" in query_plan.get('content', ""), query_plan
+
+
+def test_async_api_unsupported_settings(mock_bamboo_server):
+    """Test to see if the settings of the sync client only are rejected instead of being ignored."""
+
+    with pytest.raises(TypeError):
+        AsyncBambooAPIClient(server_url=mock_bamboo_server.url, server_urls=[mock_bamboo_server.url])
+
+    async_bamboo_api_client = AsyncBambooAPIClient(server_url=mock_bamboo_server.url)
+    with pytest.raises(ValueError):
+        async_bamboo_api_client.response_cache = MemoryCache()
+    async_bamboo_api_client.response_cache = None
+    assert async_bamboo_api_client.response_cache is None
+
+
+def test_async_get_artifact(mock_bamboo_server, tmp_path):
+    """Test to see if the asyncio client resumes, verifies and caches the artifacts like the sync client."""
+
+    mock_bamboo_server.add_artifacts("PROJ-PLAN-1", JOB_NAME, {ARTIFACT_PATH: ARTIFACT_SIZE})
+    url = f"{mock_bamboo_server.url}/browse/PROJ-PLAN-1/artifact/{JOB_NAME}/{ARTIFACT_PATH}"
+    artifact_cache = ArtifactCache(directory=str(tmp_path / "cache"))
+
+    async def download(**values_to_unpack):
+        async with AsyncBambooAPIClient(
+                server_url=mock_bamboo_server.url, artifact_cache=values_to_unpack.pop('artifact_cache', None)
+        ) as async_bamboo_api_client:
+            async_bamboo_api_client.is_auth_enabled = False
+            return await async_bamboo_api_client.get_artifact(url=url, **values_to_unpack)
+
+    destination_file = tmp_path / "build.log"
+    with pytest.raises(DownloadErrorException, match="SHA-256"):
+        asyncio.run(download(destination_file=str(destination_file), sha256="0" * 64, resume=True))
+    assert not list(tmp_path.glob("build.log*"))
+
+    response = asyncio.run(download(destination_file=str(destination_file), artifact_cache=artifact_cache))
+    assert response == {'response': True, 'status_code': 200, 'content': None, 'url': url}
+    content = destination_file.read_bytes()
+    assert len(content) == ARTIFACT_SIZE and artifact_cache.get(url).sha256 == hashlib.sha256(content).hexdigest()
+
+    # Resumed: only the missing bytes are requested, and the whole artifact is verified
+    resumed_file = tmp_path / "resumed.log"
+    pathlib.Path(f"{resumed_file}.part").write_bytes(content[:ARTIFACT_SIZE // 2])
+    pathlib.Path(f"{resumed_file}.part.json").write_text(
+        f'{{"url": "{url}", "etag": null, "last_modified": "{artifact_cache.get(url).last_modified}"}}'
+    )
+    response = asyncio.run(download(
+        destination_file=str(resumed_file), resume=True, sha256=hashlib.sha256(content).hexdigest()
+    ))
+    assert response['status_code'] == 206 and resumed_file.read_bytes() == content
+    assert not list(tmp_path.glob("resumed.log.*"))
+
+    # Revalidated with a conditional request and delivered from the cache
+    response = asyncio.run(download(destination_file=str(tmp_path / "cached.log"), artifact_cache=artifact_cache))
+    assert response['status_code'] == 200 and (tmp_path / "cached.log").read_bytes() == content
+    assert mock_bamboo_server.stats[('artifact', 304)] == 1
+    assert not list(tmp_path.glob("*.part"))
@@ -0,0 +1,86 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Module used to test the load balancing and failover across the nodes of a Bamboo server cluster."""
+
+import pytest
+
+# Add custom packages
+from bamboo import BambooAPIClient, ServerPool
+from bamboo.cluster import LATENCY_WEIGHTED
+
+
+DEAD_SERVER_URL = "http://localhost:1"
+SERVER_URLS = ["http://bamboo-1:8085", "http://bamboo-2:8085/", "http://bamboo-3:8085"]
+
+
+def test_server_pool_least_outstanding():
+    """Test to see if the node with the least requests in flight is picked first."""
+
+    server_pool = ServerPool(server_urls=SERVER_URLS)
+    assert server_pool.split_url("http://bamboo-2:8085/rest/api/latest/plan/") == "/rest/api/latest/plan/"
+    assert server_pool.split_url("http://bamboo-20:8085/rest/api/latest/plan/") is None
+
+    first_start_time = server_pool.start_request("http://bamboo-1:8085")
+    server_pool.start_request("http://bamboo-2:8085")
+    assert server_pool.get_candidates()[0] == "http://bamboo-3:8085"
+
+    server_pool.finish_request("http://bamboo-1:8085", start_time=first_start_time, success=True)
+    # Ties are broken by latency: nodes never probed come first
+    assert server_pool.get_candidates() == ["http://bamboo-3:8085", "http://bamboo-1:8085", "http://bamboo-2:8085"]
+    assert server_pool.stats["http://bamboo-1:8085"]['requests'] == 1
+
+
+def test_server_pool_latency_weighted():
+    """Test to see if the fastest node is picked first."""
+
+    server_pool = ServerPool(server_urls=SERVER_URLS[:2], strategy=LATENCY_WEIGHTED)
+    for server_url, delay in (("http://bamboo-1:8085", 1), ("http://bamboo-2:8085", 0)):
+        start_time = server_pool.start_request(server_url) - delay
+        server_pool.finish_request(server_url, start_time=start_time, success=True)
+
+    assert server_pool.get_candidates() == ["http://bamboo-2:8085", "http://bamboo-1:8085"]
+
+    with pytest.raises(ValueError):
+        ServerPool(server_urls=SERVER_URLS, strategy="random")
+
+
+def test_server_pool_ejection():
+    """Test to see if failing nodes are ejected, and tried last."""
+
+    server_pool = ServerPool(server_urls=SERVER_URLS[:2], max_failures=2)
+    for _ in range(2):
+        start_time = server_pool.start_request("http://bamboo-1:8085")
+        server_pool.finish_request("http://bamboo-1:8085", start_time=start_time, success=False)
+
+    assert server_pool.stats["http://bamboo-1:8085"]['ejected']
+    assert server_pool.get_candidates() == ["http://bamboo-2:8085", "http://bamboo-1:8085"]
+
+
+def test_cluster_failover(test_app):
+    """Test to see if the read requests fail over to the healthy node when a node cannot be reached."""
+
+    bamboo_api_client = test_app.get('bamboo_api_tests').bamboo_api_client
+    plan_key = test_app.get('plan_keys', {}).get('build_key', '')
+
+    new_bamboo_api_client = BambooAPIClient(
+        server_urls=[DEAD_SERVER_URL, bamboo_api_client.server_url],
+        username=bamboo_api_client.username,
+        password=bamboo_api_client.password
+    )
+    new_bamboo_api_client.is_auth_enabled = bamboo_api_client.is_auth_enabled
+    new_bamboo_api_client.server_pool = ServerPool(
+        server_urls=new_bamboo_api_client.server_pool.server_urls, max_failures=1
+    )
+
+    with new_bamboo_api_client:
+        assert new_bamboo_api_client.server_url == DEAD_SERVER_URL
+
+        for _ in range(3):
+            query_plan = new_bamboo_api_client.query_plan(plan_key=plan_key)
+            assert query_plan.get('status_code') == 200, query_plan
+
+    stats = new_bamboo_api_client.server_pool.stats
+    # The dead node was tried once, then ejected
+    assert stats[DEAD_SERVER_URL]['requests'] == 1 and stats[DEAD_SERVER_URL]['ejected'], stats
+    assert stats[bamboo_api_client.server_url.rstrip("/")]['requests'] == 3, stats
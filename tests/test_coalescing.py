@@ -0,0 +1,114 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Module used to test the coalescing of identical requests made at the same time."""
+
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+# Add custom packages
+from bamboo import BambooAPIClient
+from bamboo.coalescing import SingleFlight
+from bamboo.retry import NO_RETRY
+
+
+def test_single_flight():
+    """Test to see if concurrent calls sharing a key are coalesced into one call."""
+
+    single_flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def slow_call():
+        calls.append(1)
+        release.wait(5)
+        return len(calls)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(single_flight.do, "key", slow_call) for _ in range(4)]
+        time.sleep(0.2)
+        release.set()
+
+    assert [future.result() for future in futures] == [1, 1, 1, 1]
+    # The key is released once the call is over
+    assert single_flight.do("key", slow_call) == 2
+
+
+def test_single_flight_ttl():
+    """Test to see if results are kept for the TTL, and exceptions never."""
+
+    single_flight = SingleFlight(ttl=0.2)
+    calls = []
+
+    def call():
+        calls.append(1)
+        return len(calls)
+
+    def failing_call():
+        calls.append(1)
+        raise ValueError("Failing call")
+
+    assert single_flight.do("key", call) == 1
+    assert single_flight.do("key", call) == 1
+    time.sleep(0.3)
+    assert single_flight.do("key", call) == 2
+
+    for _ in range(2):
+        try:
+            single_flight.do("failing_key", failing_call)
+        except ValueError:
+            pass
+    assert len(calls) == 4
+
+
+def test_coalesced_query_plan(test_app):
+    """Test to see if a herd of identical queries ends up in a single HTTP request."""
+
+    bamboo_api_client = test_app.get('bamboo_api_tests').bamboo_api_client
+    plan_key = test_app.get('plan_keys', {}).get('build_key', '')
+
+    new_bamboo_api_client = BambooAPIClient(
+        server_url=bamboo_api_client.server_url,
+        username=bamboo_api_client.username,
+        password=bamboo_api_client.password,
+        coalesce_requests=True,
+        coalesced_result_ttl=5
+    )
+    new_bamboo_api_client.is_auth_enabled = bamboo_api_client.is_auth_enabled
+
+    with new_bamboo_api_client:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            query_plans = list(executor.map(lambda _: new_bamboo_api_client.query_plan(plan_key=plan_key), range(16)))
+
+        assert all(query_plan.get('status_code') == 200 for query_plan in query_plans), query_plans
+
+        pool_stats = list(new_bamboo_api_client.pool_stats.values())
+        assert pool_stats[0]['requests'] == 1, pool_stats
+
+
+def test_coalesced_request_key(scripted_server):
+    """Test to see if only the requests sharing the URL, variant and retry policy are coalesced, once enabled."""
+
+    assert BambooAPIClient(server_url=scripted_server.url).request_coalescer is None
+
+    scripted_server.delay = 0.2
+    bamboo_api_client = BambooAPIClient(server_url=scripted_server.url, coalesce_requests=True)
+    bamboo_api_client.is_auth_enabled = False
+    url = f"{scripted_server.url}/rest/api/latest/plan/"
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        futures = [
+            executor.submit(
+                bamboo_api_client.get_parsed_request,
+                parser=bamboo_api_client.decode_json_response,
+                variant=variant,
+                url=url,
+                retry_policy=retry_policy
+            )
+            for variant, retry_policy in [(None, NO_RETRY)] * 2 + [(None, None)] * 2 + [("model", None)] * 2
+        ]
+
+    assert all(future.result()[1] == {'state': "ok"} for future in futures)
+    assert len(scripted_server.requests) == 3
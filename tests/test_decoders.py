@@ -0,0 +1,79 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Module used to test the JSON decoders."""
+
+import json
+import pytest
+
+# Add custom packages
+from bamboo.decoders import (
+    AUTO_DECODER,
+    DECODERS,
+    STDLIB_DECODER,
+    decode_json,
+    get_json_decoder
+)
+
+
+DOCUMENT = {
+    'results': {
+        'size': 2,
+        'result': [
+            {'buildNumber': 2, 'buildState': "Successful", 'plan': {'key': "TEST-XYZ"}, 'labels': ["nightly"]},
+            {'buildNumber': 1, 'buildState': "Failed", 'plan': {'key': "TEST-XYZ"}, 'labels': []}
+        ]
+    }
+}
+
+
+@pytest.mark.parametrize("decoder", [decoder for decoder, loads in DECODERS.items() if loads is not None])
+def test_decode_json(decoder):
+    """Test to see if every installed decoder decodes bytes and strings alike."""
+
+    content = json.dumps(DOCUMENT)
+    assert decode_json(content.encode("utf-8"), decoder=decoder) == DOCUMENT
+    assert decode_json(content, decoder=decoder) == DOCUMENT
+
+
+def test_decode_json_fields():
+    """Test to see if only the selected fields are kept, along with the objects holding them."""
+
+    content = json.dumps(DOCUMENT).encode("utf-8")
+
+    assert decode_json(content, fields=frozenset({'buildNumber', 'buildState'})) == {
+        'results': {
+            'result': [{'buildNumber': 2, 'buildState': "Successful"}, {'buildNumber': 1, 'buildState': "Failed"}]
+        }
+    }
+    assert decode_json(content, fields=frozenset({'key', 'size'})) == {
+        'results': {'size': 2, 'result': [{'plan': {'key': "TEST-XYZ"}}, {'plan': {'key': "TEST-XYZ"}}]}
+    }
+
+
+def test_decode_json_fields_lists():
+    """Test to see if the lists are kept whenever any of their elements holds selected fields, whatever the first."""
+
+    content = json.dumps({
+        'result': [{'id': 1}, {'id': 2, 'key': "TEST-1"}],
+        'mixed': [3, "text", {'key': "TEST-2"}],
+        'nested': [[], [{'id': 3}], [{'key': "TEST-3"}]],
+        'scalars': [1, 2],
+        'unselected': [{'id': 4}, [{'id': 5}]]
+    })
+
+    assert decode_json(content, fields=frozenset({'key'})) == {
+        'result': [{}, {'key': "TEST-1"}],
+        'mixed': [3, "text", {'key': "TEST-2"}],
+        'nested': [[], [{}], [{'key': "TEST-3"}]]
+    }
+
+
+def test_json_decoder_selection():
+    """Test to see if unknown decoders are refused, and if the fastest decoder is picked automatically."""
+
+    assert get_json_decoder(STDLIB_DECODER) == STDLIB_DECODER
+    assert DECODERS[get_json_decoder(AUTO_DECODER)] is not None
+
+    with pytest.raises(ValueError):
+        get_json_decoder("simplejson")
@@ -3,6 +3,15 @@
 
 """Module used to test if the API can download a plan build artifacts."""
 
+import json
+import pathlib
+import requests
+import time
+
+
+# Artifacts served by the mock server
+MOCK_ARTIFACTS_DIR = pathlib.Path(__file__).resolve().parent / "public" / "log"
+
 
 def test_get_artifacts(test_app):
     """Test to see if we can get an artifact from a Bamboo plan build."""
@@ -20,3 +29,159 @@ def test_get_artifacts(test_app):
         )
         # Check if the API got a HTTP 200 response code
         assert get_artifact.get('status_code') == 200, get_artifact
+
+
+def test_get_artifacts_chunked(test_app):
+    """Test to see if an artifact downloaded in small chunks is written to disk unaltered."""
+
+    bamboo_api_client = test_app.get('bamboo_api_tests').bamboo_api_client
+    artifacts_destination_dir = test_app.get('artifacts_destination_dir')
+    artifacts_url = test_app.get('artifacts_url')
+    test_type = test_app.get('test_type')
+
+    for artifact_name, artifact_url in artifacts_url.items():
+        destination_file = artifacts_destination_dir / f"chunked_{artifact_name}"
+
+        get_artifact = bamboo_api_client.get_artifact(
+            url=artifact_url,
+            destination_file=str(destination_file),
+            chunk_size=1024
+        )
+        assert get_artifact.get('status_code') == 200, get_artifact
+
+        # No partial file must be left behind once the download is complete
+        assert not pathlib.Path(f"{destination_file}.part").exists()
+
+        if test_type == "MOCK":
+            assert destination_file.read_bytes() == (MOCK_ARTIFACTS_DIR / artifact_name).read_bytes()
+
+
+def test_get_artifacts_resume(test_app):
+    """Test to see if an interrupted artifact download is resumed from where it stopped."""
+
+    bamboo_api_client = test_app.get('bamboo_api_tests').bamboo_api_client
+    artifacts_destination_dir = test_app.get('artifacts_destination_dir')
+    test_type = test_app.get('test_type')
+
+    if test_type != "MOCK":
+        return
+
+    artifact_url = test_app.get('artifacts_url').get("stdout_log.txt")
+    artifact_content = (MOCK_ARTIFACTS_DIR / "stdout_log.txt").read_bytes()
+    destination_file = artifacts_destination_dir / "resumed_stdout_log.txt"
+
+    # Fake an interrupted download: half of the artifact and its validators next to it
+    artifact_headers = requests.head(artifact_url).headers
+    pathlib.Path(f"{destination_file}.part").write_bytes(artifact_content[:len(artifact_content) // 2])
+    pathlib.Path(f"{destination_file}.part.json").write_text(json.dumps({
+        'url': artifact_url,
+        'etag': artifact_headers.get('ETag'),
+        'last_modified': artifact_headers.get('Last-Modified'),
+        'size': len(artifact_content)
+    }))
+
+    get_artifact = bamboo_api_client.get_artifact(
+        url=artifact_url, destination_file=str(destination_file), resume=True
+    )
+    # Check if the API got a HTTP 206 response code, i.e. only the missing bytes were requested
+    assert get_artifact.get('status_code') == 206, get_artifact
+    assert destination_file.read_bytes() == artifact_content
+    assert not pathlib.Path(f"{destination_file}.part").exists()
+    assert not pathlib.Path(f"{destination_file}.part.json").exists()
+
+
+def test_get_artifacts_resume_changed_artifact(test_app):
+    """Test to see if a partial download of an artifact that changed meanwhile is downloaded from scratch."""
+
+    bamboo_api_client = test_app.get('bamboo_api_tests').bamboo_api_client
+    artifacts_destination_dir = test_app.get('artifacts_destination_dir')
+    test_type = test_app.get('test_type')
+
+    if test_type != "MOCK":
+        return
+
+    artifact_url = test_app.get('artifacts_url').get("stdout_log.txt")
+    artifact_content = (MOCK_ARTIFACTS_DIR / "stdout_log.txt").read_bytes()
+    destination_file = artifacts_destination_dir / "restarted_stdout_log.txt"
+
+    pathlib.Path(f"{destination_file}.part").write_bytes(b"stale content")
+    pathlib.Path(f"{destination_file}.part.json").write_text(json.dumps({
+        'url': artifact_url,
+        'etag': None,
+        'last_modified': "Thu, 01 Jan 1970 00:00:00 GMT",
+        'size': len(artifact_content)
+    }))
+
+    get_artifact = bamboo_api_client.get_artifact(
+        url=artifact_url, destination_file=str(destination_file), resume=True
+    )
+    # The server ignores the range as the validator does not match: the whole artifact is sent
+    assert get_artifact.get('status_code') == 200, get_artifact
+    assert destination_file.read_bytes() == artifact_content
+
+
+def test_get_artifacts_bulk(test_app):
+    """Test to see if we can get several artifacts from a Bamboo plan build at once."""
+
+    bamboo_api_client = test_app.get('bamboo_api_tests').bamboo_api_client
+    artifacts_destination_dir = test_app.get('artifacts_destination_dir')
+    artifacts_url = test_app.get('artifacts_url')
+    test_type = test_app.get('test_type')
+
+    artifacts = {
+        artifact_url: str(artifacts_destination_dir / f"bulk_{artifact_name}")
+        for artifact_name, artifact_url in artifacts_url.items()
+    }
+
+    get_artifacts = bamboo_api_client.get_artifacts(artifacts=artifacts, max_workers=4, max_workers_per_host=2)
+    assert get_artifacts.keys() == artifacts.keys(), get_artifacts
+
+    for artifact_name, artifact_url in artifacts_url.items():
+        # Check if the API got a HTTP 200 response code for every artifact
+        assert get_artifacts[artifact_url].get('status_code') == 200, get_artifacts[artifact_url]
+
+        if test_type == "MOCK":
+            downloaded_content = pathlib.Path(artifacts[artifact_url]).read_bytes()
+            assert downloaded_content == (MOCK_ARTIFACTS_DIR / artifact_name).read_bytes()
+
+
+def test_get_artifacts_bulk_bandwidth(test_app):
+    """Test to see if the total bandwidth used to get several artifacts is capped."""
+
+    bamboo_api_client = test_app.get('bamboo_api_tests').bamboo_api_client
+    artifacts_destination_dir = test_app.get('artifacts_destination_dir')
+    test_type = test_app.get('test_type')
+
+    if test_type != "MOCK":
+        return
+
+    artifacts = {
+        artifact_url: str(artifacts_destination_dir / f"capped_{artifact_name}")
+        for artifact_name, artifact_url in test_app.get('artifacts_url').items()
+    }
+    total_size = sum(path.stat().st_size for path in MOCK_ARTIFACTS_DIR.iterdir())
+
+    # Allow the first half of the artifacts in the initial burst: the second half needs at least 1 more second
+    max_bandwidth = total_size // 2
+    start_time = time.monotonic()
+    get_artifacts = bamboo_api_client.get_artifacts(
+        artifacts=artifacts, max_bandwidth=max_bandwidth, chunk_size=1024
+    )
+    elapsed_time = time.monotonic() - start_time
+
+    assert all(result.get('status_code') == 200 for result in get_artifacts.values()), get_artifacts
+    assert elapsed_time >= 0.9, elapsed_time
+
+
+def test_get_artifacts_bulk_error(test_app):
+    """Test to see if a failing artifact download is reported without aborting the others."""
+
+    bamboo_api_client = test_app.get('bamboo_api_tests').bamboo_api_client
+    artifacts_destination_dir = test_app.get('artifacts_destination_dir')
+
+    invalid_url = "http://localhost:1/invalid_artifact.txt"
+    get_artifacts = bamboo_api_client.get_artifacts(
+        artifacts={invalid_url: str(artifacts_destination_dir / "invalid_artifact.txt")}
+    )
+
+    assert get_artifacts[invalid_url].get('response') is False, get_artifacts
@@ -0,0 +1,49 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Module used to test the lazy import of the package: heavy dependencies and logging setup loaded on request only."""
+
+import subprocess
+import sys
+
+
+def run_python(code: str) -> list:
+    """Run Python code in a fresh interpreter, get the words of its output."""
+    return subprocess.run(
+        [sys.executable, "-c", code], stdout=subprocess.PIPE, universal_newlines=True, check=True
+    ).stdout.split()
+
+
+def test_import_is_lazy():
+    """Test to see if importing the package loads no heavy dependency and leaves the logging configuration as is."""
+
+    assert run_python(
+        "import logging, sys; import bamboo; "
+        "print(*[name for name in ('requests', 'aiohttp', 'bs4', 'yaml') if name in sys.modules]); "
+        "print(len(logging.getLogger().handlers), logging.getLogger().level)"
+    ) == ["0", "30"]
+
+    # Loaded on first use
+    assert run_python(
+        "import logging, sys; from bamboo import BambooAPIClient, configure_logging; "
+        "from bamboo.parsers import parse_artifact_links; parse_artifact_links('<a href=\"/x\">x</a>', backend='bs4'); "
+        "print(BambooAPIClient.__name__, *[name for name in ('requests', 'bs4', 'yaml') if name in sys.modules]); "
+        "configure_logging(); print(len(logging.getLogger().handlers), logging.getLogger().level)"
+    ) == ["BambooAPIClient", "requests", "bs4", "1", "10"]
+
+
+def test_models_import_is_light():
+    """Test to see if the models and the build watcher load no database module."""
+
+    assert run_python(
+        "import sys; import bamboo.models, bamboo.watch; print('sqlite3' in sys.modules)"
+    ) == ["False"]
+
+
+def test_client_import_is_light():
+    """Test to see if importing the API clients loads the index (sqlite3), caches and instrumentation on use only."""
+
+    assert run_python(
+        "import sys; import bamboo.api, bamboo.async_api; print(*[name for name in ("
+        "'sqlite3', 'bamboo.index', 'bamboo.cache', 'bamboo.instrumentation') if name in sys.modules])"
+    ) == []
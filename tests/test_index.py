@@ -0,0 +1,63 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Module used to test the local index of plan results."""
+
+# Add custom packages
+from bamboo import PlanResultsIndex
+
+
+PLAN_KEY = "TEST-XYZ"
+
+
+def get_result(build_number: int, life_cycle_state: str = "Finished", build_state: str = "Successful") -> dict:
+    """Get a plan result the way Bamboo lists it."""
+    return {
+        'key': f"{PLAN_KEY}-{build_number}",
+        'buildResultKey': f"{PLAN_KEY}-{build_number}",
+        'buildNumber': build_number,
+        'buildState': build_state,
+        'lifeCycleState': life_cycle_state
+    }
+
+
+def test_index_queries(tmp_path):
+    """Test to see if the latest results and the result of a build are read from the index."""
+
+    with PlanResultsIndex(database=str(tmp_path / "index.db")) as plan_results_index:
+        assert plan_results_index.get_sync_point(PLAN_KEY) is None
+
+        stored_results = plan_results_index.store_results(
+            plan_key=PLAN_KEY, results=[get_result(build_number) for build_number in range(1, 11)]
+        )
+        assert stored_results == 10
+
+        latest_results = plan_results_index.get_latest_results(plan_key=PLAN_KEY, count=3)
+        assert [result['buildNumber'] for result in latest_results] == [10, 9, 8]
+
+        assert plan_results_index.get_result(f"{PLAN_KEY}-4") == get_result(4)
+        assert plan_results_index.get_result(f"{PLAN_KEY}-42") is None
+
+    # The index is persistent
+    with PlanResultsIndex(database=str(tmp_path / "index.db")) as plan_results_index:
+        assert plan_results_index.get_sync_point(PLAN_KEY) == 10
+
+
+def test_index_sync_point_running_builds():
+    """Test to see if the builds still running are fetched again on the next sync."""
+
+    with PlanResultsIndex() as plan_results_index:
+        plan_results_index.store_results(plan_key=PLAN_KEY, results=[
+            get_result(12, life_cycle_state="InProgress", build_state="Unknown"),
+            get_result(11, life_cycle_state="InProgress", build_state="Unknown"),
+            get_result(10),
+        ])
+        assert plan_results_index.get_sync_point(PLAN_KEY) == 10
+
+        # Build 11 finished meanwhile
+        plan_results_index.store_results(plan_key=PLAN_KEY, results=[get_result(11, build_state="Failed")])
+        assert plan_results_index.get_sync_point(PLAN_KEY) == 11
+        assert plan_results_index.get_result(f"{PLAN_KEY}-11").get('buildState') == "Failed"
+
+        plan_results_index.store_results(plan_key=PLAN_KEY, results=[get_result(12)])
+        assert plan_results_index.get_sync_point(PLAN_KEY) == 12
@@ -0,0 +1,181 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Module used to test the instrumentation of the API clients: timing events, histogram collector, Prometheus export."""
+
+import asyncio
+import pytest
+
+# Add custom packages
+from bamboo import AsyncBambooAPIClient, BambooAPIClient, HistogramCollector, Instrumentation, RetryPolicy
+from bamboo.exceptions import HTTPErrorException
+from bamboo.instrumentation import to_prometheus_text
+
+
+PLAN_KEY = "PROJ-PLAN"
+BUILD_KEY = f"{PLAN_KEY}-3"
+JOB_NAME = "JOB1"
+
+
+def get_client(mock_bamboo_server, *listeners, **kwargs) -> BambooAPIClient:
+    """Get a client of the mock Bamboo server, reporting its events to the listeners."""
+
+    bamboo_api_client = BambooAPIClient(
+        server_url=mock_bamboo_server.url, instrumentation=Instrumentation(listeners=list(listeners)), **kwargs
+    )
+    bamboo_api_client.is_auth_enabled = False
+    return bamboo_api_client
+
+
+def test_query_plan_events(mock_bamboo_server):
+    """Test to see if the network and the decoding time of an API call are reported apart."""
+
+    mock_bamboo_server.add_plan(PLAN_KEY, results_count=100)
+    events = list()
+    bamboo_api_client = get_client(mock_bamboo_server, events.append)
+
+    for _ in range(2):
+        assert bamboo_api_client.query_plan(plan_key=PLAN_KEY, raw=False)['status_code'] == 200
+
+    assert [(event['event'], event.get('parser')) for event in events] == [
+        ("request", None), ("parse", "json"), ("parse", "models"), ("call", None)
+    ] * 2
+    assert {event['api_method'] for event in events} == {"query_plan"}
+
+    first_request, second_request = (event for event in events if event['event'] == "request")
+    assert first_request['status_code'] == 200 and first_request['attempt'] == 1
+    assert first_request['host'] == mock_bamboo_server.url
+    # New connection, then reused
+    assert not first_request['connection_reused'] and second_request['connection_reused']
+    # DNS resolution counted in the connect time
+    assert first_request['dns_time'] is None and first_request['connect_time'] > 0
+    assert second_request['dns_time'] is None and second_request['connect_time'] is None
+    assert first_request['tls_time'] is None
+    assert 0 < second_request['ttfb'] <= second_request['total_time']
+    assert second_request['bytes_sent'] > 0
+
+    json_parse = events[1]
+    assert json_parse['bytes'] == second_request['bytes_received'] > 0
+    call = events[3]
+    assert call['error'] is None
+    assert call['duration'] >= first_request['total_time'] + json_parse['duration']
+
+
+def test_nested_and_failed_calls(mock_bamboo_server, tmp_path):
+    """Test to see if nested API calls are reported under the outermost one, along with the retries and errors."""
+
+    mock_bamboo_server.add_plan(PLAN_KEY, results_count=3)
+    mock_bamboo_server.add_artifacts(BUILD_KEY, JOB_NAME, {"Build-log/build.log": 3 * 1024 * 1024})
+    events = list()
+    bamboo_api_client = get_client(
+        mock_bamboo_server, events.append, retry_policy=RetryPolicy(total=2, backoff_factor=0.01)
+    )
+
+    url = f"{mock_bamboo_server.url}/browse/{BUILD_KEY}/artifact/{JOB_NAME}/Build-log/build.log"
+    bamboo_api_client.get_artifacts(artifacts={url: str(tmp_path / "build.log")}, max_workers=1)
+    # Downloads run in worker threads, outside of the <get_artifacts> call
+    assert [(event['event'], event['api_method']) for event in events] == [
+        ("request", "get_artifact"), ("download", "get_artifact"), ("call", "get_artifact"), ("call", "get_artifacts")
+    ]
+    assert events[1]['bytes'] == 3 * 1024 * 1024
+
+    # <wait_for_builds> called by <wait_for_build>
+    events.clear()
+    assert bamboo_api_client.wait_for_build(plan_build_key=BUILD_KEY, timeout=5)['response']
+    assert [(event['event'], event['api_method']) for event in events] == [
+        ("request", "wait_for_build"), ("parse", "wait_for_build"), ("call", "wait_for_build")
+    ]
+
+    events.clear()
+    mock_bamboo_server.throttle_rate, mock_bamboo_server.retry_after = 1.0, 0
+    assert bamboo_api_client.query_plan(plan_key=PLAN_KEY)['status_code'] == 429
+    assert [(event['event'], event['attempt'], event['status_code']) for event in events[:-1]] == [
+        ("request", 1, 429), ("request", 2, 429), ("request", 3, 429)
+    ]
+
+    # Listener errors never reach the client
+    events.clear()
+    bamboo_api_client.instrumentation.subscribe(lambda event: 1 / 0)
+    mock_bamboo_server.throttle_rate = 0.0
+    mock_bamboo_server.stop()
+    bamboo_api_client.close()
+    with pytest.raises(HTTPErrorException):
+        bamboo_api_client.query_plan(plan_key=PLAN_KEY)
+    assert events[0]['event'] == "request" and events[0]['error'] == "HTTPErrorException"
+    assert events[-1]['event'] == "call" and events[-1]['error'] is not None
+
+    # Disabled
+    events.clear()
+    bamboo_api_client.instrumentation = None
+    with pytest.raises(HTTPErrorException):
+        bamboo_api_client.query_plan(plan_key=PLAN_KEY)
+    assert events == []
+
+
+def test_histogram_collector_prometheus_text():
+    """Test to see if the collected events are exported in the Prometheus text format."""
+
+    collector = HistogramCollector(buckets=(0.1, 1.0))
+    instrumentation = Instrumentation(listeners=[collector])
+    request_event = {
+        'event': "request", 'api_method': "query_plan", 'http_method': "GET", 'host': "http://bamboo:8085",
+        'status_code': 200, 'error': None, 'attempt': 1, 'dns_time': 0.01, 'connect_time': 0.02, 'tls_time': None,
+        'ttfb': 0.5, 'total_time': 0.75, 'bytes_sent': 300, 'bytes_received': 2000, 'connection_reused': False
+    }
+    instrumentation.emit(request_event)
+    instrumentation.emit(dict(request_event, attempt=2, status_code=None, error="HTTPErrorException", total_time=2))
+    instrumentation.emit({
+        'event': "parse", 'api_method': "query_plan", 'parser': "json", 'bytes': 2000, 'duration': 0.05, 'error': None
+    })
+    instrumentation.emit({'event': "call", 'api_method': 'query_"plan"\n', 'duration': 1.5, 'error': None})
+
+    assert collector.get_counter('bamboo_request_bytes_total', direction="out") == 600
+    assert collector.get_counter('bamboo_request_retries_total') == 1
+    assert collector.get_counter('bamboo_connections_total', reused="false") == 1
+    phase = collector.get_histogram(
+        'bamboo_request_phase_seconds', api_method="query_plan", host="http://bamboo:8085", phase="ttfb"
+    )
+    assert (phase.count, phase.sum, phase.cumulative_counts) == (2, 1.0, [0, 2, 2])
+
+    lines = to_prometheus_text(collector).splitlines()
+    assert lines[:7] == [
+        "# HELP bamboo_call_duration_seconds Duration of the public API method calls.",
+        "# TYPE bamboo_call_duration_seconds histogram",
+        'bamboo_call_duration_seconds_bucket{api_method="query_\\"plan\\"\\n",outcome="success",le="0.1"} 0',
+        'bamboo_call_duration_seconds_bucket{api_method="query_\\"plan\\"\\n",outcome="success",le="1.0"} 0',
+        'bamboo_call_duration_seconds_bucket{api_method="query_\\"plan\\"\\n",outcome="success",le="+Inf"} 1',
+        'bamboo_call_duration_seconds_sum{api_method="query_\\"plan\\"\\n",outcome="success"} 1.5',
+        'bamboo_call_duration_seconds_count{api_method="query_\\"plan\\"\\n",outcome="success"} 1'
+    ]
+    assert ('bamboo_request_duration_seconds_count{api_method="query_plan",http_method="GET",'
+            'host="http://bamboo:8085",status="error"} 1') in lines
+    assert 'bamboo_parsed_bytes_total{parser="json"} 2000' in lines
+    assert "# TYPE bamboo_request_retries_total counter" in lines
+
+    collector.reset()
+    assert to_prometheus_text(collector) == ""
+
+
+def test_async_client_events(mock_bamboo_server):
+    """Test to see if the asyncio client reports the same events as the sync client."""
+
+    pytest.importorskip("aiohttp")
+    mock_bamboo_server.add_plan(PLAN_KEY, results_count=10)
+    collector = HistogramCollector()
+    events = list()
+
+    async def query_plan():
+        async with AsyncBambooAPIClient(
+                server_url=mock_bamboo_server.url, instrumentation=Instrumentation(listeners=[events.append, collector])
+        ) as async_bamboo_api_client:
+            async_bamboo_api_client.is_auth_enabled = False
+            for _ in range(2):
+                await async_bamboo_api_client.query_plan(plan_key=PLAN_KEY)
+
+    asyncio.run(query_plan())
+
+    assert [event['event'] for event in events] == ["request", "parse", "call"] * 2
+    assert not events[0]['connection_reused'] and events[3]['connection_reused']
+    assert events[0]['connect_time'] > 0 and events[3]['connect_time'] is None
+    assert events[0]['bytes_received'] == events[1]['bytes']
+    assert collector.get_counter('bamboo_connections_total', reused="true") == 1
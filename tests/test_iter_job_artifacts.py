@@ -0,0 +1,86 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Module used to test if the API can walk the artifact directory trees of a plan build job."""
+
+import pytest
+
+
+# Files of the artifact tree served by the mock server
+MOCK_ARTIFACT_TREE = {
+    "README.txt": "/log/stderr_log.txt",
+    "Build-log/stderr_log.txt": "/log/stderr_log.txt",
+    "Build-log/stdout_log.txt": "/log/stdout_log.txt",
+    "Build-log/WDG_log.txt": "/log/WDG_log.txt",
+    "Docs/index.txt": "/log/stdout_log.txt",
+    "Docs/api/client.txt": "/log/WDG_log.txt"
+}
+
+
+def test_iter_job_artifacts_ok(test_app):
+    """Test to see if we can walk all the artifacts of a job, sub-dirs included."""
+
+    bamboo_api_client = test_app.get('bamboo_api_tests').bamboo_api_client
+    test_type = test_app.get('test_type')
+
+    if test_type != "MOCK":
+        return
+
+    artifacts = dict(bamboo_api_client.iter_job_artifacts(plan_build_key="TEST-123", job_name="TREE"))
+    expected_artifacts = {
+        relative_path: f"{bamboo_api_client.server_url}{file_path}"
+        for relative_path, file_path in MOCK_ARTIFACT_TREE.items()
+    }
+
+    # The loop between "Docs/Loop/" and the job page must not be followed
+    assert artifacts == expected_artifacts
+
+
+def test_iter_job_artifacts_filters(test_app):
+    """Test to see if the walked artifacts can be limited by depth and glob patterns."""
+
+    bamboo_api_client = test_app.get('bamboo_api_tests').bamboo_api_client
+    test_type = test_app.get('test_type')
+
+    if test_type != "MOCK":
+        return
+
+    artifacts = bamboo_api_client.iter_job_artifacts(plan_build_key="TEST-123", job_name="TREE", max_depth=1)
+    assert sorted(path for path, _ in artifacts) == sorted(
+        path for path in MOCK_ARTIFACT_TREE if path.count("/") <= 1
+    )
+
+    artifacts = bamboo_api_client.iter_job_artifacts(
+        plan_build_key="TEST-123", job_name="TREE", include=("*.txt",), exclude=("Build-log/*", "*/client.txt")
+    )
+    assert sorted(path for path, _ in artifacts) == ["Docs/index.txt", "README.txt"]
+
+
+def test_iter_job_artifacts_lazy(test_app):
+    """Test to see if the artifacts are yielded before the whole tree is walked."""
+
+    bamboo_api_client = test_app.get('bamboo_api_tests').bamboo_api_client
+    test_type = test_app.get('test_type')
+
+    if test_type != "MOCK":
+        return
+
+    artifacts = bamboo_api_client.iter_job_artifacts(
+        plan_build_key="TEST-123", job_name="TREE", artifact_names=("Build-log",)
+    )
+    relative_path, url = next(artifacts)
+
+    assert relative_path.startswith("Build-log/"), relative_path
+    assert url.startswith(bamboo_api_client.server_url), url
+
+
+def test_iter_job_artifacts_invalid_input(test_app):
+    """Test to see if invalid inputs are raised when the walk is requested, instead of being iterated over."""
+
+    bamboo_api_client = test_app.get('bamboo_api_tests').bamboo_api_client
+
+    with pytest.raises(ValueError, match="No Bamboo plan/build build key supplied"):
+        bamboo_api_client.iter_job_artifacts(plan_build_key=None, job_name="TREE")
+
+    with pytest.raises(ValueError, match="No Bamboo job name supplied"):
+        bamboo_api_client.iter_job_artifacts(plan_build_key="TEST-123")
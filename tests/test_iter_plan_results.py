@@ -0,0 +1,116 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Module used to test the walk of the plan histories, page by page, and their sync into a local index."""
+
+import pytest
+
+# Add custom packages
+from bamboo import BambooAPIClient, PlanResultsIndex
+from bamboo.exceptions import HTTPErrorException
+
+
+PLAN_KEY = "PROJ-PLAN"
+
+
+def get_client(mock_bamboo_server) -> BambooAPIClient:
+    """Get a client of the mock Bamboo server."""
+
+    bamboo_api_client = BambooAPIClient(server_url=mock_bamboo_server.url)
+    bamboo_api_client.is_auth_enabled = False
+    return bamboo_api_client
+
+
+def test_iter_plan_results_pages(mock_bamboo_server):
+    """Test to see if a long plan history is walked newest first, one page at a time."""
+
+    mock_bamboo_server.add_plan(PLAN_KEY, results_count=1000)
+    bamboo_api_client = get_client(mock_bamboo_server)
+
+    build_numbers = [
+        result['buildNumber'] for result in bamboo_api_client.iter_plan_results(plan_key=PLAN_KEY, page_size=100)
+    ]
+
+    assert build_numbers == list(range(1000, 0, -1))
+    assert mock_bamboo_server.stats == {('result', 200): 10}
+
+
+def test_iter_plan_results_early_stop(mock_bamboo_server):
+    """Test to see if the pages past <since>/<max_results> are not requested."""
+
+    mock_bamboo_server.add_plan(PLAN_KEY, results_count=1000)
+    bamboo_api_client = get_client(mock_bamboo_server)
+
+    results = list(bamboo_api_client.iter_plan_results(plan_key=PLAN_KEY, page_size=25, since=960))
+    assert [result['buildNumber'] for result in results] == list(range(1000, 960, -1))
+
+    results = list(bamboo_api_client.iter_plan_results(plan_key=PLAN_KEY, page_size=25, max_results=30))
+    assert len(results) == 30
+
+    assert mock_bamboo_server.stats == {('result', 200): 2 + 2}
+
+
+def test_iter_plan_results_error(mock_bamboo_server):
+    """Test to see if a page that cannot be fetched stops the walk."""
+
+    bamboo_api_client = get_client(mock_bamboo_server)
+
+    with pytest.raises(HTTPErrorException):
+        list(bamboo_api_client.iter_plan_results(plan_key="PROJ-UNKNOWN"))
+
+
+def test_iter_plan_results_invalid_input(mock_bamboo_server):
+    """Test to see if invalid inputs are raised when the walk is requested, instead of being iterated over."""
+
+    bamboo_api_client = get_client(mock_bamboo_server)
+
+    with pytest.raises(ValueError, match="No Bamboo plan/build build key supplied"):
+        bamboo_api_client.iter_plan_results(plan_key=None)
+
+    bamboo_api_client.server_url = None
+    with pytest.raises(ValueError, match="No Bamboo server supplied"):
+        bamboo_api_client.iter_plan_results(plan_key=PLAN_KEY)
+
+    assert mock_bamboo_server.stats == {}
+
+
+def test_sync_plan_results(mock_bamboo_server):
+    """Test to see if only the new results, and the ones still running, are fetched on sync."""
+
+    mock_bamboo_server.add_plan(PLAN_KEY, results_count=60, running_count=2)
+    bamboo_api_client = get_client(mock_bamboo_server)
+
+    with PlanResultsIndex() as plan_results_index:
+        sync_response = bamboo_api_client.sync_plan_results(plan_key=PLAN_KEY, index=plan_results_index)
+        assert sync_response.get('status_code') == 200, sync_response
+        assert len(sync_response['content']) == 60
+        assert plan_results_index.get_result(f"{PLAN_KEY}-60")['lifeCycleState'] == "InProgress"
+
+        # A build finished and a new one started
+        mock_bamboo_server.finish_build(f"{PLAN_KEY}-59", build_state="Failed")
+        bamboo_api_client.trigger_plan_build(plan_key=PLAN_KEY)
+
+        sync_response = bamboo_api_client.sync_plan_results(plan_key=PLAN_KEY, index=plan_results_index, page_size=10)
+        assert [result['buildNumber'] for result in sync_response['content']] == [61, 60, 59]
+        assert plan_results_index.get_result(f"{PLAN_KEY}-59")['buildState'] == "Failed"
+        assert plan_results_index.get_latest_results(plan_key=PLAN_KEY, count=1)[0]['buildNumber'] == 61
+
+    assert bamboo_api_client.sync_plan_results(plan_key=PLAN_KEY) == {'content': "Incorrect input provided!"}
+
+
+def test_sync_plan_results_running_build(mock_bamboo_server):
+    """Test to see if a build running on a sync, hidden from the default listing, is recorded as finished on the next."""
+
+    mock_bamboo_server.add_plan(PLAN_KEY, results_count=5, running_count=1)
+    bamboo_api_client = get_client(mock_bamboo_server)
+
+    with PlanResultsIndex() as plan_results_index:
+        bamboo_api_client.sync_plan_results(plan_key=PLAN_KEY, index=plan_results_index)
+        assert plan_results_index.get_result(f"{PLAN_KEY}-5")['lifeCycleState'] == "InProgress"
+        assert plan_results_index.get_sync_point(PLAN_KEY) == 4
+
+        mock_bamboo_server.finish_build(f"{PLAN_KEY}-5")
+        sync_response = bamboo_api_client.sync_plan_results(plan_key=PLAN_KEY, index=plan_results_index)
+        assert [result['buildNumber'] for result in sync_response['content']] == [5]
+        assert plan_results_index.get_result(f"{PLAN_KEY}-5")['lifeCycleState'] == "Finished"
+        assert plan_results_index.get_sync_point(PLAN_KEY) == 5
@@ -0,0 +1,103 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Module used to test the API against the in-process mock Bamboo server."""
+
+import hashlib
+
+# Add custom packages
+from bamboo import BambooAPIClient
+from bamboo.retry import NO_RETRY
+from tests.mock_bamboo_server import get_artifact_content
+
+
+PLAN_KEY = "PROJ-PLAN"
+BUILD_KEY = f"{PLAN_KEY}-3"
+JOB_NAME = "JOB1"
+ARTIFACT_FILES = {
+    "Build-log/build.log": 5 * 1024 * 1024 + 123,
+    "Build-log/tests/unit.xml": 2048,
+    "Build-log/tests/integration/report.html": 10,
+    "Package/app.tar.gz": 1024
+}
+
+
+def get_client(mock_bamboo_server, **kwargs) -> BambooAPIClient:
+    """Get a client of the mock Bamboo server."""
+
+    bamboo_api_client = BambooAPIClient(server_url=mock_bamboo_server.url, **kwargs)
+    bamboo_api_client.is_auth_enabled = False
+    return bamboo_api_client
+
+
+def test_mock_server_build_lifecycle(mock_bamboo_server):
+    """Test to see if triggered builds can be queried and stopped."""
+
+    mock_bamboo_server.add_plan(PLAN_KEY, results_count=2)
+    bamboo_api_client = get_client(mock_bamboo_server)
+
+    trigger_response = bamboo_api_client.trigger_plan_build(plan_key=PLAN_KEY)
+    assert trigger_response['content']['buildResultKey'] == BUILD_KEY, trigger_response
+
+    query_response = bamboo_api_client.query_plan(plan_key=BUILD_KEY, raw=False)
+    assert query_response['content'].life_cycle_state == "Queued", query_response
+
+    stop_response = bamboo_api_client.stop_build(plan_build_key=BUILD_KEY)
+    assert stop_response.get('status_code') == 200, stop_response
+    assert bamboo_api_client.wait_for_build(plan_build_key=BUILD_KEY, timeout=5)['response']
+
+    assert bamboo_api_client.stop_build(plan_build_key=f"{PLAN_KEY}-42").get('status_code') == 404
+
+
+def test_mock_server_artifacts(mock_bamboo_server, tmp_path):
+    """Test to see if artifact trees are listed, and artifacts streamed, with byte ranges."""
+
+    mock_bamboo_server.add_plan(PLAN_KEY, results_count=3)
+    mock_bamboo_server.add_artifacts(BUILD_KEY, JOB_NAME, ARTIFACT_FILES)
+    bamboo_api_client = get_client(mock_bamboo_server)
+
+    artifacts = dict(bamboo_api_client.iter_job_artifacts(plan_build_key=BUILD_KEY, job_name=JOB_NAME))
+    assert sorted(artifacts) == sorted(ARTIFACT_FILES)
+
+    artifacts_response = bamboo_api_client.query_job_for_artifacts(
+        plan_build_key=BUILD_KEY, job_name=JOB_NAME, artifact_names=("Build-log",)
+    )
+    assert sorted(artifacts_response['artifacts']) == ["build.log", "tests"], artifacts_response
+
+    build_result = bamboo_api_client.query_plan(plan_key=f"{BUILD_KEY}.json?expand=artifacts", raw=False)['content']
+    assert len(build_result.artifacts) == len(ARTIFACT_FILES)
+
+    # Streamed download, and byte ranges
+    path, size = "Build-log/build.log", ARTIFACT_FILES["Build-log/build.log"]
+    destination_file = tmp_path / "build.log"
+
+    http_get_response = bamboo_api_client.get_request(url=artifacts[path], header={'Range': f"bytes={size - 100}-"})
+    assert http_get_response.status_code == 206
+    assert http_get_response.content == get_artifact_content(path, size - 100, size)
+
+    download_response = bamboo_api_client.get_artifact(url=artifacts[path], destination_file=str(destination_file))
+    assert download_response['status_code'] == 200, download_response
+    assert destination_file.stat().st_size == size
+    assert hashlib.sha256(destination_file.read_bytes()).digest() == hashlib.sha256(
+        get_artifact_content(path, 0, size)
+    ).digest()
+
+
+def test_mock_server_faults(mock_bamboo_server):
+    """Test to see if the injected failures reach the client."""
+
+    mock_bamboo_server.add_plan(PLAN_KEY, results_count=3)
+    bamboo_api_client = get_client(mock_bamboo_server, retry_policy=NO_RETRY)
+
+    mock_bamboo_server.throttle_rate = 1.0
+    mock_bamboo_server.retry_after = 7
+    http_get_response = bamboo_api_client.get_request(url=f"{mock_bamboo_server.url}/rest/api/latest/result/{BUILD_KEY}")
+    assert http_get_response.status_code == 429
+    assert http_get_response.headers['Retry-After'] == "7"
+
+    mock_bamboo_server.throttle_rate, mock_bamboo_server.error_rate = 0.0, 0.5
+    status_codes = [bamboo_api_client.query_plan(plan_key=PLAN_KEY)['status_code'] for _ in range(100)]
+    assert set(status_codes) == {200, 500}
+    assert 25 < status_codes.count(500) < 75
+
+    assert mock_bamboo_server.stats[('result', 429)] == 1
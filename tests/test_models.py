@@ -0,0 +1,66 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Module used to test the models built from the JSON documents returned by the Bamboo server."""
+
+import pathlib
+
+from json import load
+
+# Add custom packages
+from bamboo.models import (
+    BuildResult,
+    PlanResult,
+    decode_results
+)
+
+
+# Database of the mock server
+MOCK_DB = pathlib.Path(__file__).resolve().parent / "db.json"
+
+
+def get_live_result() -> dict:
+    """Get the result of a build as returned by a live Bamboo server."""
+
+    with open(MOCK_DB) as json_file:
+        endpoint_data = load(json_file)
+
+    return endpoint_data['query_plan_reference'][0]['results']
+
+
+def test_build_result():
+    """Test to see if the fields of a build result are decoded."""
+
+    build_result = decode_results(get_live_result())
+
+    assert isinstance(build_result, BuildResult), build_result
+    assert build_result.key == "TEST-XYZ-39"
+    assert build_result.plan_key == "TEST-XYZ"
+    assert build_result.build_number == 39
+    assert build_result.finished and not build_result.successful
+    assert build_result.duration == 595
+    assert build_result.started_time.isoformat() == "2020-01-07T18:33:19.315000+01:00"
+    assert build_result.artifacts == ()
+    assert not hasattr(build_result, '__dict__')
+
+
+def test_plan_result():
+    """Test to see if the results of a plan are decoded, artifacts included."""
+
+    result = dict(get_live_result(), artifacts={
+        'size': 1,
+        'artifact': [{'name': "Build-log", 'link': {'href': "https://bamboo.com/log"}, 'producerJobKey': "TEST-XYZ-JOB1-39"}]
+    })
+    plan_result = decode_results({'results': {'size': 2, 'start-index': 0, 'max-result': 2, 'result': [result, result]}})
+
+    assert isinstance(plan_result, PlanResult), plan_result
+    assert plan_result.size == 2 and len(plan_result) == 2
+    assert [build_result.key for build_result in plan_result] == ["TEST-XYZ-39", "TEST-XYZ-39"]
+
+    artifact, = plan_result[0].artifacts
+    assert (artifact.name, artifact.url, artifact.producer_job_key) == (
+        "Build-log", "https://bamboo.com/log", "TEST-XYZ-JOB1-39"
+    )
+
+    # Unknown documents are returned as is
+    assert decode_results({'message': "Not found"}) == {'message': "Not found"}
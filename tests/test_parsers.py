@@ -0,0 +1,61 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Module used to test if the artifact page parsers extract the same links."""
+
+import pathlib
+import pytest
+
+# Add custom packages
+from bamboo.parsers import (
+    BS4_BACKEND,
+    STDLIB_BACKEND,
+    parse_artifact_links
+)
+
+
+# Artifact pages served by the mock server
+MOCK_PAGES_DIR = pathlib.Path(__file__).resolve().parent / "public"
+
+TRICKY_PAGE = """
+<html><body>
+<a name="top">No href</a>
+<a href="/artifact/a%20b.txt">a &amp; b.txt</a>
+<a href="/artifact/nested.txt"><img src="/icon.gif"/><b>nested</b>.txt</a>
+<a href="">empty href</a>
+<A HREF="/artifact/UPPER.TXT">UPPER.TXT</A>
+<a href="/">Site homepage</a>
+</body></html>
+"""
+
+
+@pytest.mark.parametrize("page_path", sorted(MOCK_PAGES_DIR.glob("**/*.html")), ids=lambda path: path.name)
+def test_parsers_mock_pages(page_path):
+    """Test to see if both parser backends extract the same links from the mock server artifact pages."""
+
+    page = page_path.read_text()
+    links = parse_artifact_links(page=page, backend=STDLIB_BACKEND)
+
+    assert links == parse_artifact_links(page=page, backend=BS4_BACKEND)
+    assert len(links) != 0
+
+
+def test_parsers_tricky_page():
+    """Test to see if both parser backends deal in the same way with entities, nested tags and missing hrefs."""
+
+    links = parse_artifact_links(page=TRICKY_PAGE, backend=STDLIB_BACKEND)
+
+    assert links == parse_artifact_links(page=TRICKY_PAGE, backend=BS4_BACKEND)
+    assert links == [
+        ("a & b.txt", "/artifact/a%20b.txt"),
+        ("nested.txt", "/artifact/nested.txt"),
+        ("empty href", ""),
+        ("UPPER.TXT", "/artifact/UPPER.TXT")
+    ]
+
+
+@pytest.mark.xfail(strict=True, raises=ValueError, reason="The parser backend does not exist")
+def test_parsers_unknown_backend():
+    """Test to see if an unknown parser backend is refused."""
+
+    parse_artifact_links(page=TRICKY_PAGE, backend="lxml")
@@ -41,6 +41,59 @@ def test_query_for_artifacts_ok(test_app):
     assert len(artifacts) != 0, artifacts
 
 
+def test_query_for_artifacts_models(test_app):
+    """Test to see if the artifacts can be returned as models."""
+
+    bamboo_api_client = test_app.get('bamboo_api_tests').bamboo_api_client
+    if test_app.get('test_type') != "MOCK":
+        pytest.skip("Artifact names are only known for the mock server")
+
+    query_for_artifacts = bamboo_api_client.query_job_for_artifacts(
+        plan_build_key="TEST-123", job_name="RESULT", artifact_names=("Build-log",)
+    )
+    query_for_artifact_models = bamboo_api_client.query_job_for_artifacts(
+        plan_build_key="TEST-123", job_name="RESULT", artifact_names=("Build-log",), raw=False
+    )
+
+    assert query_for_artifact_models.get('status_code') == 200, query_for_artifact_models
+    assert {
+        artifact.name: artifact.url for artifact in query_for_artifact_models.get('artifacts')
+    } == query_for_artifacts.get('artifacts')
+
+
+def test_query_for_artifacts_concurrent(test_app):
+    """Test to see if querying several artifacts at the same time gives the same result as querying them in turn."""
+
+    bamboo_api_client = test_app.get('bamboo_api_tests').bamboo_api_client
+    plan_build_key = test_app.get('plan_keys', {}).get('build_key', '')
+    test_type = test_app.get('test_type')
+
+    if test_type == "MOCK":
+        plan_build_key = "TEST-123"
+        job_name = "RESULT"
+        artifact_names = ("Build-log", "Test-log", "Coverage-log", "Package-log")
+    else:
+        plan_build_key = plan_build_key
+        job_name = ""
+        artifact_names = ("",)
+
+    query_for_artifacts_in_turn = bamboo_api_client.query_job_for_artifacts(
+        plan_build_key=plan_build_key,
+        job_name=job_name,
+        artifact_names=artifact_names
+    )
+    query_for_artifacts_concurrent = bamboo_api_client.query_job_for_artifacts(
+        plan_build_key=plan_build_key,
+        job_name=job_name,
+        artifact_names=artifact_names,
+        max_workers=4
+    )
+
+    # Check if the API got a HTTP 200 response code
+    assert query_for_artifacts_concurrent.get('status_code') == 200, query_for_artifacts_concurrent
+    assert query_for_artifacts_concurrent == query_for_artifacts_in_turn
+
+
 @pytest.mark.xfail(strict=True, reason="The test is expected to fail as the URL is not valid")
 def test_query_for_artifacts_fail(test_app):
     """Test to see if the query for artifacts of a build run fails as expected."""
@@ -6,6 +6,9 @@
 import pytest
 from json import load
 
+# Add custom packages
+from bamboo.models import BuildResult
+
 
 INVALID_BUILD_PLAN_KEY = "TEST-XXX-YZ"
 
@@ -48,6 +51,21 @@ def test_query_plan_run_ok(test_app):
     assert len(missing_items) == 0, f"Items that differ between API call response and reference dict: {missing_items}"
 
 
+def test_query_plan_models(test_app):
+    """Test to see if the results of a build can be returned as a model."""
+
+    bamboo_api_client = test_app.get('bamboo_api_tests').bamboo_api_client
+    if test_app.get('test_type') != "MOCK":
+        pytest.skip("Build keys are only known for the mock server")
+
+    query_plan = bamboo_api_client.query_plan(plan_key="TEST-124", raw=False)
+    assert query_plan.get('status_code') == 200, query_plan
+
+    build_result = query_plan.get('content')
+    assert isinstance(build_result, BuildResult), build_result
+    assert build_result.key == "TEST-124" and build_result.finished and build_result.successful, build_result
+
+
 @pytest.mark.xfail(strict=True, reason="The test is expected to fail as the URL is not valid")
 def test_query_plan_run_fail(test_app):
     """Test to see if we fail to trigger a successful Bamboo plan build."""
@@ -0,0 +1,147 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Module used to test the response cache of the API client."""
+
+import json
+import time
+
+import pytest
+
+# Add custom packages
+from bamboo.cache import (
+    CacheEntry,
+    DiskCache,
+    MemoryCache
+)
+
+
+def get_cache(cache_type: str, tmp_path, **kwargs):
+    """Get a cache of the requested type."""
+    if cache_type == "disk":
+        return DiskCache(directory=str(tmp_path / "cache"), **kwargs)
+
+    return MemoryCache(**kwargs)
+
+
+@pytest.mark.parametrize("cache_type", ["memory", "disk"])
+def test_response_cache_conditional_get(test_app, tmp_path, cache_type):
+    """Test to see if revalidated responses are served from the cache, without being parsed again if held in memory."""
+
+    bamboo_api_client = test_app.get('bamboo_api_tests').bamboo_api_client
+    plan_key = test_app.get('plan_keys', {}).get('build_key', '')
+
+    url = bamboo_api_client.get_plan_results_url(server_url=bamboo_api_client.server_url, plan_key=plan_key)
+    parsed_responses = list()
+
+    def parser(response):
+        parsed_responses.append(response)
+        return bamboo_api_client.decode_json_response(response)
+
+    bamboo_api_client.response_cache = get_cache(cache_type, tmp_path)
+    try:
+        status_code, content, http_get_response = bamboo_api_client.get_parsed_request(parser=parser, url=url)
+        assert status_code == 200, http_get_response.text
+
+        status_code, cached_content, http_get_response = bamboo_api_client.get_parsed_request(parser=parser, url=url)
+        assert status_code == 200, http_get_response.text
+        assert http_get_response.status_code == 304
+        assert cached_content == content
+        # The disk cache holds the raw response, parsed again
+        parse_count = 1 if cache_type == "memory" else 2
+        assert len(parsed_responses) == parse_count
+
+        # The public API goes through the cache as well
+        query_plan = bamboo_api_client.query_plan(plan_key=plan_key)
+        assert query_plan.get('status_code') == 200, query_plan
+        assert query_plan.get('content') == content
+        assert len(parsed_responses) == parse_count
+
+        # Other forms of the parsed content are cached apart
+        query_plan = bamboo_api_client.query_plan(plan_key=plan_key, fields={'buildNumber', 'buildState'})
+        assert query_plan.get('status_code') == 200, query_plan
+        assert query_plan.get('content') != content
+        assert bamboo_api_client.query_plan(plan_key=plan_key).get('content') == content
+    finally:
+        bamboo_api_client.response_cache = None
+
+
+@pytest.mark.parametrize("cache_type", ["memory", "disk"])
+def test_response_cache_eviction(tmp_path, cache_type):
+    """Test to see if the least recently used and the expired entries are evicted."""
+
+    # Room for 3 entries: 750 bytes of body take about 1100 bytes on disk, once encoded
+    cache = get_cache(cache_type, tmp_path, max_size=3500)
+    for key in ("a", "b", "c"):
+        cache.set(key, CacheEntry(etag=f'"{key}"', content=key * 1000, size=1000, body=key.encode() * 750))
+
+    # "a" becomes the most recently used entry
+    assert cache.get("a").etag == '"a"'
+
+    cache.set("d", CacheEntry(etag='"d"', content="d" * 1000, size=1000, body=b"d" * 750))
+    assert cache.size <= 3500
+    assert len(cache) == 3
+    assert cache.get("d").etag == '"d"'
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.get("b") is None
+
+    expiring_cache = get_cache(cache_type, tmp_path / "expiring", ttl=-1)
+    expiring_cache.set("a", CacheEntry(etag='"a"', content="a", body=b"a"))
+    assert expiring_cache.get("a") is None
+
+
+@pytest.mark.parametrize("cache_type", ["memory", "disk"])
+def test_response_cache_revalidated(test_app, tmp_path, cache_type):
+    """Test to see if an entry confirmed by the server (HTTP 304) is fresh again."""
+
+    bamboo_api_client = test_app.get('bamboo_api_tests').bamboo_api_client
+    plan_key = test_app.get('plan_keys', {}).get('build_key', '')
+
+    url = bamboo_api_client.get_plan_results_url(server_url=bamboo_api_client.server_url, plan_key=plan_key)
+    cache_key = f"{bamboo_api_client.username}@{url}"
+
+    bamboo_api_client.response_cache = cache = get_cache(cache_type, tmp_path, ttl=60)
+    try:
+        status_code, content, _ = bamboo_api_client.get_parsed_request(
+            parser=bamboo_api_client.decode_json_response, url=url
+        )
+        assert status_code == 200
+
+        # Stored 30 seconds ago
+        entry = cache.get(cache_key)
+        entry.stored_at -= 30
+        cache.set(cache_key, entry)
+        revalidation_time = time.time()
+
+        status_code, cached_content, http_get_response = bamboo_api_client.get_parsed_request(
+            parser=bamboo_api_client.decode_json_response, url=url
+        )
+        assert http_get_response.status_code == 304
+        assert cached_content == content
+        assert cache.get(cache_key).stored_at >= revalidation_time
+    finally:
+        bamboo_api_client.response_cache = None
+
+
+def test_disk_cache_format(tmp_path):
+    """Test to see if the disk cache stores the raw responses as JSON, and drops the unreadable entries."""
+
+    cache = get_cache("disk", tmp_path)
+    cache.set("a", CacheEntry(
+        etag='"a"', content={'key': "value"}, size=16, headers={'Content-Type': "application/json"},
+        body=b'{"key": "value"}'
+    ))
+
+    cache_file, = cache.directory.iterdir()
+    assert json.loads(cache_file.read_text())['headers'] == {'Content-Type': "application/json"}
+    entry = cache.get("a")
+    assert (entry.status_code, entry.body, entry.content) == (200, b'{"key": "value"}', None)
+
+    # Entries that cannot be served again are not stored
+    cache.set("b", CacheEntry(etag='"b"', content="b"))
+    assert cache.get("b") is None
+
+    cache_file.write_bytes(b"\x80\x04not JSON")
+    assert cache.get("a") is None
+    assert len(cache) == 0
@@ -0,0 +1,165 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Module used to test the retry policies of the requests."""
+
+import time
+
+import pytest
+
+# Add custom packages
+from bamboo import BambooAPIClient, RetryBudget, RetryPolicy
+from bamboo.exceptions import HTTPErrorException
+from bamboo.requests_utils import RETRY_STRATEGY
+from bamboo.retry import NO_RETRY
+
+
+# Fast retries, so the tests do not wait
+FAST_RETRY_POLICY_VALUES = {'total': 3, 'backoff_factor': 0.01}
+
+
+def get_client(server, **kwargs) -> BambooAPIClient:
+    """Get a client of the scripted server."""
+
+    bamboo_api_client = BambooAPIClient(server_url=server.url, **kwargs)
+    bamboo_api_client.is_auth_enabled = False
+    return bamboo_api_client
+
+
+def test_retry_policy_decisions():
+    """Test to see if only the transient errors of the idempotent requests are retried."""
+
+    retry_policy = RetryPolicy(total=2)
+
+    assert retry_policy.get_retry_delay("GET", 1, status_code=503) is not None
+    assert retry_policy.get_retry_delay("GET", 3, status_code=503) is None
+    assert retry_policy.get_retry_delay("GET", 1, status_code=404) is None
+    # POST requests are retried only if they never reached the server, or flagged as idempotent
+    assert retry_policy.get_retry_delay("POST", 1, status_code=503) is None
+    assert retry_policy.get_retry_delay("POST", 1, status_code=503, idempotent=True) is not None
+    assert retry_policy.get_retry_delay("POST", 1, is_request_sent=True) is None
+    assert retry_policy.get_retry_delay("POST", 1, is_request_sent=False) is not None
+    # Backoff with jitter, capped
+    assert 0.25 <= retry_policy.get_delay(1) <= 0.5
+    assert 5 <= RetryPolicy(max_backoff=10).get_delay(10) <= 10
+
+
+def test_retry_strategy_methods():
+    """Test to see if the default urllib3 retry strategy retries the idempotent methods only, whatever its version."""
+
+    assert RETRY_STRATEGY.is_retry("GET", 503)
+    assert RETRY_STRATEGY.is_retry("HEAD", 503)
+    assert not RETRY_STRATEGY.is_retry("POST", 503)
+
+
+def test_retry_after():
+    """Test to see if the delay asked for by the server is honored, within limits."""
+
+    retry_policy = RetryPolicy(max_retry_after=30)
+
+    assert retry_policy.get_delay(1, headers={'Retry-After': "12"}) == 12
+    assert retry_policy.get_delay(1, headers={'Retry-After': "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0
+    assert retry_policy.get_delay(1, headers={'Retry-After': "120"}) is None
+    assert 0.25 <= retry_policy.get_delay(1, headers={'Retry-After': "soon"}) <= 0.5
+    assert 0.25 <= RetryPolicy(respect_retry_after=False).get_delay(1, headers={'Retry-After': "12"}) <= 0.5
+
+
+def test_retry_budget():
+    """Test to see if the retries are capped by the budget, refilled by the requests."""
+
+    retry_budget = RetryBudget(ratio=0.5, max_tokens=2)
+    retry_policy = RetryPolicy(budget=retry_budget)
+
+    assert retry_policy.get_retry_delay("GET", 1, status_code=503) is not None
+    assert retry_policy.get_retry_delay("GET", 1, status_code=503) is not None
+    assert retry_policy.get_retry_delay("GET", 1, status_code=503) is None
+
+    retry_policy.record_request()
+    retry_policy.record_request()
+    assert retry_budget.tokens == 1
+    assert retry_policy.get_retry_delay("GET", 1, status_code=503) is not None
+
+    with pytest.raises(ValueError):
+        RetryBudget(ratio=-1)
+
+
+def test_get_request_retried(scripted_server):
+    """Test to see if a GET request is retried on transient errors, honoring 'Retry-After'."""
+
+    bamboo_api_client = get_client(scripted_server, retry_policy=RetryPolicy(**FAST_RETRY_POLICY_VALUES))
+    scripted_server.script.extend([(503, {'Retry-After': "1"}), (502, {})])
+
+    start_time = time.monotonic()
+    response = bamboo_api_client.get_request(url=f"{bamboo_api_client.server_url}/rest/api/latest/plan/")
+
+    assert response.status_code == 200
+    assert scripted_server.requests == ["GET"] * 3
+    assert time.monotonic() - start_time >= 1
+
+    # Last response returned once the retries are over
+    scripted_server.script.extend([(500, {})] * 5)
+    response = bamboo_api_client.get_request(url=f"{bamboo_api_client.server_url}/rest/api/latest/plan/")
+    assert response.status_code == 500
+    assert len(scripted_server.requests) == 3 + 4
+
+
+def test_post_request_retried_if_idempotent(scripted_server):
+    """Test to see if a POST request is retried only when flagged as idempotent."""
+
+    bamboo_api_client = get_client(scripted_server, retry_policy=RetryPolicy(**FAST_RETRY_POLICY_VALUES))
+    url = f"{bamboo_api_client.server_url}/rest/api/latest/queue/TEST-XYZ"
+
+    scripted_server.script.append((503, {}))
+    assert bamboo_api_client.post_request(url=url).status_code == 503
+    assert scripted_server.requests == ["POST"]
+
+    scripted_server.script.append((503, {}))
+    assert bamboo_api_client.post_request(url=url, idempotent=True).status_code == 200
+    assert scripted_server.requests == ["POST"] * 3
+
+
+def test_retry_policy_per_method_and_request(scripted_server):
+    """Test to see if the retry policies set per method and per request override the one of the client."""
+
+    bamboo_api_client = get_client(
+        scripted_server,
+        retry_policy=RetryPolicy(**FAST_RETRY_POLICY_VALUES),
+        method_retry_policies={'get': NO_RETRY}
+    )
+    url = f"{bamboo_api_client.server_url}/rest/api/latest/plan/"
+    assert bamboo_api_client.get_retry_policy("GET") is NO_RETRY
+
+    scripted_server.script.append((503, {}))
+    assert bamboo_api_client.get_request(url=url).status_code == 503
+
+    scripted_server.script.append((503, {}))
+    retry_policy = RetryPolicy(**FAST_RETRY_POLICY_VALUES)
+    assert bamboo_api_client.get_request(url=url, retry_policy=retry_policy).status_code == 200
+    assert len(scripted_server.requests) == 3
+
+
+def test_retry_budget_caps_retry_storm(scripted_server):
+    """Test to see if a server failing every request gets few retries once the budget is spent."""
+
+    retry_policy = RetryPolicy(budget=RetryBudget(ratio=0.25, max_tokens=2), **FAST_RETRY_POLICY_VALUES)
+    bamboo_api_client = get_client(scripted_server, retry_policy=retry_policy)
+    url = f"{bamboo_api_client.server_url}/rest/api/latest/plan/"
+
+    scripted_server.script.extend([(503, {})] * 100)
+    for _ in range(20):
+        assert bamboo_api_client.get_request(url=url).status_code == 503
+
+    # 20 requests, 2 saved up retries and 1 retry per 4 requests, instead of 3 retries per request
+    assert len(scripted_server.requests) == 20 + 2 + 4
+
+
+def test_connection_refused_not_sent():
+    """Test to see if a request failing to connect is known not to have reached the server."""
+
+    bamboo_api_client = BambooAPIClient(server_url="http://localhost:1", retry_policy=NO_RETRY)
+    bamboo_api_client.is_auth_enabled = False
+
+    with pytest.raises(HTTPErrorException) as exception_info:
+        bamboo_api_client.post_request(url="http://localhost:1/rest/api/latest/queue/TEST-XYZ")
+
+    assert exception_info.value.is_request_sent is False
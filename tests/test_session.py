@@ -0,0 +1,66 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Module used to test the HTTP session and connection pools owned by the API client."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+# Add custom packages
+from bamboo import BambooAPIClient
+
+
+def get_client(bamboo_api_client, **kwargs) -> BambooAPIClient:
+    """Get a new client talking to the same server as <bamboo_api_client>, with the same credentials."""
+
+    new_bamboo_api_client = BambooAPIClient(
+        server_url=bamboo_api_client.server_url,
+        username=bamboo_api_client.username,
+        password=bamboo_api_client.password,
+        **kwargs
+    )
+    new_bamboo_api_client.is_auth_enabled = bamboo_api_client.is_auth_enabled
+
+    return new_bamboo_api_client
+
+
+def test_session_connection_reuse(test_app):
+    """Test to see if the requests of a client reuse its keep-alive connections."""
+
+    bamboo_api_client = test_app.get('bamboo_api_tests').bamboo_api_client
+    plan_key = test_app.get('plan_keys', {}).get('build_key', '')
+
+    with get_client(bamboo_api_client) as new_bamboo_api_client:
+        assert new_bamboo_api_client.pool_stats == {}
+
+        for _ in range(5):
+            query_plan = new_bamboo_api_client.query_plan(plan_key=plan_key)
+            assert query_plan.get('status_code') == 200, query_plan
+
+        pool_stats = list(new_bamboo_api_client.pool_stats.values())
+        assert len(pool_stats) == 1, pool_stats
+        assert pool_stats[0]['requests'] == 5, pool_stats
+        assert pool_stats[0]['new_connections'] == 1, pool_stats
+        assert pool_stats[0]['reused_connections'] == 4, pool_stats
+
+        # Each client owns its session
+        assert new_bamboo_api_client.session is not bamboo_api_client.session
+
+    # The session is closed when leaving the context
+    assert new_bamboo_api_client.pool_stats == {}
+
+
+def test_session_blocking_pool(test_app):
+    """Test to see if a blocking pool never opens more connections than its size, whatever the number of threads."""
+
+    bamboo_api_client = test_app.get('bamboo_api_tests').bamboo_api_client
+    plan_key = test_app.get('plan_keys', {}).get('build_key', '')
+
+    with get_client(bamboo_api_client, pool_maxsize=2, pool_block=True) as new_bamboo_api_client:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            query_plans = list(executor.map(lambda _: new_bamboo_api_client.query_plan(plan_key=plan_key), range(16)))
+
+        assert all(query_plan.get('status_code') == 200 for query_plan in query_plans), query_plans
+
+        pool_stats = list(new_bamboo_api_client.pool_stats.values())
+        assert pool_stats[0]['requests'] == 16, pool_stats
+        assert pool_stats[0]['new_connections'] <= 2, pool_stats
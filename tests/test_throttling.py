@@ -0,0 +1,160 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Module used to test the rate limiter and concurrency governor of the requests."""
+
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+# Add custom packages
+from bamboo import BambooAPIClient, RequestGovernor
+from bamboo.retry import NO_RETRY
+from bamboo.throttling import FileSemaphore, FileTokenBucket, ServerLimiter, TokenBucket
+
+
+def get_client(server, request_governor: RequestGovernor) -> BambooAPIClient:
+    """Get a client of the scripted server, without retries."""
+
+    bamboo_api_client = BambooAPIClient(
+        server_url=server.url, request_governor=request_governor, retry_policy=NO_RETRY
+    )
+    bamboo_api_client.is_auth_enabled = False
+    return bamboo_api_client
+
+
+def test_adaptive_rate():
+    """Test to see if the rate is divided on HTTP 429/503 responses, then grows back while the server recovers."""
+
+    server_limiter = ServerLimiter(rate=10, min_rate=2)
+
+    server_limiter.record_status(429)
+    assert server_limiter.rate == 5
+    # Responses to the requests sent at the former rate do not divide it again
+    server_limiter.record_status(503)
+    assert server_limiter.rate == 5
+    # Other server errors do not tell about the load
+    server_limiter.record_status(500)
+    assert server_limiter.rate == 5
+
+    time.sleep(0.3)
+    server_limiter.record_status(200)
+    assert 5 < server_limiter.rate < 5.5, server_limiter.rate
+
+    assert ServerLimiter(rate=10, adaptive=False).rate == 10
+    assert ServerLimiter(max_concurrency=2).rate is None
+
+
+def test_file_token_bucket_shared(tmp_path):
+    """Test to see if the tokens and the rate of a file token bucket are shared by all its instances."""
+
+    first_bucket = FileTokenBucket(path=str(tmp_path / "bucket"), rate=10, capacity=2)
+    second_bucket = FileTokenBucket(path=str(tmp_path / "bucket"), rate=10, capacity=2)
+
+    assert first_bucket.consume() == 0
+    assert second_bucket.consume() == 0
+    # Bucket emptied by the other instance
+    assert first_bucket.consume() > 0.05
+
+    second_bucket.rate = 4
+    assert first_bucket.rate == 4
+
+
+def test_file_semaphore_shared(tmp_path):
+    """Test to see if the slots of a file semaphore are shared by all its instances."""
+
+    first_semaphore = FileSemaphore(path=str(tmp_path / "slots"), value=1)
+    second_semaphore = FileSemaphore(path=str(tmp_path / "slots"), value=1)
+    acquired = threading.Event()
+
+    def hold_slot():
+        with second_semaphore.slot():
+            acquired.set()
+
+    with first_semaphore.slot():
+        thread = threading.Thread(target=hold_slot)
+        thread.start()
+        assert not acquired.wait(timeout=0.2)
+
+    thread.join(timeout=5)
+    assert acquired.is_set()
+
+
+def test_request_concurrency_limited(scripted_server):
+    """Test to see if the number of requests in flight to a server is capped."""
+
+    scripted_server.delay = 0.1
+    bamboo_api_client = get_client(scripted_server, RequestGovernor(max_concurrency=2))
+    url = f"{scripted_server.url}/rest/api/latest/plan/"
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        status_codes = list(executor.map(lambda _: bamboo_api_client.get_request(url=url).status_code, range(6)))
+
+    assert status_codes == [200] * 6
+    assert scripted_server.max_in_flight == 2
+
+
+def test_request_slot_held_while_streamed(mock_bamboo_server, tmp_path):
+    """Test to see if the request slot of a streamed response is held until its body was read."""
+
+    mock_bamboo_server.add_artifacts("PROJ-PLAN-1", "JOB1", {"build.log": 1024 * 1024})
+    bamboo_api_client = get_client(mock_bamboo_server, RequestGovernor(max_concurrency=1))
+    url = f"{mock_bamboo_server.url}/browse/PROJ-PLAN-1/artifact/JOB1/build.log"
+    destination_file = tmp_path / "build.log"
+
+    # Slow body: streamed at 2 MiB/s, i.e. for 0.5s after the headers were received
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        download = executor.submit(
+            bamboo_api_client.get_artifact,
+            url=url,
+            destination_file=str(destination_file),
+            chunk_size=64 * 1024,
+            bandwidth_limiter=TokenBucket(rate=2 * 1024 * 1024, capacity=64 * 1024)
+        )
+        time.sleep(0.1)
+
+        start_time = time.monotonic()
+        response = bamboo_api_client.get_request(url=url, stream=True)
+        assert time.monotonic() - start_time >= 0.3
+        assert destination_file.stat().st_size == 1024 * 1024
+        assert download.result()['status_code'] == 200
+
+    # Released once closed
+    response.close()
+    assert bamboo_api_client.get_request(url=url).status_code == 200
+
+
+def test_request_rate_limited_per_server(scripted_server):
+    """Test to see if the request rate is set per server, and slowed down by an overloaded server."""
+
+    request_governor = RequestGovernor(rate=1000, server_limits={scripted_server.url: {'rate': 20}})
+    bamboo_api_client = get_client(scripted_server, request_governor)
+    url = f"{scripted_server.url}/rest/api/latest/plan/"
+
+    start_time = time.monotonic()
+    for _ in range(5):
+        bamboo_api_client.get_request(url=url)
+    assert time.monotonic() - start_time >= 4 / 20
+
+    scripted_server.script.append((429, {}))
+    assert bamboo_api_client.post_request(url=url).status_code == 429
+    assert request_governor.get_limiter(url).rate == 10
+    assert request_governor.get_limiter("http://other-bamboo:8085").rate == 1000
+
+
+def test_request_limits_shared(scripted_server, tmp_path):
+    """Test to see if the clients of a lock directory share the limits of a server."""
+
+    clients = [
+        get_client(scripted_server, RequestGovernor(rate=20, adaptive=False, lock_dir=str(tmp_path)))
+        for _ in range(2)
+    ]
+    url = f"{scripted_server.url}/rest/api/latest/plan/"
+
+    start_time = time.monotonic()
+    for _ in range(3):
+        for bamboo_api_client in clients:
+            bamboo_api_client.get_request(url=url)
+
+    assert time.monotonic() - start_time >= 5 / 20
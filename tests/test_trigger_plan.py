@@ -44,6 +44,33 @@ def test_trigger_plan_run_ok(test_app):
     assert len(missing_items) == 0, f"Items that differ between API call response and reference dict: {missing_items}"
 
 
+def test_trigger_plan_builds(test_app):
+    """Test to see if we can trigger several Bamboo plan builds at once, with per-plan results."""
+
+    bamboo_api_client = test_app.get('bamboo_api_tests').bamboo_api_client
+    plan_key = test_app.get('plan_keys', {}).get('plan_key', '')
+
+    trigger_plans = bamboo_api_client.trigger_plan_builds(
+        plans=[(plan_key, (True, {})), (INVALID_BUILD_PLAN_KEY, None)],
+        max_in_flight=2,
+        max_rate=20
+    )
+
+    assert trigger_plans.keys() == {plan_key, INVALID_BUILD_PLAN_KEY}, trigger_plans
+    assert trigger_plans[plan_key].get('status_code') == 200, trigger_plans
+    assert trigger_plans[INVALID_BUILD_PLAN_KEY].get('status_code') != 200, trigger_plans
+
+    # Every plan must be listed once
+    trigger_plans = bamboo_api_client.trigger_plan_builds(plans=[(plan_key, None), (plan_key, None)])
+    assert trigger_plans == {'content': "Incorrect input provided!"}
+
+    # Limits must be positive numbers
+    for limits in ({'max_in_flight': 0}, {'max_in_flight': "2"}, {'max_in_flight': True}, {'max_rate': 0},
+                   {'max_rate': -1.5}, {'max_rate': "20"}):
+        trigger_plans = bamboo_api_client.trigger_plan_builds(plans=[(plan_key, None)], **limits)
+        assert trigger_plans == {'content': "Incorrect input provided!"}, limits
+
+
 @pytest.mark.xfail(strict=True, reason="The test is expected to fail as the URL is not valid")
 def test_trigger_plan_run_fail(test_app):
     """Test to see if we fail to trigger a successful Bamboo plan build."""
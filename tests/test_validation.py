@@ -0,0 +1,66 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Module used to test the validation of the mandatory inputs of the API methods."""
+
+import asyncio
+
+# Add custom packages
+from bamboo.validation import Validation
+
+
+class Client:
+    """API client with validated methods, doing nothing."""
+
+    server_url = None
+
+    @Validation.check_input
+    def query_plan(self, server_url: str = None, plan_key: str = None, raw: bool = True) -> str:
+        return plan_key
+
+    @Validation.check_input
+    def stop_build(self, server_url: str = "http://bamboo:8085", plan_build_key: str = None) -> str:
+        return plan_build_key
+
+    @Validation.check_input
+    async def query_job_for_artifacts(self, server_url: str = None, plan_build_key: str = None) -> str:
+        return plan_build_key
+
+
+def test_check_input_arguments():
+    """Test to see if the arguments are read whether passed by position, by keyword or left to their default."""
+
+    client = Client()
+    no_server_error = {'content': "Error in <query_plan> method: No Bamboo server supplied!"}
+    no_key_error = {'content': "Error in <query_plan> method: No Bamboo plan/build build key supplied!"}
+
+    assert client.query_plan("http://bamboo:8085", "PROJ-PLAN") == "PROJ-PLAN"
+    assert client.query_plan(server_url="http://bamboo:8085", plan_key="PROJ-PLAN") == "PROJ-PLAN"
+    assert client.query_plan("http://bamboo:8085", plan_key="PROJ-PLAN", raw=False) == "PROJ-PLAN"
+    assert client.query_plan(plan_key="PROJ-PLAN") == no_server_error
+    assert client.query_plan("http://bamboo:8085") == no_key_error
+    assert Client.query_plan(client, "http://bamboo:8085", "") == no_key_error
+
+    client.server_url = "http://bamboo:8085"
+    assert client.query_plan(plan_key="PROJ-PLAN") == "PROJ-PLAN"
+    # Server URL set by default
+    assert Client().stop_build(plan_build_key="PROJ-PLAN-1") == "PROJ-PLAN-1"
+
+    assert asyncio.run(client.query_job_for_artifacts(plan_build_key="PROJ-PLAN-1")) == "PROJ-PLAN-1"
+    assert asyncio.run(client.query_job_for_artifacts()) == {
+        'content': "Error in <query_job_for_artifacts> method: No Bamboo plan/build build key supplied!"
+    }
+
+
+def test_check_input_disabled():
+    """Test to see if the inputs are not validated within <Validation.disabled>, in the current thread only."""
+
+    client = Client()
+
+    with Validation.disabled():
+        assert client.query_plan(plan_key="PROJ-PLAN") == "PROJ-PLAN"
+        assert asyncio.run(client.query_job_for_artifacts(plan_build_key="PROJ-PLAN-1")) == "PROJ-PLAN-1"
+
+    assert client.query_plan(plan_key="PROJ-PLAN") == {
+        'content': "Error in <query_plan> method: No Bamboo server supplied!"
+    }
@@ -0,0 +1,66 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Module used to test if the API can wait for plan builds to finish."""
+
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+# Add custom packages
+from bamboo import BambooAPIClient
+
+
+FINISHED_BUILD_KEY = "TEST-124"
+RUNNING_BUILD_KEY = "TEST-125"
+
+
+def test_wait_for_build_finished(test_app):
+    """Test to see if waiting for a finished build returns its result at once."""
+
+    bamboo_api_client = test_app.get('bamboo_api_tests').bamboo_api_client
+
+    build_result = bamboo_api_client.wait_for_build(plan_build_key=FINISHED_BUILD_KEY, timeout=10)
+
+    assert build_result.get('status_code') == 200, build_result
+    assert build_result['content']['lifeCycleState'] == "Finished", build_result
+
+
+def test_wait_for_builds_timeout(test_app):
+    """Test to see if the builds not finished in time are reported, without delaying the finished ones."""
+
+    bamboo_api_client = test_app.get('bamboo_api_tests').bamboo_api_client
+
+    start_time = time.monotonic()
+    build_results = bamboo_api_client.wait_for_builds(
+        plan_build_keys=[RUNNING_BUILD_KEY, FINISHED_BUILD_KEY], timeout=1, min_interval=0.1, max_interval=0.4
+    )
+    elapsed_time = time.monotonic() - start_time
+
+    assert list(build_results) == [RUNNING_BUILD_KEY, FINISHED_BUILD_KEY], build_results
+    assert build_results[FINISHED_BUILD_KEY].get('status_code') == 200, build_results
+    assert build_results[RUNNING_BUILD_KEY].get('response') is False, build_results
+    assert 1 <= elapsed_time < 3, elapsed_time
+
+
+
+def test_wait_for_build_polls_coalesced(scripted_server):
+    """Test to see if the waiters of the same build share every poll, request coalescing disabled."""
+
+    # Polls last longer than the interval between them: the polls of every round overlap
+    scripted_server.delay = 0.2
+    bamboo_api_client = BambooAPIClient(server_url=scripted_server.url)
+    bamboo_api_client.is_auth_enabled = False
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        build_results = list(executor.map(
+            lambda _: bamboo_api_client.wait_for_build(
+                plan_build_key=RUNNING_BUILD_KEY, timeout=1, min_interval=0.01, max_interval=0.01
+            ),
+            range(4)
+        ))
+
+    assert all(build_result.get('response') is False for build_result in build_results), build_results
+    # One request per poll round
+    assert scripted_server.max_in_flight == 1
+    assert 2 <= len(scripted_server.requests) <= 6, scripted_server.requests
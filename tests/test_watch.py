@@ -0,0 +1,138 @@
+#!/usr/bin/python -tt
+# -*- coding: utf-8 -*-
+
+"""Module used to test the build events computed from successive snapshots of plan results, and the plan watchers."""
+
+import asyncio
+import pytest
+
+# Add custom packages
+from bamboo import AsyncBambooAPIClient, BambooAPIClient
+from bamboo.watch import (
+    ARTIFACTS_PUBLISHED,
+    BUILD_FINISHED,
+    BUILD_STARTED,
+    STATE_CHANGED,
+    BuildWatcher
+)
+
+
+PLAN_KEY = "TEST-PLAN"
+
+
+def get_result(build_number: int, life_cycle_state: str, build_state: str = "Unknown", artifacts: tuple = ()) -> dict:
+    """Get a plan result as listed by Bamboo."""
+    return {
+        'buildResultKey': f"{PLAN_KEY}-{build_number}",
+        'buildNumber': build_number,
+        'lifeCycleState': life_cycle_state,
+        'buildState': build_state,
+        'artifacts': {'size': len(artifacts), 'artifact': [{'name': artifact} for artifact in artifacts]}
+    }
+
+
+def get_events(build_events: list) -> list:
+    """Get the (event, build number) pairs of build events."""
+    return [(build_event['event'], build_event['build_number']) for build_event in build_events]
+
+
+def test_build_watcher_changes():
+    """Test to see if only the changes between snapshots are reported."""
+
+    build_watcher = BuildWatcher()
+
+    # The first snapshot is the reference
+    assert build_watcher.update(PLAN_KEY, [get_result(1, "Finished", "Successful")]) == []
+    assert build_watcher.update(PLAN_KEY, [get_result(1, "Finished", "Successful")]) == []
+
+    build_events = build_watcher.update(PLAN_KEY, [get_result(2, "Queued"), get_result(1, "Finished", "Successful")])
+    assert get_events(build_events) == [(BUILD_STARTED, 2)]
+
+    build_events = build_watcher.update(
+        PLAN_KEY, [get_result(2, "InProgress", artifacts=("log",)), get_result(1, "Finished", "Successful")]
+    )
+    assert get_events(build_events) == [(STATE_CHANGED, 2), (ARTIFACTS_PUBLISHED, 2)]
+    assert build_events[0]['previous_life_cycle_state'] == "Queued"
+    assert build_events[1]['artifacts'] == ["log"]
+
+    build_events = build_watcher.update(
+        PLAN_KEY, [get_result(2, "Finished", "Failed", artifacts=("log", "report")), get_result(1, "Finished")]
+    )
+    assert get_events(build_events) == [(STATE_CHANGED, 1), (STATE_CHANGED, 2), (BUILD_FINISHED, 2),
+                                         (ARTIFACTS_PUBLISHED, 2)]
+    assert build_events[3]['artifacts'] == ["report"]
+
+
+def test_build_watcher_emit_initial():
+    """Test to see if the builds of the first snapshot can be reported, oldest first."""
+
+    build_watcher = BuildWatcher(emit_initial=True)
+
+    build_events = build_watcher.update(PLAN_KEY, [get_result(2, "InProgress"), get_result(1, "Finished")])
+    assert get_events(build_events) == [(BUILD_STARTED, 1), (BUILD_FINISHED, 1), (BUILD_STARTED, 2)]
+
+    # Plans are tracked independently
+    assert get_events(build_watcher.update("OTHER-PLAN", [get_result(7, "Queued")])) == [(BUILD_STARTED, 7)]
+
+
+def watch_plan(build_events, mock_bamboo_server) -> list:
+    """Get the (event, build number) pairs reported for the watched plan up to the end of its running build, which
+    is finished once reported as started.
+    """
+
+    events = list()
+    for build_event in build_events:
+        event, build_number = build_event['event'], build_event['build_number']
+        events.append((event, build_number))
+        if (event, build_number) == (BUILD_STARTED, 3):
+            mock_bamboo_server.finish_build(f"{PLAN_KEY}-3", build_state="Failed")
+        if (event, build_number) == (BUILD_FINISHED, 3):
+            return events
+
+
+def test_watch(mock_bamboo_server):
+    """Test to see if the client reports the build changes of a watched plan."""
+
+    mock_bamboo_server.add_plan(PLAN_KEY, results_count=3, running_count=1)
+    bamboo_api_client = BambooAPIClient(server_url=mock_bamboo_server.url)
+    bamboo_api_client.is_auth_enabled = False
+
+    build_events = bamboo_api_client.watch(plan_keys=[PLAN_KEY, PLAN_KEY], interval=0.01, emit_initial=True)
+    assert watch_plan(build_events, mock_bamboo_server) == [
+        (BUILD_STARTED, 1), (BUILD_FINISHED, 1), (BUILD_STARTED, 2), (BUILD_FINISHED, 2), (BUILD_STARTED, 3),
+        (STATE_CHANGED, 3), (BUILD_FINISHED, 3)
+    ]
+    bamboo_api_client.close()
+
+    with pytest.raises(ValueError, match="No Bamboo plan keys supplied"):
+        bamboo_api_client.watch(plan_keys=[])
+    with pytest.raises(ValueError, match="No Bamboo server supplied"):
+        BambooAPIClient().watch(plan_keys=[PLAN_KEY])
+
+
+def test_async_watch(mock_bamboo_server):
+    """Test to see if the asyncio client reports the build changes of a watched plan."""
+
+    pytest.importorskip("aiohttp")
+    mock_bamboo_server.add_plan(PLAN_KEY, results_count=3, running_count=1)
+
+    async def watch() -> list:
+        async with AsyncBambooAPIClient(server_url=mock_bamboo_server.url) as async_bamboo_api_client:
+            async_bamboo_api_client.is_auth_enabled = False
+            build_events = list()
+            async for build_event in async_bamboo_api_client.watch(
+                    plan_keys=[PLAN_KEY], interval=0.01, emit_initial=True
+            ):
+                build_events.append(build_event)
+                if get_events(build_events[-1:]) == [(BUILD_STARTED, 3)]:
+                    mock_bamboo_server.finish_build(f"{PLAN_KEY}-3", build_state="Failed")
+                if get_events(build_events[-1:]) == [(BUILD_FINISHED, 3)]:
+                    return get_events(build_events)
+
+    assert asyncio.run(asyncio.wait_for(watch(), timeout=10)) == [
+        (BUILD_STARTED, 1), (BUILD_FINISHED, 1), (BUILD_STARTED, 2), (BUILD_FINISHED, 2), (BUILD_STARTED, 3),
+        (STATE_CHANGED, 3), (BUILD_FINISHED, 3)
+    ]
+
+    with pytest.raises(ValueError, match="No Bamboo plan keys supplied"):
+        AsyncBambooAPIClient(server_url=mock_bamboo_server.url).watch(plan_keys=None)